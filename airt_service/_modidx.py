@@ -87,7 +87,23 @@ d = { 'settings': { 'branch': 'main',
                                    'airt_service.auth.APIKey.get_all': ('auth.html#apikey.get_all', 'airt_service/auth.py'),
                                    'airt_service.auth.SSOInitiateRequest': ('auth.html#ssoinitiaterequest', 'airt_service/auth.py'),
                                    'airt_service.auth.Token': ('auth.html#token', 'airt_service/auth.py'),
+                                   'airt_service.auth._add_pending_invalidation': ( 'auth.html#_add_pending_invalidation',
+                                                                                    'airt_service/auth.py'),
+                                   'airt_service.auth._cache_user_id': ('auth.html#_cache_user_id', 'airt_service/auth.py'),
+                                   'airt_service.auth._discard_user_cache_invalidations_after_rollback': ( 'auth.html#_discard_user_cache_invalidations_after_rollback',
+                                                                                                           'airt_service/auth.py'),
+                                   'airt_service.auth._get_cached_user_id': ('auth.html#_get_cached_user_id', 'airt_service/auth.py'),
+                                   'airt_service.auth._invalidate_user_cache_after_commit': ( 'auth.html#_invalidate_user_cache_after_commit',
+                                                                                              'airt_service/auth.py'),
+                                   'airt_service.auth._invalidate_user_cache_on_apikey_update': ( 'auth.html#_invalidate_user_cache_on_apikey_update',
+                                                                                                  'airt_service/auth.py'),
+                                   'airt_service.auth._invalidate_user_cache_on_user_update': ( 'auth.html#_invalidate_user_cache_on_user_update',
+                                                                                                'airt_service/auth.py'),
+                                   'airt_service.auth._validate_otp_or_totp': ('auth.html#_validate_otp_or_totp', 'airt_service/auth.py'),
                                    'airt_service.auth.authenticate_user': ('auth.html#authenticate_user', 'airt_service/auth.py'),
+                                   'airt_service.auth.authenticate_user_async': ( 'auth.html#authenticate_user_async',
+                                                                                  'airt_service/auth.py'),
+                                   'airt_service.auth.check_login_rate_limit': ('auth.html#check_login_rate_limit', 'airt_service/auth.py'),
                                    'airt_service.auth.create_access_token': ('auth.html#create_access_token', 'airt_service/auth.py'),
                                    'airt_service.auth.create_apikey': ('auth.html#create_apikey', 'airt_service/auth.py'),
                                    'airt_service.auth.delete_apikey': ('auth.html#delete_apikey', 'airt_service/auth.py'),
@@ -102,10 +118,12 @@ d = { 'settings': { 'branch': 'main',
                                    'airt_service.auth.get_sso_trial_user': ('auth.html#get_sso_trial_user', 'airt_service/auth.py'),
                                    'airt_service.auth.get_user': ('auth.html#get_user', 'airt_service/auth.py'),
                                    'airt_service.auth.get_valid_user': ('auth.html#get_valid_user', 'airt_service/auth.py'),
+                                   'airt_service.auth.invalidate_user_cache': ('auth.html#invalidate_user_cache', 'airt_service/auth.py'),
                                    'airt_service.auth.login_for_access_token': ('auth.html#login_for_access_token', 'airt_service/auth.py'),
                                    'airt_service.auth.login_for_sso_access_token': ( 'auth.html#login_for_sso_access_token',
                                                                                      'airt_service/auth.py'),
-                                   'airt_service.auth.sso_google_callback': ('auth.html#sso_google_callback', 'airt_service/auth.py')},
+                                   'airt_service.auth.sso_google_callback': ('auth.html#sso_google_callback', 'airt_service/auth.py'),
+                                   'airt_service.auth.submit_password_task': ('auth.html#submit_password_task', 'airt_service/auth.py')},
             'airt_service.aws.batch_utils': { 'airt_service.aws.batch_utils.ComputeEnvironment': ( 'aws_batch_job_utils.html#computeenvironment',
                                                                                                    'airt_service/aws/batch_utils.py'),
                                               'airt_service.aws.batch_utils.ComputeEnvironment.__enter__': ( 'aws_batch_job_utils.html#computeenvironment.__enter__',
@@ -226,7 +244,9 @@ d = { 'settings': { 'branch': 'main',
                                                                                                   'airt_service/aws/batch_utils.py'),
                                               'airt_service.aws.batch_utils.get_subnets_with_instance_availability': ( 'aws_batch_job_utils.html#get_subnets_with_instance_availability',
                                                                                                                        'airt_service/aws/batch_utils.py')},
-            'airt_service.aws.utils': { 'airt_service.aws.utils.create_s3_datablob_path': ( 'aws_utils.html#create_s3_datablob_path',
+            'airt_service.aws.utils': { 'airt_service.aws.utils._reset_s3_clients_after_fork': ( 'aws_utils.html#_reset_s3_clients_after_fork',
+                                                                                                 'airt_service/aws/utils.py'),
+                                        'airt_service.aws.utils.create_s3_datablob_path': ( 'aws_utils.html#create_s3_datablob_path',
                                                                                             'airt_service/aws/utils.py'),
                                         'airt_service.aws.utils.create_s3_datasource_path': ( 'aws_utils.html#create_s3_datasource_path',
                                                                                               'airt_service/aws/utils.py'),
@@ -240,6 +260,10 @@ d = { 'settings': { 'branch': 'main',
                                                                                               'airt_service/aws/utils.py'),
                                         'airt_service.aws.utils.get_s3_bucket_and_path_from_uri': ( 'aws_utils.html#get_s3_bucket_and_path_from_uri',
                                                                                                     'airt_service/aws/utils.py'),
+                                        'airt_service.aws.utils.get_s3_client': ( 'aws_utils.html#get_s3_client',
+                                                                                  'airt_service/aws/utils.py'),
+                                        'airt_service.aws.utils.get_s3_resource': ( 'aws_utils.html#get_s3_resource',
+                                                                                    'airt_service/aws/utils.py'),
                                         'airt_service.aws.utils.get_s3_storage_bucket': ( 'aws_utils.html#get_s3_storage_bucket',
                                                                                           'airt_service/aws/utils.py'),
                                         'airt_service.aws.utils.upload_to_s3_with_retry': ( 'aws_utils.html#upload_to_s3_with_retry',
@@ -300,7 +324,9 @@ d = { 'settings': { 'branch': 'main',
                                                                                                            'airt_service/azure/batch_utils.py'),
                                                 'airt_service.azure.batch_utils.get_random_string': ( 'azure_batch_job_utils.html#get_random_string',
                                                                                                       'airt_service/azure/batch_utils.py')},
-            'airt_service.azure.utils': { 'airt_service.azure.utils.create_azure_blob_storage_datablob_path': ( 'azure_utils.html#create_azure_blob_storage_datablob_path',
+            'airt_service.azure.utils': { 'airt_service.azure.utils._reset_azure_clients_after_fork': ( 'azure_utils.html#_reset_azure_clients_after_fork',
+                                                                                                        'airt_service/azure/utils.py'),
+                                          'airt_service.azure.utils.create_azure_blob_storage_datablob_path': ( 'azure_utils.html#create_azure_blob_storage_datablob_path',
                                                                                                                 'airt_service/azure/utils.py'),
                                           'airt_service.azure.utils.create_azure_blob_storage_datasource_path': ( 'azure_utils.html#create_azure_blob_storage_datasource_path',
                                                                                                                   'airt_service/azure/utils.py'),
@@ -314,8 +340,14 @@ d = { 'settings': { 'branch': 'main',
                                                                                                                     'airt_service/azure/utils.py'),
                                           'airt_service.azure.utils.get_azure_blob_storage_container': ( 'azure_utils.html#get_azure_blob_storage_container',
                                                                                                          'airt_service/azure/utils.py'),
+                                          'airt_service.azure.utils.get_azure_credential': ( 'azure_utils.html#get_azure_credential',
+                                                                                             'airt_service/azure/utils.py'),
+                                          'airt_service.azure.utils.get_azure_storage_account_name': ( 'azure_utils.html#get_azure_storage_account_name',
+                                                                                                       'airt_service/azure/utils.py'),
                                           'airt_service.azure.utils.get_batch_account_pool_job_names': ( 'azure_utils.html#get_batch_account_pool_job_names',
                                                                                                          'airt_service/azure/utils.py'),
+                                          'airt_service.azure.utils.provision_azure_storage': ( 'azure_utils.html#provision_azure_storage',
+                                                                                                'airt_service/azure/utils.py'),
                                           'airt_service.azure.utils.verify_azure_region': ( 'azure_utils.html#verify_azure_region',
                                                                                             'airt_service/azure/utils.py')},
             'airt_service.background_task': { 'airt_service.background_task.execute_cli': ( 'background_task.html#execute_cli',
@@ -381,40 +413,92 @@ d = { 'settings': { 'branch': 'main',
                                         'airt_service.confluent.get_topic_names_to_create': ( 'confluent.html#get_topic_names_to_create',
                                                                                               'airt_service/confluent.py')},
             'airt_service.constants': {},
-            'airt_service.data.azure_blob_storage': { 'airt_service.data.azure_blob_storage.azure_blob_storage_pull': ( 'datablob_azure_blob_storage.html#azure_blob_storage_pull',
+            'airt_service.data.azure_blob_storage': { 'airt_service.data.azure_blob_storage._copy_between_azure_blob_storage_through_local_disk': ( 'datablob_azure_blob_storage.html#_copy_between_azure_blob_storage_through_local_disk',
+                                                                                                                                                    'airt_service/data/azure_blob_storage.py'),
+                                                      'airt_service.data.azure_blob_storage._get_read_sas_token': ( 'datablob_azure_blob_storage.html#_get_read_sas_token',
+                                                                                                                    'airt_service/data/azure_blob_storage.py'),
+                                                      'airt_service.data.azure_blob_storage.azure_blob_storage_pull': ( 'datablob_azure_blob_storage.html#azure_blob_storage_pull',
                                                                                                                         'airt_service/data/azure_blob_storage.py'),
                                                       'airt_service.data.azure_blob_storage.azure_blob_storage_push': ( 'datablob_azure_blob_storage.html#azure_blob_storage_push',
                                                                                                                         'airt_service/data/azure_blob_storage.py'),
+                                                      'airt_service.data.azure_blob_storage.copy_azure_blobs': ( 'datablob_azure_blob_storage.html#copy_azure_blobs',
+                                                                                                                 'airt_service/data/azure_blob_storage.py'),
                                                       'airt_service.data.azure_blob_storage.copy_between_azure_blob_storage': ( 'datablob_azure_blob_storage.html#copy_between_azure_blob_storage',
                                                                                                                                 'airt_service/data/azure_blob_storage.py')},
-            'airt_service.data.clickhouse': { 'airt_service.data.clickhouse._construct_filter_query': ( 'datablob_clickhouse.html#_construct_filter_query',
+            'airt_service.data.clickhouse': { 'airt_service.data.clickhouse.ClickHouseFetchMode': ( 'datablob_clickhouse.html#clickhousefetchmode',
+                                                                                                    'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse.ClickHousePartitionPlanning': ( 'datablob_clickhouse.html#clickhousepartitionplanning',
+                                                                                                            'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._construct_filter_query': ( 'datablob_clickhouse.html#_construct_filter_query',
                                                                                                         'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._construct_timestamp_filter_query': ( 'datablob_clickhouse.html#_construct_timestamp_filter_query',
+                                                                                                                  'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._create_clickhouse_connection_string': ( 'datablob_clickhouse.html#_create_clickhouse_connection_string',
                                                                                                                      'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._delete_stale_parquet_parts': ( 'datablob_clickhouse.html#_delete_stale_parquet_parts',
+                                                                                                            'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._download_account_id_rows_as_parquet': ( 'datablob_clickhouse.html#_download_account_id_rows_as_parquet',
                                                                                                                      'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._download_from_clickhouse': ( 'datablob_clickhouse.html#_download_from_clickhouse',
                                                                                                           'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._download_partition_from_clickhouse': ( 'datablob_clickhouse.html#_download_partition_from_clickhouse',
+                                                                                                                    'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._drop_table': ( 'datablob_clickhouse.html#_drop_table',
                                                                                             'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._fetch_clickhouse_query_as_tables': ( 'datablob_clickhouse.html#_fetch_clickhouse_query_as_tables',
+                                                                                                                  'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_account_id_rows_schema': ( 'datablob_clickhouse.html#_get_account_id_rows_schema',
+                                                                                                            'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._get_all_person_ids_for_account_id': ( 'datablob_clickhouse.html#_get_all_person_ids_for_account_id',
                                                                                                                    'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._get_clickhouse_connection_params_from_db_uri': ( 'datablob_clickhouse.html#_get_clickhouse_connection_params_from_db_uri',
                                                                                                                               'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_clickhouse_http_url': ( 'datablob_clickhouse.html#_get_clickhouse_http_url',
+                                                                                                         'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._get_count_for_account_id': ( 'datablob_clickhouse.html#_get_count_for_account_id',
                                                                                                           'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_counts_for_account_ids': ( 'datablob_clickhouse.html#_get_counts_for_account_ids',
+                                                                                                            'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_index_quantile_partitions': ( 'datablob_clickhouse.html#_get_index_quantile_partitions',
+                                                                                                               'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_person_ids_for_account_id_after': ( 'datablob_clickhouse.html#_get_person_ids_for_account_id_after',
+                                                                                                                     'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._get_previous_clickhouse_pull_metadata': ( 'datablob_clickhouse.html#_get_previous_clickhouse_pull_metadata',
+                                                                                                                       'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._get_value_counts_for_index_column': ( 'datablob_clickhouse.html#_get_value_counts_for_index_column',
                                                                                                                    'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._group_arrow_batches': ( 'datablob_clickhouse.html#_group_arrow_batches',
+                                                                                                     'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._insert_data': ( 'datablob_clickhouse.html#_insert_data',
                                                                                              'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._insert_record_batch': ( 'datablob_clickhouse.html#_insert_record_batch',
+                                                                                                     'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._insert_record_batch_http': ( 'datablob_clickhouse.html#_insert_record_batch_http',
+                                                                                                          'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._insert_record_batches': ( 'datablob_clickhouse.html#_insert_record_batches',
+                                                                                                       'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._insert_table': ( 'datablob_clickhouse.html#_insert_table',
                                                                                               'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._insert_table_query': ( 'datablob_clickhouse.html#_insert_table_query',
                                                                                                     'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._iter_person_ids_for_account_id': ( 'datablob_clickhouse.html#_iter_person_ids_for_account_id',
+                                                                                                                'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._partition_index_quantiles_into_chunks': ( 'datablob_clickhouse.html#_partition_index_quantiles_into_chunks',
+                                                                                                                       'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._partitions_follow_dataset': ( 'datablob_clickhouse.html#_partitions_follow_dataset',
+                                                                                                           'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._post_clickhouse_http_query': ( 'datablob_clickhouse.html#_post_clickhouse_http_query',
+                                                                                                            'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._reset_clickhouse_engines_after_fork': ( 'datablob_clickhouse.html#_reset_clickhouse_engines_after_fork',
+                                                                                                                     'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._split_at_index_boundaries': ( 'datablob_clickhouse.html#_split_at_index_boundaries',
+                                                                                                           'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._sql_type': ( 'datablob_clickhouse.html#_sql_type',
                                                                                           'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse._sql_types': ( 'datablob_clickhouse.html#_sql_types',
                                                                                            'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse._stream_clickhouse_query_as_arrow': ( 'datablob_clickhouse.html#_stream_clickhouse_query_as_arrow',
+                                                                                                                  'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.clickhouse_pull': ( 'datablob_clickhouse.html#clickhouse_pull',
                                                                                                 'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.clickhouse_push': ( 'datablob_clickhouse.html#clickhouse_push',
@@ -431,12 +515,20 @@ d = { 'settings': { 'branch': 'main',
                                                                                                           'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.get_clickhouse_params_from_env_vars': ( 'datablob_clickhouse.html#get_clickhouse_params_from_env_vars',
                                                                                                                     'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse.get_clickhouse_pool_params_from_env_vars': ( 'datablob_clickhouse.html#get_clickhouse_pool_params_from_env_vars',
+                                                                                                                         'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.get_count': ( 'datablob_clickhouse.html#get_count',
                                                                                           'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.get_count_for_account_id': ( 'datablob_clickhouse.html#get_count_for_account_id',
                                                                                                          'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse.get_counts_for_account_ids': ( 'datablob_clickhouse.html#get_counts_for_account_ids',
+                                                                                                           'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.get_max_timestamp': ( 'datablob_clickhouse.html#get_max_timestamp',
                                                                                                   'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse.get_pooled_clickhouse_engine': ( 'datablob_clickhouse.html#get_pooled_clickhouse_engine',
+                                                                                                             'airt_service/data/clickhouse.py'),
+                                              'airt_service.data.clickhouse.iter_person_ids_for_account_id': ( 'datablob_clickhouse.html#iter_person_ids_for_account_id',
+                                                                                                               'airt_service/data/clickhouse.py'),
                                               'airt_service.data.clickhouse.partition_index_value_counts_into_chunks': ( 'datablob_clickhouse.html#partition_index_value_counts_into_chunks',
                                                                                                                          'airt_service/data/clickhouse.py')},
             'airt_service.data.csv': {'airt_service.data.csv.process_csv': ('datasource_csv.html#process_csv', 'airt_service/data/csv.py')},
@@ -466,8 +558,14 @@ d = { 'settings': { 'branch': 'main',
                                                                                          'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.DataBlob.get_all': ( 'datablob_router.html#datablob.get_all',
                                                                                              'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.DataBlob.get_all_async': ( 'datablob_router.html#datablob.get_all_async',
+                                                                                                   'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.DataBlob.get_async': ( 'datablob_router.html#datablob.get_async',
+                                                                                               'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.DataBlob.is_ready': ( 'datablob_router.html#datablob.is_ready',
                                                                                               'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.DataBlob.refresh_from_clickhouse': ( 'datablob_router.html#datablob.refresh_from_clickhouse',
+                                                                                                             'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.DataBlob.remove_tag_from_previous_datablobs': ( 'datablob_router.html#datablob.remove_tag_from_previous_datablobs',
                                                                                                                         'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.DataBlob.tag': ( 'datablob_router.html#datablob.tag',
@@ -498,12 +596,18 @@ d = { 'settings': { 'branch': 'main',
                                                                                           'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.FromS3Request.Config': ( 'datablob_router.html#froms3request.config',
                                                                                                  'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.RefreshFromClickHouseRequest': ( 'datablob_router.html#refreshfromclickhouserequest',
+                                                                                                         'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.RefreshFromClickHouseRequest.Config': ( 'datablob_router.html#refreshfromclickhouserequest.config',
+                                                                                                                'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.S3Request': ( 'datablob_router.html#s3request',
                                                                                       'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.ToDataSourceRequest': ( 'datablob_router.html#todatasourcerequest',
                                                                                                 'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.ToDataSourceRequest.Config': ( 'datablob_router.html#todatasourcerequest.config',
                                                                                                        'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob._get_clickhouse_pull_command': ( 'datablob_router.html#_get_clickhouse_pull_command',
+                                                                                                         'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.delete_datablob': ( 'datablob_router.html#delete_datablob',
                                                                                             'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.from_azure_blob_storage_route': ( 'datablob_router.html#from_azure_blob_storage_route',
@@ -520,6 +624,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                               'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.get_details_of_datablob': ( 'datablob_router.html#get_details_of_datablob',
                                                                                                     'airt_service/data/datablob.py'),
+                                            'airt_service.data.datablob.refresh_from_clickhouse_route': ( 'datablob_router.html#refresh_from_clickhouse_route',
+                                                                                                          'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.tag_datablob': ( 'datablob_router.html#tag_datablob',
                                                                                          'airt_service/data/datablob.py'),
                                             'airt_service.data.datablob.to_datasource_route': ( 'datablob_router.html#to_datasource_route',
@@ -534,6 +640,10 @@ d = { 'settings': { 'branch': 'main',
                                                                                                'airt_service/data/datasource.py'),
                                               'airt_service.data.datasource.DataSource.get_all': ( 'datasource_router.html#datasource.get_all',
                                                                                                    'airt_service/data/datasource.py'),
+                                              'airt_service.data.datasource.DataSource.get_all_async': ( 'datasource_router.html#datasource.get_all_async',
+                                                                                                         'airt_service/data/datasource.py'),
+                                              'airt_service.data.datasource.DataSource.get_async': ( 'datasource_router.html#datasource.get_async',
+                                                                                                     'airt_service/data/datasource.py'),
                                               'airt_service.data.datasource.DataSource.is_ready': ( 'datasource_router.html#datasource.is_ready',
                                                                                                     'airt_service/data/datasource.py'),
                                               'airt_service.data.datasource.DataSource.remove_tag_from_previous_datasources': ( 'datasource_router.html#datasource.remove_tag_from_previous_datasources',
@@ -554,17 +664,46 @@ d = { 'settings': { 'branch': 'main',
                                                                                                           'airt_service/data/datasource.py'),
                                               'airt_service.data.datasource.tag_datasource': ( 'datasource_router.html#tag_datasource',
                                                                                                'airt_service/data/datasource.py')},
-            'airt_service.data.db': { 'airt_service.data.db.db_pull': ('datablob_db.html#db_pull', 'airt_service/data/db.py'),
+            'airt_service.data.db': { 'airt_service.data.db._download_partition_from_db': ( 'datablob_db.html#_download_partition_from_db',
+                                                                                            'airt_service/data/db.py'),
+                                      'airt_service.data.db._get_partition_column': ( 'datablob_db.html#_get_partition_column',
+                                                                                      'airt_service/data/db.py'),
+                                      'airt_service.data.db._insert_record_batch_executemany': ( 'datablob_db.html#_insert_record_batch_executemany',
+                                                                                                 'airt_service/data/db.py'),
+                                      'airt_service.data.db._load_record_batch_mysql': ( 'datablob_db.html#_load_record_batch_mysql',
+                                                                                         'airt_service/data/db.py'),
+                                      'airt_service.data.db._load_record_batch_postgresql': ( 'datablob_db.html#_load_record_batch_postgresql',
+                                                                                              'airt_service/data/db.py'),
+                                      'airt_service.data.db._push_record_batches': ( 'datablob_db.html#_push_record_batches',
+                                                                                     'airt_service/data/db.py'),
+                                      'airt_service.data.db._read_sql_chunks': ( 'datablob_db.html#_read_sql_chunks',
+                                                                                 'airt_service/data/db.py'),
+                                      'airt_service.data.db._split_into_ranges': ( 'datablob_db.html#_split_into_ranges',
+                                                                                   'airt_service/data/db.py'),
+                                      'airt_service.data.db._write_csv': ('datablob_db.html#_write_csv', 'airt_service/data/db.py'),
+                                      'airt_service.data.db.db_pull': ('datablob_db.html#db_pull', 'airt_service/data/db.py'),
                                       'airt_service.data.db.db_push': ('datablob_db.html#db_push', 'airt_service/data/db.py'),
                                       'airt_service.data.db.download_from_db': ( 'datablob_db.html#download_from_db',
                                                                                  'airt_service/data/db.py')},
             'airt_service.data.parquet': { 'airt_service.data.parquet.process_parquet': ( 'datasource_parquet.html#process_parquet',
                                                                                           'airt_service/data/parquet.py')},
-            'airt_service.data.s3': { 'airt_service.data.s3.copy_between_s3': ( 'datablob_s3.html#copy_between_s3',
+            'airt_service.data.s3': { 'airt_service.data.s3._get_s3_access_key': ( 'datablob_s3.html#_get_s3_access_key',
+                                                                                   'airt_service/data/s3.py'),
+                                      'airt_service.data.s3.copy_between_s3': ( 'datablob_s3.html#copy_between_s3',
+                                                                                'airt_service/data/s3.py'),
+                                      'airt_service.data.s3.copy_s3_objects': ( 'datablob_s3.html#copy_s3_objects',
                                                                                 'airt_service/data/s3.py'),
                                       'airt_service.data.s3.s3_pull': ('datablob_s3.html#s3_pull', 'airt_service/data/s3.py'),
                                       'airt_service.data.s3.s3_push': ('datablob_s3.html#s3_push', 'airt_service/data/s3.py')},
-            'airt_service.data.utils': { 'airt_service.data.utils.calculate_azure_data_object_folder_size_and_path': ( 'data_utils.html#calculate_azure_data_object_folder_size_and_path',
+            'airt_service.data.utils': { 'airt_service.data.utils._cast_parquet_parts_to_common_schema': ( 'data_utils.html#_cast_parquet_parts_to_common_schema',
+                                                                                                           'airt_service/data/utils.py'),
+                                         'airt_service.data.utils._get_next_part_number': ( 'data_utils.html#_get_next_part_number',
+                                                                                            'airt_service/data/utils.py'),
+                                         'airt_service.data.utils._parquet_file_sort_key': ( 'data_utils.html#_parquet_file_sort_key',
+                                                                                             'airt_service/data/utils.py'),
+                                         'airt_service.data.utils._write_parquet_summary_files': ( 'data_utils.html#_write_parquet_summary_files',
+                                                                                                   'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.calculate_azure_data_object_folder_size_and_path': ( 'data_utils.html#calculate_azure_data_object_folder_size_and_path',
                                                                                                                        'airt_service/data/utils.py'),
                                          'airt_service.data.utils.calculate_data_object_folder_size_and_path': ( 'data_utils.html#calculate_data_object_folder_size_and_path',
                                                                                                                  'airt_service/data/utils.py'),
@@ -582,12 +721,32 @@ d = { 'settings': { 'branch': 'main',
                                                                                                     'airt_service/data/utils.py'),
                                          'airt_service.data.utils.delete_data_object_files_in_cloud': ( 'data_utils.html#delete_data_object_files_in_cloud',
                                                                                                         'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.download_data_object_file': ( 'data_utils.html#download_data_object_file',
+                                                                                                'airt_service/data/utils.py'),
                                          'airt_service.data.utils.get_azure_blob_storage_connection_params_from_db_uri': ( 'data_utils.html#get_azure_blob_storage_connection_params_from_db_uri',
                                                                                                                            'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.get_azure_container_client_and_prefix': ( 'data_utils.html#get_azure_container_client_and_prefix',
+                                                                                                            'airt_service/data/utils.py'),
                                          'airt_service.data.utils.get_db_connection_params_from_db_uri': ( 'data_utils.html#get_db_connection_params_from_db_uri',
                                                                                                            'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.get_parquet_dataset_divisions': ( 'data_utils.html#get_parquet_dataset_divisions',
+                                                                                                    'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.get_s3_client_for_credentials': ( 'data_utils.html#get_s3_client_for_credentials',
+                                                                                                    'airt_service/data/utils.py'),
                                          'airt_service.data.utils.get_s3_connection_params_from_db_uri': ( 'data_utils.html#get_s3_connection_params_from_db_uri',
-                                                                                                           'airt_service/data/utils.py')},
+                                                                                                           'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.iter_parquet_record_batches': ( 'data_utils.html#iter_parquet_record_batches',
+                                                                                                  'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.list_azure_blobs': ( 'data_utils.html#list_azure_blobs',
+                                                                                       'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.list_s3_objects': ( 'data_utils.html#list_s3_objects',
+                                                                                      'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.transfer_between_s3_and_azure_blob_storage': ( 'data_utils.html#transfer_between_s3_and_azure_blob_storage',
+                                                                                                                 'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.write_parquet_dataset': ( 'data_utils.html#write_parquet_dataset',
+                                                                                            'airt_service/data/utils.py'),
+                                         'airt_service.data.utils.write_parquet_dataset_metadata': ( 'data_utils.html#write_parquet_dataset_metadata',
+                                                                                                     'airt_service/data/utils.py')},
             'airt_service.db.models': { 'airt_service.db.models.APIKey': ('db_models.html#apikey', 'airt_service/db/models.py'),
                                         'airt_service.db.models.APIKey.get_all': ( 'db_models.html#apikey.get_all',
                                                                                    'airt_service/db/models.py'),
@@ -701,6 +860,8 @@ d = { 'settings': { 'branch': 'main',
                                         'airt_service.db.models.UserBase': ('db_models.html#userbase', 'airt_service/db/models.py'),
                                         'airt_service.db.models.UserCreate': ('db_models.html#usercreate', 'airt_service/db/models.py'),
                                         'airt_service.db.models.UserRead': ('db_models.html#userread', 'airt_service/db/models.py'),
+                                        'airt_service.db.models._reset_engine_after_fork': ( 'db_models.html#_reset_engine_after_fork',
+                                                                                             'airt_service/db/models.py'),
                                         'airt_service.db.models.check_db_is_up': ( 'db_models.html#check_db_is_up',
                                                                                    'airt_service/db/models.py'),
                                         'airt_service.db.models.create_connection_string': ( 'db_models.html#create_connection_string',
@@ -709,9 +870,19 @@ d = { 'settings': { 'branch': 'main',
                                                                                          'airt_service/db/models.py'),
                                         'airt_service.db.models.create_user_for_testing': ( 'db_models.html#create_user_for_testing',
                                                                                             'airt_service/db/models.py'),
+                                        'airt_service.db.models.get_async_engine': ( 'db_models.html#get_async_engine',
+                                                                                     'airt_service/db/models.py'),
+                                        'airt_service.db.models.get_async_session': ( 'db_models.html#get_async_session',
+                                                                                      'airt_service/db/models.py'),
+                                        'airt_service.db.models.get_async_session_with_context': ( 'db_models.html#get_async_session_with_context',
+                                                                                                   'airt_service/db/models.py'),
                                         'airt_service.db.models.get_db_params_from_env_vars': ( 'db_models.html#get_db_params_from_env_vars',
                                                                                                 'airt_service/db/models.py'),
+                                        'airt_service.db.models.get_db_pool_params_from_env_vars': ( 'db_models.html#get_db_pool_params_from_env_vars',
+                                                                                                     'airt_service/db/models.py'),
                                         'airt_service.db.models.get_engine': ('db_models.html#get_engine', 'airt_service/db/models.py'),
+                                        'airt_service.db.models.get_pooled_engine': ( 'db_models.html#get_pooled_engine',
+                                                                                      'airt_service/db/models.py'),
                                         'airt_service.db.models.get_session': ('db_models.html#get_session', 'airt_service/db/models.py'),
                                         'airt_service.db.models.get_session_with_context': ( 'db_models.html#get_session_with_context',
                                                                                              'airt_service/db/models.py')},
@@ -728,6 +899,7 @@ d = { 'settings': { 'branch': 'main',
                                       'airt_service.helpers.get_attr_by_name': ('helpers.html#get_attr_by_name', 'airt_service/helpers.py'),
                                       'airt_service.helpers.get_datasource_path': ( 'helpers.html#get_datasource_path',
                                                                                     'airt_service/helpers.py'),
+                                      'airt_service.helpers.get_import_time': ('helpers.html#get_import_time', 'airt_service/helpers.py'),
                                       'airt_service.helpers.get_model_path': ('helpers.html#get_model_path', 'airt_service/helpers.py'),
                                       'airt_service.helpers.get_password_hash': ( 'helpers.html#get_password_hash',
                                                                                   'airt_service/helpers.py'),
@@ -776,7 +948,17 @@ d = { 'settings': { 'branch': 'main',
                                                                                              'airt_service/integraion_tests.py'),
                                                'airt_service.integraion_tests.test_prediction': ( 'integration_test.html#test_prediction',
                                                                                                   'airt_service/integraion_tests.py')},
-            'airt_service.kafka_server': { 'airt_service.kafka_server.EventData': ( 'kafka_service.html#eventdata',
+            'airt_service.kafka_server': { 'airt_service.kafka_server.CountPoller': ( 'kafka_service.html#countpoller',
+                                                                                      'airt_service/kafka_server.py'),
+                                           'airt_service.kafka_server.CountPoller.__init__': ( 'kafka_service.html#countpoller.__init__',
+                                                                                               'airt_service/kafka_server.py'),
+                                           'airt_service.kafka_server.CountPoller._poll': ( 'kafka_service.html#countpoller._poll',
+                                                                                            'airt_service/kafka_server.py'),
+                                           'airt_service.kafka_server.CountPoller._run': ( 'kafka_service.html#countpoller._run',
+                                                                                           'airt_service/kafka_server.py'),
+                                           'airt_service.kafka_server.CountPoller.get_count': ( 'kafka_service.html#countpoller.get_count',
+                                                                                                'airt_service/kafka_server.py'),
+                                           'airt_service.kafka_server.EventData': ( 'kafka_service.html#eventdata',
                                                                                     'airt_service/kafka_server.py'),
                                            'airt_service.kafka_server.LogMessage': ( 'kafka_service.html#logmessage',
                                                                                      'airt_service/kafka_server.py'),
@@ -834,6 +1016,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                                     'airt_service/kafka_server.py')},
             'airt_service.model.prediction': { 'airt_service.model.prediction.Prediction.get': ( 'model_prediction.html#prediction.get',
                                                                                                  'airt_service/model/prediction.py'),
+                                               'airt_service.model.prediction.Prediction.get_async': ( 'model_prediction.html#prediction.get_async',
+                                                                                                       'airt_service/model/prediction.py'),
                                                'airt_service.model.prediction.Prediction.to_azure_blob_storage': ( 'model_prediction.html#prediction.to_azure_blob_storage',
                                                                                                                    'airt_service/model/prediction.py'),
                                                'airt_service.model.prediction.Prediction.to_clickhouse': ( 'model_prediction.html#prediction.to_clickhouse',
@@ -876,6 +1060,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                              'airt_service/model/train.py'),
                                           'airt_service.model.train.get_model': ( 'model_train.html#get_model',
                                                                                   'airt_service/model/train.py'),
+                                          'airt_service.model.train.get_model_async': ( 'model_train.html#get_model_async',
+                                                                                        'airt_service/model/train.py'),
                                           'airt_service.model.train.predict': ('model_train.html#predict', 'airt_service/model/train.py'),
                                           'airt_service.model.train.predict_model': ( 'model_train.html#predict_model',
                                                                                       'airt_service/model/train.py'),
@@ -883,6 +1069,8 @@ d = { 'settings': { 'branch': 'main',
                                                                                     'airt_service/model/train.py')},
             'airt_service.sanitizer': { 'airt_service.sanitizer.Logger._log': ( 'sanitize_secrets.html#logger._log',
                                                                                 'airt_service/sanitizer.py'),
+                                        'airt_service.sanitizer._get_secret_patterns': ( 'sanitize_secrets.html#_get_secret_patterns',
+                                                                                         'airt_service/sanitizer.py'),
                                         'airt_service.sanitizer.new_publish_display_data': ( 'sanitize_secrets.html#new_publish_display_data',
                                                                                              'airt_service/sanitizer.py'),
                                         'airt_service.sanitizer.sanitize_secrets': ( 'sanitize_secrets.html#sanitize_secrets',
@@ -1,16 +1,25 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../notebooks/Auth.ipynb.
 
 # %% auto 0
-__all__ = ['ALGORITHM', 'ACCESS_TOKEN_EXPIRE_MINUTES', 'oauth2_scheme', 'auth_router', 'get_user',
-           'get_password_and_otp_from_json', 'authenticate_user', 'create_access_token', 'Token',
-           'login_for_access_token', 'SSOInitiateRequest', 'login_for_sso_access_token', 'get_sso_trial_user',
-           'sso_google_callback', 'finish_sso_flow', 'get_current_active_user', 'create_apikey',
-           'get_details_of_apikey', 'get_valid_user', 'delete_apikey', 'get_all_apikey']
+__all__ = ['ALGORITHM', 'ACCESS_TOKEN_EXPIRE_MINUTES', 'USER_CACHE_TTL_SECONDS', 'USER_CACHE_MAX_SIZE', 'PASSWORD_WORKERS',
+           'PASSWORD_MAX_PENDING', 'LOGIN_RATE_LIMIT_ATTEMPTS', 'LOGIN_RATE_LIMIT_WINDOW_SECONDS',
+           'LOGIN_RATE_LIMIT_MAX_USERNAMES', 'oauth2_scheme', 'auth_router', 'get_user',
+           'get_password_and_otp_from_json', 'submit_password_task', 'authenticate_user', 'authenticate_user_async',
+           'create_access_token', 'Token', 'check_login_rate_limit', 'login_for_access_token', 'SSOInitiateRequest',
+           'login_for_sso_access_token', 'get_sso_trial_user', 'sso_google_callback', 'finish_sso_flow',
+           'invalidate_user_cache', 'get_current_active_user', 'create_apikey', 'get_details_of_apikey',
+           'get_valid_user', 'delete_apikey', 'get_all_apikey']
 
 # %% ../notebooks/Auth.ipynb 3
+import asyncio
 import json
+import math
 import secrets
+import threading
+import time
 import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from os import environ
 from typing import *
@@ -24,8 +33,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from pydantic import BaseModel
+from sqlalchemy import event
 from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.orm import object_session
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
 import airt_service.sanitizer
 from airt_service.db.models import (
@@ -58,6 +70,17 @@ logger = get_logger(__name__)
 # %% ../notebooks/Auth.ipynb 8
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180 * 24 * 60  # Expire after 180 days
+USER_CACHE_TTL_SECONDS = float(environ.get("USER_CACHE_TTL_SECONDS", 10))
+USER_CACHE_MAX_SIZE = int(environ.get("USER_CACHE_MAX_SIZE", 1024))
+PASSWORD_WORKERS = int(environ.get("PASSWORD_WORKERS", 4))
+PASSWORD_MAX_PENDING = int(environ.get("PASSWORD_MAX_PENDING", 64))
+LOGIN_RATE_LIMIT_ATTEMPTS = int(environ.get("LOGIN_RATE_LIMIT_ATTEMPTS", 30))
+LOGIN_RATE_LIMIT_WINDOW_SECONDS = float(
+    environ.get("LOGIN_RATE_LIMIT_WINDOW_SECONDS", 60)
+)
+LOGIN_RATE_LIMIT_MAX_USERNAMES = int(
+    environ.get("LOGIN_RATE_LIMIT_MAX_USERNAMES", 10_000)
+)
 
 # %% ../notebooks/Auth.ipynb 9
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -103,7 +126,72 @@ def get_password_and_otp_from_json(password: str) -> Tuple[str, str]:
 
     return password, user_otp
 
-# %% ../notebooks/Auth.ipynb 15
+# %% ../notebooks/Auth.ipynb 14
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_WORKERS, thread_name_prefix="password"
+)
+_password_slots = threading.BoundedSemaphore(PASSWORD_WORKERS + PASSWORD_MAX_PENDING)
+
+
+def submit_password_task(fn: Callable[..., Any], *args: Any) -> Future:
+    """Run a password hashing or verification function in the dedicated bcrypt pool
+
+    The pool has PASSWORD_WORKERS threads and accepts at most PASSWORD_MAX_PENDING
+    queued tasks on top of them, so bcrypt never runs in the threadpool serving the
+    other routes and a burst of logins is rejected instead of piling up.
+
+    Args:
+        fn: Function to run, e.g. verify_password or get_password_hash
+        args: Positional arguments passed to the function
+
+    Returns:
+        A future holding the result of the function
+
+    Raises:
+        HTTPException: If the pool is already running and queueing the maximum number of tasks
+    """
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ERRORS["LOGIN_SERVICE_BUSY"],
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _password_executor.submit(fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return future
+
+# %% ../notebooks/Auth.ipynb 17
+def _validate_otp_or_totp(user: User, otp_or_totp: str) -> None:
+    """Validate the TOTP or, failing that, the SMS OTP of the mfa activated user
+
+    Args:
+        user: User object
+        otp_or_totp: TOTP or OTP passed along with the password
+
+    Raises:
+        HTTPException: If both the TOTP and OTP are invalid
+    """
+    try:
+        validate_totp(user.mfa_secret, otp_or_totp)  # type: ignore
+    except HTTPException as e:
+        try:
+            validate_otp(
+                user=user,
+                otp=otp_or_totp,
+                message_template_name="get_token",
+                session=next(get_session()),
+            )
+        except HTTPException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERRORS["INVALID_OTP"],
+            )
+
+
 def authenticate_user(username: str, password: str) -> Optional[User]:
     """Validate if the password matches the user's previously stored password.
 
@@ -126,29 +214,48 @@ def authenticate_user(username: str, password: str) -> Optional[User]:
     if user.is_mfa_active:
         password, otp_or_totp = get_password_and_otp_from_json(password)
 
-    if not verify_password(password, user.password):
+    if not submit_password_task(verify_password, password, user.password).result():
         return None
 
     if user.is_mfa_active:
-        try:
-            validate_totp(user.mfa_secret, otp_or_totp)  # type: ignore
-        except HTTPException as e:
-            try:
-                validate_otp(
-                    user=user,
-                    otp=otp_or_totp,
-                    message_template_name="get_token",
-                    session=next(get_session()),
-                )
-            except HTTPException as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=ERRORS["INVALID_OTP"],
-                )
+        _validate_otp_or_totp(user, otp_or_totp)
 
     return user
 
-# %% ../notebooks/Auth.ipynb 17
+
+async def authenticate_user_async(username: str, password: str) -> Optional[User]:
+    """Async version of `authenticate_user` used by the /token route
+
+    The user lookup and the OTP validation run in the threadpool while the password
+    verification is awaited on the dedicated bcrypt pool.
+
+    Args:
+        username: Username of the user
+        password: Password to validate
+
+    Returns:
+        The user object if the credentials matches else None
+
+    Raises:
+        HTTPException: If the OTP is invalid for the mfa activated user or the bcrypt pool is full.
+    """
+    user = await run_in_threadpool(get_user, username)
+    if user is None:
+        return None
+
+    if user.is_mfa_active:
+        password, otp_or_totp = get_password_and_otp_from_json(password)
+
+    future = submit_password_task(verify_password, password, user.password)
+    if not await asyncio.wrap_future(future):
+        return None
+
+    if user.is_mfa_active:
+        await run_in_threadpool(_validate_otp_or_totp, user, otp_or_totp)
+
+    return user
+
+# %% ../notebooks/Auth.ipynb 19
 def create_access_token(data: dict, expire: Optional[datetime] = None) -> str:
     """Create new jwt access token
 
@@ -171,7 +278,7 @@ def create_access_token(data: dict, expire: Optional[datetime] = None) -> str:
     )
     return encoded_jwt
 
-# %% ../notebooks/Auth.ipynb 20
+# %% ../notebooks/Auth.ipynb 22
 auth_router = APIRouter(
     responses={
         500: {
@@ -181,7 +288,7 @@ auth_router = APIRouter(
     }
 )
 
-# %% ../notebooks/Auth.ipynb 21
+# %% ../notebooks/Auth.ipynb 23
 class Token(BaseModel):
     """A base class for creating and managing Access token
 
@@ -193,7 +300,7 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
-# %% ../notebooks/Auth.ipynb 22
+# %% ../notebooks/Auth.ipynb 24
 def generate_token(username: str) -> Token:
     """Generate access token
 
@@ -213,7 +320,46 @@ def generate_token(username: str) -> Token:
     # Sast recongnizes "bearer" string as hardcoded password but it is not. So using nosec B106.
     return Token(access_token=access_token, token_type="bearer")  # nosec B106
 
-# %% ../notebooks/Auth.ipynb 24
+# %% ../notebooks/Auth.ipynb 26
+_login_attempts: "OrderedDict[str, Deque[float]]" = OrderedDict()
+_login_attempts_lock = threading.Lock()
+
+
+def check_login_rate_limit(username: str) -> None:
+    """Record a login attempt and reject it if the username is over the rate limit
+
+    At most LOGIN_RATE_LIMIT_ATTEMPTS attempts per username are accepted within a
+    sliding window of LOGIN_RATE_LIMIT_WINDOW_SECONDS. Setting LOGIN_RATE_LIMIT_ATTEMPTS
+    to 0 disables the limiter.
+
+    Args:
+        username: Username passed to the /token route
+
+    Raises:
+        HTTPException: If the username is over the rate limit
+    """
+    if LOGIN_RATE_LIMIT_ATTEMPTS <= 0:
+        return
+
+    now = time.monotonic()
+    with _login_attempts_lock:
+        attempts = _login_attempts.pop(username, None) or deque()
+        while attempts and attempts[0] <= now - LOGIN_RATE_LIMIT_WINDOW_SECONDS:
+            attempts.popleft()
+        _login_attempts[username] = attempts
+        while len(_login_attempts) > LOGIN_RATE_LIMIT_MAX_USERNAMES:
+            _login_attempts.popitem(last=False)
+
+        if len(attempts) >= LOGIN_RATE_LIMIT_ATTEMPTS:
+            retry_after = attempts[0] + LOGIN_RATE_LIMIT_WINDOW_SECONDS - now
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=ERRORS["TOO_MANY_LOGIN_ATTEMPTS"],
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+        attempts.append(now)
+
+# %% ../notebooks/Auth.ipynb 28
 @auth_router.post(
     "/token",
     response_model=Token,
@@ -221,15 +367,24 @@ def generate_token(username: str) -> Token:
         400: {
             "model": HTTPError,
             "description": ERRORS["INCORRECT_USERNAME_OR_PASSWORD"],
-        }
+        },
+        429: {
+            "model": HTTPError,
+            "description": ERRORS["TOO_MANY_LOGIN_ATTEMPTS"],
+        },
+        503: {
+            "model": HTTPError,
+            "description": ERRORS["LOGIN_SERVICE_BUSY"],
+        },
     },
 )
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Token:
     """Authenticate with credentials"""
 
-    user = authenticate_user(form_data.username, form_data.password)
+    check_login_rate_limit(form_data.username)
+    user = await authenticate_user_async(form_data.username, form_data.password)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -240,7 +395,7 @@ def login_for_access_token(
     token = generate_token(user.username)
     return token
 
-# %% ../notebooks/Auth.ipynb 32
+# %% ../notebooks/Auth.ipynb 36
 class SSOInitiateRequest(BaseModel):
     """A base class for initiating SSO for the provider
 
@@ -254,7 +409,7 @@ class SSOInitiateRequest(BaseModel):
     password: str
     sso_provider: str
 
-# %% ../notebooks/Auth.ipynb 33
+# %% ../notebooks/Auth.ipynb 37
 @auth_router.post(
     "/sso/initiate",
     response_model=SSOAuthURL,
@@ -299,7 +454,7 @@ def login_for_sso_access_token(
         sso=sso,
     )
 
-# %% ../notebooks/Auth.ipynb 42
+# %% ../notebooks/Auth.ipynb 46
 def get_sso_trial_user(sso_signup_trial_username: str) -> User:
     """Get the user object for the given sso username
 
@@ -327,7 +482,7 @@ def get_sso_trial_user(sso_signup_trial_username: str) -> User:
             )
         return user
 
-# %% ../notebooks/Auth.ipynb 45
+# %% ../notebooks/Auth.ipynb 49
 @auth_router.get("/sso/callback")
 def sso_google_callback(request: Request) -> str:
     """SSO callback route"""
@@ -335,7 +490,7 @@ def sso_google_callback(request: Request) -> str:
     sso_provider = "google" if "googleapis" in str(request.url) else "github"
     return validate_sso_response(request=request, sso_provider=sso_provider)
 
-# %% ../notebooks/Auth.ipynb 46
+# %% ../notebooks/Auth.ipynb 50
 @auth_router.get(
     "/sso/token",
     responses={
@@ -374,7 +529,7 @@ def finish_sso_flow(authorization_url: str) -> Token:
         token = generate_token(username)
         return token
 
-# %% ../notebooks/Auth.ipynb 53
+# %% ../notebooks/Auth.ipynb 57
 get_apikey_responses = {
     400: {"model": HTTPError, "description": ERRORS["APIKEY_REVOKED"]},
     401: {"model": HTTPError, "description": ERRORS["INCORRECT_APIKEY"]},
@@ -432,13 +587,124 @@ def get(cls: APIKey, key_uuid_or_name: str, user: User, session: Session) -> API
         )
     return apikey
 
-# %% ../notebooks/Auth.ipynb 57
+# %% ../notebooks/Auth.ipynb 61
+# Resolved user ids keyed by (token subject, apikey uuid), stored with their expiry time
+_user_cache: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, int]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+
+def _get_cached_user_id(username: str, key_uuid: Optional[str]) -> Optional[int]:
+    """Get the cached id of the user resolved for the token subject and apikey uuid
+
+    Args:
+        username: Subject of the token
+        key_uuid: UUID of the apikey used to create the token, None for the login token
+
+    Returns:
+        The cached user id or None
+    """
+    with _user_cache_lock:
+        cached = _user_cache.get((username, key_uuid))
+        if cached is None:
+            return None
+        expires_at, user_id = cached
+        if expires_at < time.monotonic():
+            del _user_cache[(username, key_uuid)]
+            return None
+        _user_cache.move_to_end((username, key_uuid))
+        return user_id
+
+
+def _cache_user_id(username: str, key_uuid: Optional[str], user_id: int) -> None:
+    """Cache the id of the user resolved for the token subject and apikey uuid
+
+    Args:
+        username: Subject of the token
+        key_uuid: UUID of the apikey used to create the token, None for the login token
+        user_id: Id of the resolved user
+    """
+    if USER_CACHE_TTL_SECONDS <= 0:
+        return
+    with _user_cache_lock:
+        _user_cache[(username, key_uuid)] = (
+            time.monotonic() + USER_CACHE_TTL_SECONDS,
+            user_id,
+        )
+        _user_cache.move_to_end((username, key_uuid))
+        while len(_user_cache) > USER_CACHE_MAX_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def invalidate_user_cache(
+    *, user_id: Optional[int] = None, key_uuid: Optional[str] = None
+) -> None:
+    """Remove users from the cache used by get_current_active_user
+
+    Args:
+        user_id: Remove all the cached entries of the user with this id
+        key_uuid: Remove all the cached entries resolved using the apikey with this uuid
+
+    If both user_id and key_uuid are None, the whole cache is cleared.
+    """
+    with _user_cache_lock:
+        if user_id is None and key_uuid is None:
+            _user_cache.clear()
+            return
+        keys_to_remove = [
+            key
+            for key, (_, cached_user_id) in _user_cache.items()
+            if (user_id is not None and cached_user_id == user_id)
+            or (key_uuid is not None and key[1] == key_uuid)
+        ]
+        for key in keys_to_remove:
+            del _user_cache[key]
+
+
+# Users and apikeys updated in a session are invalidated only once the session commits,
+# so that concurrent requests can't cache the state from before the commit
+_USER_CACHE_PENDING_INVALIDATIONS = "user_cache_pending_invalidations"
+
+
+def _add_pending_invalidation(target: Union[User, APIKey], **kwargs: Any) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate_user_cache(**kwargs)
+        return
+    session.info.setdefault(_USER_CACHE_PENDING_INVALIDATIONS, []).append(kwargs)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_user_cache_on_user_update(mapper, connection, target: User) -> None:  # type: ignore
+    _add_pending_invalidation(target, user_id=target.id)
+
+
+@event.listens_for(APIKey, "after_update")
+def _invalidate_user_cache_on_apikey_update(mapper, connection, target: APIKey) -> None:  # type: ignore
+    _add_pending_invalidation(target, key_uuid=str(target.uuid))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_cache_after_commit(session: Session) -> None:
+    for kwargs in session.info.pop(_USER_CACHE_PENDING_INVALIDATIONS, []):
+        invalidate_user_cache(**kwargs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_cache_invalidations_after_rollback(session: Session) -> None:
+    session.info.pop(_USER_CACHE_PENDING_INVALIDATIONS, None)
+
+# %% ../notebooks/Auth.ipynb 62
 def get_current_active_user(token: str = Depends(oauth2_scheme)) -> User:
     """Get active user details
 
     Args:
         token: OAuth token
 
+    The id of the resolved user is cached for USER_CACHE_TTL_SECONDS, so that polling
+    clients don't look up the username and the apikey on every request. The user itself
+    is always loaded fresh by its primary key. The cache is invalidated whenever the user
+    or the apikey update is committed.
+
     Returns:
         The active user details
 
@@ -462,20 +728,32 @@ def get_current_active_user(token: str = Depends(oauth2_scheme)) -> User:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user(username=username)
-    if user is None:
-        raise credentials_exception
-    if user.disabled:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=ERRORS["INACTIVE_USER"]
-        )
+
+    key_uuid: Optional[str] = payload.get("key_uuid")
+    cached_user_id = _get_cached_user_id(username=username, key_uuid=key_uuid)
+    if cached_user_id is not None:
+        with get_session_with_context() as session:
+            user = session.get(User, cached_user_id)
+        if user is not None and not user.disabled and user.username == username:
+            return user
+        invalidate_user_cache(user_id=cached_user_id)
+
     with get_session_with_context() as session:
-        user = session.merge(user)
-        if "key_uuid" in payload:
-            apikey = APIKey.get(key_uuid_or_name=payload["key_uuid"], user=user, session=session)  # type: ignore
-    return user  # type: ignore
+        try:
+            user = session.exec(select(User).where(User.username == username)).one()
+        except NoResultFound:
+            raise credentials_exception
+        if user.disabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=ERRORS["INACTIVE_USER"]
+            )
+        if key_uuid is not None:
+            apikey = APIKey.get(key_uuid_or_name=key_uuid, user=user, session=session)  # type: ignore
 
-# %% ../notebooks/Auth.ipynb 59
+    _cache_user_id(username=username, key_uuid=key_uuid, user_id=user.id)  # type: ignore
+    return user
+
+# %% ../notebooks/Auth.ipynb 64
 @patch(cls_method=True)  # type: ignore
 def _create(
     cls: APIKey, apikey_to_create: APIKeyCreate, user: User, session: Session
@@ -495,7 +773,7 @@ def _create(
         session.add(apikey)
     return apikey
 
-# %% ../notebooks/Auth.ipynb 60
+# %% ../notebooks/Auth.ipynb 65
 @auth_router.post("/apikey", response_model=Token)
 @require_otp_if_mfa_enabled
 def create_apikey(
@@ -538,7 +816,7 @@ def create_apikey(
     # Sast recongnizes "bearer" string as hardcoded password but it is not. So using nosec B106.
     return Token(access_token=access_token, token_type="bearer")  # nosec B106
 
-# %% ../notebooks/Auth.ipynb 67
+# %% ../notebooks/Auth.ipynb 72
 @auth_router.get(
     "/apikey/{key_uuid_or_name}", response_model=APIKeyRead, responses=get_apikey_responses  # type: ignore
 )
@@ -552,7 +830,7 @@ def get_details_of_apikey(
     # get details from the internal db for apikey_id
     return APIKey.get(key_uuid_or_name=key_uuid_or_name, user=user, session=session)  # type: ignore
 
-# %% ../notebooks/Auth.ipynb 70
+# %% ../notebooks/Auth.ipynb 75
 def get_valid_user(user: User, session: Session, user_uuid_or_name: str) -> User:
     """Get valid user object to perform the operation
 
@@ -592,7 +870,7 @@ def get_valid_user(user: User, session: Session, user_uuid_or_name: str) -> User
 
     return _user
 
-# %% ../notebooks/Auth.ipynb 72
+# %% ../notebooks/Auth.ipynb 77
 @patch  # type: ignore
 def disable(self: APIKey, session: Session) -> APIKey:
     """Disable an APIKey
@@ -606,9 +884,10 @@ def disable(self: APIKey, session: Session) -> APIKey:
     with commit_or_rollback(session):
         self.disabled = True
         session.add(self)
+    invalidate_user_cache(key_uuid=str(self.uuid))
     return self
 
-# %% ../notebooks/Auth.ipynb 73
+# %% ../notebooks/Auth.ipynb 78
 @auth_router.delete(
     "/{user_uuid_or_name}/apikey/{key_uuid_or_name}", response_model=APIKeyRead, responses=get_apikey_responses  # type: ignore
 )
@@ -627,7 +906,7 @@ def delete_apikey(
 
     return apikey.disable(session)  # type: ignore
 
-# %% ../notebooks/Auth.ipynb 80
+# %% ../notebooks/Auth.ipynb 85
 @patch(cls_method=True)  # type: ignore
 def get_all(
     cls: APIKey,
@@ -654,7 +933,7 @@ def get_all(
         statement = statement.where(APIKey.disabled == False)
     return session.exec(statement.offset(offset).limit(limit)).all()
 
-# %% ../notebooks/Auth.ipynb 81
+# %% ../notebooks/Auth.ipynb 86
 @auth_router.get(
     "/{user_uuid_or_name}/apikey",
     response_model=List[APIKeyRead],
@@ -1,26 +1,29 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/AWS_Utils.ipynb.
 
 # %% auto 0
-__all__ = ['get_available_aws_regions', 'verify_aws_region', 'get_s3_storage_bucket', 'create_s3_datablob_path',
-           'create_s3_datasource_path', 'create_s3_prediction_path', 'get_batch_environment_arns',
-           'get_queue_definition_arns', 'upload_to_s3_with_retry', 'get_s3_bucket_and_path_from_uri']
+__all__ = ['get_available_aws_regions', 'verify_aws_region', 'get_s3_client', 'get_s3_resource', 'get_s3_storage_bucket',
+           'create_s3_datablob_path', 'create_s3_datasource_path', 'create_s3_prediction_path',
+           'get_batch_environment_arns', 'get_queue_definition_arns', 'upload_to_s3_with_retry',
+           'get_s3_bucket_and_path_from_uri']
 
 # %% ../../notebooks/AWS_Utils.ipynb 3
 import os
+import threading
 from pathlib import Path
 from typing import *
 
-import boto3
 import requests
 import yaml
 from airt.helpers import get_s3_bucket_name_and_folder_from_uri
 from airt.logger import get_logger
-from botocore.client import Config
 from fastapi import HTTPException, status
-from mypy_boto3_s3.service_resource import Bucket
 
 from ..sanitizer import sanitized_print
 
+if TYPE_CHECKING:
+    from mypy_boto3_s3.client import S3Client
+    from mypy_boto3_s3.service_resource import Bucket, S3ServiceResource
+
 # %% ../../notebooks/AWS_Utils.ipynb 6
 logger = get_logger(__name__)
 
@@ -76,7 +79,79 @@ def verify_aws_region(region: str) -> None:
         )
 
 # %% ../../notebooks/AWS_Utils.ipynb 11
-def get_s3_storage_bucket(region: str = "eu-west-1") -> Tuple[Bucket, str]:
+_s3_clients: Dict[Tuple[Optional[str], Optional[str]], "S3Client"] = {}
+_s3_clients_lock = threading.Lock()
+_s3_resources = threading.local()
+_existing_s3_buckets: Set[str] = set()
+
+
+def _reset_s3_clients_after_fork() -> None:
+    global _s3_resources
+    _s3_clients.clear()
+    _s3_resources = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_s3_clients_after_fork)
+
+
+def get_s3_client(
+    region: Optional[str] = None, endpoint_url: Optional[str] = None
+) -> "S3Client":
+    """Get the S3 client for the region, the client is created once and reused
+
+    Args:
+        region: region name
+        endpoint_url: Optional endpoint url of the client
+
+    Returns:
+        The S3 client
+    """
+    key = (region, endpoint_url)
+    client = _s3_clients.get(key)
+    if client is None:
+        import boto3
+        from botocore.client import Config
+
+        with _s3_clients_lock:
+            client = _s3_clients.get(key)
+            if client is None:
+                client = boto3.client(
+                    "s3",
+                    region_name=region,
+                    config=Config(signature_version="s3v4"),
+                    endpoint_url=endpoint_url,
+                )
+                _s3_clients[key] = client
+    return client
+
+
+def get_s3_resource(region: Optional[str] = None) -> "S3ServiceResource":
+    """Get the S3 resource for the region
+
+    boto3 resources are not thread safe, so a resource is created once per thread and region.
+
+    Args:
+        region: region name
+
+    Returns:
+        The S3 resource
+    """
+    resources = _s3_resources.__dict__.setdefault("resources", {})
+    resource = resources.get(region)
+    if resource is None:
+        import boto3
+        from botocore.client import Config
+
+        # boto3.session.Session is not thread safe, hence the lock around the default session
+        with _s3_clients_lock:
+            resource = boto3.resource(
+                "s3", region_name=region, config=Config(signature_version="s3v4")
+            )
+        resources[region] = resource
+    return resource
+
+# %% ../../notebooks/AWS_Utils.ipynb 13
+def get_s3_storage_bucket(region: str = "eu-west-1") -> Tuple["Bucket", str]:
     """Get the root s3 bucket to store datasources, models, predictions
 
     Args:
@@ -91,28 +166,29 @@ def get_s3_storage_bucket(region: str = "eu-west-1") -> Tuple[Bucket, str]:
     storage_bucket = f"s3://{os.environ['STORAGE_BUCKET_PREFIX']}-{region}"
     bucket_name, base_path = get_s3_bucket_name_and_folder_from_uri(storage_bucket)
 
-    s3 = boto3.resource("s3", config=Config(signature_version="s3v4"))
+    s3 = get_s3_resource()
     bucket = s3.Bucket(bucket_name)
 
-    if not bucket.creation_date:
-        s3_client = boto3.client(
-            "s3", region_name=region, config=Config(signature_version="s3v4")
-        )
-        #         region = s3_client.meta.region_name
-        try:
-            s3_client.create_bucket(
-                Bucket=bucket_name,
-                CreateBucketConfiguration={"LocationConstraint": region},
-            )
-        except s3_client.exceptions.BucketAlreadyOwnedByYou as e:
-            logger.info("Bucket already created")
-        bucket = s3.Bucket(bucket_name)
+    # bucket.creation_date lists all the buckets, so it is checked only once per bucket
+    if bucket_name not in _existing_s3_buckets:
+        if not bucket.creation_date:
+            s3_client = get_s3_client(region)
+            #         region = s3_client.meta.region_name
+            try:
+                s3_client.create_bucket(
+                    Bucket=bucket_name,
+                    CreateBucketConfiguration={"LocationConstraint": region},  # type: ignore
+                )
+            except s3_client.exceptions.BucketAlreadyOwnedByYou as e:
+                logger.info("Bucket already created")
+            bucket = s3.Bucket(bucket_name)
+        _existing_s3_buckets.add(bucket_name)
     return bucket, base_path
 
-# %% ../../notebooks/AWS_Utils.ipynb 15
+# %% ../../notebooks/AWS_Utils.ipynb 17
 def create_s3_datablob_path(
     user_id: int, datablob_id: int, region: str
-) -> Tuple[Bucket, str]:
+) -> Tuple["Bucket", str]:
     """Create an S3 path to store the datablobs
 
     Args:
@@ -128,10 +204,10 @@ def create_s3_datablob_path(
 
     return bucket, s3_path
 
-# %% ../../notebooks/AWS_Utils.ipynb 17
+# %% ../../notebooks/AWS_Utils.ipynb 19
 def create_s3_datasource_path(
     user_id: int, datasource_id: int, region: str
-) -> Tuple[Bucket, str]:
+) -> Tuple["Bucket", str]:
     """Create an S3 path to store the datasources
 
     Args:
@@ -147,10 +223,10 @@ def create_s3_datasource_path(
 
     return bucket, s3_path
 
-# %% ../../notebooks/AWS_Utils.ipynb 19
+# %% ../../notebooks/AWS_Utils.ipynb 21
 def create_s3_prediction_path(
     user_id: int, prediction_id: int, region: str
-) -> Tuple[Bucket, str]:
+) -> Tuple["Bucket", str]:
     """Create an S3 path to store the prediction results
 
     Args:
@@ -166,7 +242,7 @@ def create_s3_prediction_path(
 
     return bucket, s3_path
 
-# %% ../../notebooks/AWS_Utils.ipynb 21
+# %% ../../notebooks/AWS_Utils.ipynb 23
 def get_batch_environment_arns(
     region: str, batch_environment_arn_path: Optional[Union[str, Path]] = None
 ) -> Dict[str, Dict[str, str]]:
@@ -187,7 +263,7 @@ def get_batch_environment_arns(
 
     return batch_environment_arns[region]  # type: ignore
 
-# %% ../../notebooks/AWS_Utils.ipynb 23
+# %% ../../notebooks/AWS_Utils.ipynb 25
 def get_queue_definition_arns(
     task: str,
     region: str,
@@ -208,7 +284,7 @@ def get_queue_definition_arns(
     job_definition_arn = batch_environment_arns[task]["job_definition_arn"]
     return job_queue_arn, job_definition_arn
 
-# %% ../../notebooks/AWS_Utils.ipynb 26
+# %% ../../notebooks/AWS_Utils.ipynb 28
 def upload_to_s3_with_retry(
     file_to_upload: str,
     presigned_url: str,
@@ -244,8 +320,8 @@ def upload_to_s3_with_retry(
             curr_iteration + 1,
         )
 
-# %% ../../notebooks/AWS_Utils.ipynb 28
-def get_s3_bucket_and_path_from_uri(uri: Union[str, Path]) -> Tuple[Bucket, str]:
+# %% ../../notebooks/AWS_Utils.ipynb 30
+def get_s3_bucket_and_path_from_uri(uri: Union[str, Path]) -> Tuple["Bucket", str]:
     """Get bucket object and s3 path from s3 uri
 
     Args:
@@ -254,7 +330,7 @@ def get_s3_bucket_and_path_from_uri(uri: Union[str, Path]) -> Tuple[Bucket, str]
     Returns:
         The bucket object and the s3 path as a tuple
     """
-    s3 = boto3.resource("s3", config=Config(signature_version="s3v4"))
+    s3 = get_s3_resource()
     bucket_name, s3_path = get_s3_bucket_name_and_folder_from_uri(str(uri))
     bucket = s3.Bucket(bucket_name)
     return bucket, s3_path
@@ -1,29 +1,31 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/Azure_Utils.ipynb.
 
 # %% auto 0
-__all__ = ['get_available_azure_regions', 'verify_azure_region', 'create_azure_resource_group_storage_account_and_container',
-           'get_azure_blob_storage_container', 'create_azure_blob_storage_datablob_path',
+__all__ = ['get_available_azure_regions', 'verify_azure_region', 'get_azure_credential', 'get_azure_storage_account_name',
+           'create_azure_resource_group_storage_account_and_container', 'get_azure_blob_storage_container',
+           'provision_azure_storage', 'create_azure_blob_storage_datablob_path',
            'create_azure_blob_storage_datasource_path', 'create_azure_blob_storage_prediction_path',
            'get_azure_batch_environment_component_names', 'get_batch_account_pool_job_names']
 
 # %% ../../notebooks/Azure_Utils.ipynb 3
 import logging
 import os
+import threading
 from pathlib import Path
 from typing import *
 
 import yaml
 from airt.helpers import get_s3_bucket_name_and_folder_from_uri
 from airt.logger import get_logger
-from azure.identity import DefaultAzureCredential
-from azure.mgmt.resource import ResourceManagementClient
-from azure.mgmt.storage import StorageManagementClient
-from azure.storage.blob import BlobServiceClient
-from azure.storage.blob._container_client import ContainerClient
 from fastapi import HTTPException, status
+from fastcore.script import Param, call_parse
 
 import airt_service.sanitizer
 
+if TYPE_CHECKING:
+    from azure.identity import DefaultAzureCredential
+    from azure.storage.blob._container_client import ContainerClient
+
 # %% ../../notebooks/Azure_Utils.ipynb 6
 logger = get_logger(__name__)
 
@@ -105,6 +107,49 @@ def verify_azure_region(region: str) -> None:
         )
 
 # %% ../../notebooks/Azure_Utils.ipynb 12
+_azure_credential: Optional["DefaultAzureCredential"] = None
+_azure_containers: Dict[str, Tuple["ContainerClient", str]] = {}
+_azure_lock = threading.Lock()
+
+
+def _reset_azure_clients_after_fork() -> None:
+    global _azure_credential
+    _azure_credential = None
+    _azure_containers.clear()
+
+
+os.register_at_fork(after_in_child=_reset_azure_clients_after_fork)
+
+
+def get_azure_credential() -> "DefaultAzureCredential":
+    """Get the azure credential shared by all the clients in the process
+
+    The credential caches the access tokens, so sharing it avoids resolving the credentials again for every client.
+
+    Returns:
+        The azure credential
+    """
+    global _azure_credential
+    if _azure_credential is None:
+        from azure.identity import DefaultAzureCredential
+
+        with _azure_lock:
+            if _azure_credential is None:
+                _azure_credential = DefaultAzureCredential()
+    return _azure_credential
+
+
+def get_azure_storage_account_name(region: str) -> str:
+    """Get the name of the storage account used to store datasources, models, predictions in the region
+
+    Args:
+        region: region name
+    Returns:
+        The storage account name, the container name is the same as the storage account name
+    """
+    return f"{os.environ['AZURE_STORAGE_ACCOUNT_PREFIX']}{region}"[-24:]
+
+# %% ../../notebooks/Azure_Utils.ipynb 14
 def create_azure_resource_group_storage_account_and_container(
     resource_group_region: str = "westeurope",
     *,
@@ -119,7 +164,10 @@ def create_azure_resource_group_storage_account_and_container(
     Returns:
         Created storage account's name
     """
-    credential = DefaultAzureCredential()
+    from azure.mgmt.resource import ResourceManagementClient
+    from azure.mgmt.storage import StorageManagementClient
+
+    credential = get_azure_credential()
     subscription_id = os.environ["AZURE_SUBSCRIPTION_ID"]
 
     resource_group = os.environ["AZURE_RESOURCE_GROUP"]
@@ -129,9 +177,7 @@ def create_azure_resource_group_storage_account_and_container(
     )
 
     storage_client = StorageManagementClient(credential, subscription_id)
-    storage_account_name = (
-        f"{os.environ['AZURE_STORAGE_ACCOUNT_PREFIX']}{storage_account_region}"[-24:]
-    )
+    storage_account_name = get_azure_storage_account_name(storage_account_region)
     availability_result = storage_client.storage_accounts.check_name_availability(
         {"name": storage_account_name}
     )
@@ -157,12 +203,16 @@ def create_azure_resource_group_storage_account_and_container(
     )
     return storage_account_name
 
-# %% ../../notebooks/Azure_Utils.ipynb 14
+# %% ../../notebooks/Azure_Utils.ipynb 16
 def get_azure_blob_storage_container(
     region: str = "westeurope",
-) -> Tuple[ContainerClient, str]:
+) -> Tuple["ContainerClient", str]:
     """Get the root azure blob storage container to store datasources, models, predictions
 
+    The container client is created once per region. The storage account and the container are
+    provisioned by `provision_azure_storage`; if the container doesn't exist yet, it is provisioned
+    on the first call in the process.
+
     Args:
         region: region name
     Returns:
@@ -170,11 +220,15 @@ def get_azure_blob_storage_container(
     Raises:
         HTTPException: If region is not a valid region
     """
+    if region in _azure_containers:
+        return _azure_containers[region]
+
+    from azure.core.exceptions import AzureError
+    from azure.storage.blob import BlobServiceClient
+
     verify_azure_region(region)
 
-    storage_account_name = create_azure_resource_group_storage_account_and_container(
-        storage_account_region=region,
-    )
+    storage_account_name = get_azure_storage_account_name(region)
 
     storage_container_path = (
         f"https://{storage_account_name}.blob.core.windows.net/{storage_account_name}"
@@ -188,18 +242,53 @@ def get_azure_blob_storage_container(
 
     blob_service_client = BlobServiceClient(
         account_url=f"https://{storage_account}",
-        credential=DefaultAzureCredential(),
+        credential=get_azure_credential(),
     )
     container_client = blob_service_client.get_container_client(
         container=container_name
     )
 
+    try:
+        container_exists = container_client.exists()
+    except AzureError as e:
+        # The storage account itself doesn't exist yet
+        container_exists = False
+    if not container_exists:
+        create_azure_resource_group_storage_account_and_container(
+            storage_account_region=region,
+        )
+
+    with _azure_lock:
+        _azure_containers[region] = container_client, base_path
+
     return container_client, base_path
 
-# %% ../../notebooks/Azure_Utils.ipynb 17
+# %% ../../notebooks/Azure_Utils.ipynb 19
+@call_parse  # type: ignore
+def provision_azure_storage(regions: Param("regions", List[str]) = None) -> None:  # type: ignore
+    """Create the azure resource group, storage accounts and containers used to store datasources, models, predictions
+
+    This is meant to be run once when setting up the environment so the requests and the batch jobs don't need to
+    call the azure management APIs.
+
+    Args:
+        regions: Regions to provision, defaults to westeurope
+    """
+    if regions is None:
+        regions = ["westeurope"]
+    for region in regions:
+        verify_azure_region(region)
+        storage_account_name = (
+            create_azure_resource_group_storage_account_and_container(
+                storage_account_region=region
+            )
+        )
+        logger.info(f"provision_azure_storage(): provisioned {storage_account_name}")
+
+# %% ../../notebooks/Azure_Utils.ipynb 21
 def create_azure_blob_storage_datablob_path(
     user_id: int, datablob_id: int, region: str
-) -> Tuple[ContainerClient, str]:
+) -> Tuple["ContainerClient", str]:
     """Create an S3 path to store the datablobs
 
     Args:
@@ -219,10 +308,10 @@ def create_azure_blob_storage_datablob_path(
 
     return container_client, azure_blob_storage_path
 
-# %% ../../notebooks/Azure_Utils.ipynb 19
+# %% ../../notebooks/Azure_Utils.ipynb 23
 def create_azure_blob_storage_datasource_path(
     user_id: int, datasource_id: int, region: str
-) -> Tuple[ContainerClient, str]:
+) -> Tuple["ContainerClient", str]:
     """Create an azure blob storage path to store the datasources
 
     Args:
@@ -242,10 +331,10 @@ def create_azure_blob_storage_datasource_path(
 
     return container_client, azure_blob_storage_path
 
-# %% ../../notebooks/Azure_Utils.ipynb 21
+# %% ../../notebooks/Azure_Utils.ipynb 25
 def create_azure_blob_storage_prediction_path(
     user_id: int, prediction_id: int, region: str
-) -> Tuple[ContainerClient, str]:
+) -> Tuple["ContainerClient", str]:
     """Create an S3 path to store the prediction results
 
     Args:
@@ -265,7 +354,7 @@ def create_azure_blob_storage_prediction_path(
 
     return container_client, azure_blob_storage_path
 
-# %% ../../notebooks/Azure_Utils.ipynb 23
+# %% ../../notebooks/Azure_Utils.ipynb 27
 def get_azure_batch_environment_component_names(
     region: str, batch_environment_path: Optional[Union[str, Path]] = None
 ) -> Dict[str, Dict[str, str]]:
@@ -287,7 +376,7 @@ def get_azure_batch_environment_component_names(
     # ToDo: For now we have azure batch environment only for westeurope region. Fix this once we have more regions
     return batch_environment_names["westeurope"]  # type: ignore
 
-# %% ../../notebooks/Azure_Utils.ipynb 25
+# %% ../../notebooks/Azure_Utils.ipynb 29
 def get_batch_account_pool_job_names(
     task: str,
     region: str,
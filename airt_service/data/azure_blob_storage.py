@@ -1,15 +1,21 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb.
 
 # %% auto 0
-__all__ = ['copy_between_azure_blob_storage', 'azure_blob_storage_pull', 'azure_blob_storage_push']
+__all__ = ['AZURE_COPY_MAX_WORKERS', 'AZURE_COPY_POLL_INTERVAL_SECONDS', 'AZURE_COPY_SAS_EXPIRY_HOURS',
+           'AZURE_COPY_TIMEOUT_SECONDS', 'copy_azure_blobs', 'copy_between_azure_blob_storage',
+           'azure_blob_storage_pull', 'azure_blob_storage_push']
 
 # %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 3
 import shutil
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from os import environ
 from typing import *
 
 from airt.logger import get_logger
 from airt.remote_path import RemotePath
+from azure.core.exceptions import AzureError
 from azure.identity import DefaultAzureCredential
 from fastcore.script import call_parse
 from fastcore.utils import *
@@ -17,20 +23,193 @@ from sqlmodel import select
 
 import airt_service.sanitizer
 from ..aws.utils import create_s3_datablob_path
-from ..azure.utils import create_azure_blob_storage_datablob_path
+from airt_service.azure.utils import (
+    create_azure_blob_storage_datablob_path,
+    get_azure_credential,
+)
 from ..constants import METADATA_FOLDER_PATH
 from airt_service.data.utils import (
     calculate_data_object_folder_size_and_path,
     calculate_data_object_pulled_on,
     get_azure_blob_storage_connection_params_from_db_uri,
+    get_azure_container_client_and_prefix,
+    list_azure_blobs,
+    transfer_between_s3_and_azure_blob_storage,
 )
 from ..db.models import DataBlob, PredictionPush, get_session_with_context
 from ..helpers import truncate
 
+if TYPE_CHECKING:
+    from azure.storage.blob import ContainerClient
+
 # %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 6
 logger = get_logger(__name__)
 
 # %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 7
+AZURE_COPY_MAX_WORKERS = int(environ.get("AZURE_COPY_MAX_WORKERS", 10))
+AZURE_COPY_POLL_INTERVAL_SECONDS = float(
+    environ.get("AZURE_COPY_POLL_INTERVAL_SECONDS", 2)
+)
+AZURE_COPY_SAS_EXPIRY_HOURS = int(environ.get("AZURE_COPY_SAS_EXPIRY_HOURS", 6))
+AZURE_COPY_TIMEOUT_SECONDS = float(environ.get("AZURE_COPY_TIMEOUT_SECONDS", 3600))
+
+# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 8
+def _get_read_sas_token(
+    container_client: "ContainerClient", credential: Union[str, DefaultAzureCredential]
+) -> str:
+    from azure.storage.blob import (
+        BlobServiceClient,
+        ContainerSasPermissions,
+        generate_container_sas,
+    )
+
+    if isinstance(credential, str) and "sig=" in credential:
+        # The credential is already a SAS token
+        return credential.lstrip("?")
+
+    start = datetime.utcnow() - timedelta(minutes=5)
+    expiry = datetime.utcnow() + timedelta(hours=AZURE_COPY_SAS_EXPIRY_HOURS)
+    sas_params = dict(
+        account_name=container_client.account_name,
+        container_name=container_client.container_name,
+        permission=ContainerSasPermissions(read=True),
+        start=start,
+        expiry=expiry,
+    )
+    if isinstance(credential, str):
+        return generate_container_sas(account_key=credential, **sas_params)  # type: ignore
+
+    blob_service_client = BlobServiceClient(
+        account_url=container_client.primary_endpoint.rsplit("/", 1)[0],
+        credential=credential,
+    )
+    user_delegation_key = blob_service_client.get_user_delegation_key(
+        key_start_time=start, key_expiry_time=expiry
+    )
+    return generate_container_sas(user_delegation_key=user_delegation_key, **sas_params)  # type: ignore
+
+# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 9
+def copy_azure_blobs(
+    source_remote_url: str,
+    destination_remote_url: str,
+    source_credential: Union[str, DefaultAzureCredential],
+    destination_credential: Union[str, DefaultAzureCredential],
+    skip_metadata_dir: Optional[bool] = False,
+    max_workers: int = AZURE_COPY_MAX_WORKERS,
+    poll_interval: float = AZURE_COPY_POLL_INTERVAL_SECONDS,
+    timeout: float = AZURE_COPY_TIMEOUT_SECONDS,
+) -> int:
+    """Copy all blobs from source azure blob storage path to destination azure blob storage path server side
+
+    The copies are started with `start_copy_from_url` from a pool of **max_workers** threads, the source blobs
+    are read by the storage service using a read-only SAS token. Copies which don't complete synchronously
+    are polled together every **poll_interval** seconds until all of them finish. If a copy fails or the
+    copies don't finish in **timeout** seconds, the copies still pending are aborted before raising.
+
+    Args:
+        source_remote_url: Azure blob storage uri where files to copy are located
+        destination_remote_url: Azure blob storage uri to copy files
+        source_credential: Source azure blob storage credential
+        destination_credential: Destination azure blob storage credential
+        skip_metadata_dir: If set to **True** then the **.metadata_by_airt** folder
+            will not be copied to the destination_remote_url.
+        max_workers: Number of copies to start and poll in parallel
+        poll_interval: Number of seconds to wait between checking the status of pending copies
+        timeout: Number of seconds to wait for all the copies to finish
+
+    Returns:
+        The total size in bytes of the copied blobs, excluding the blobs in the **.metadata_by_airt** folder
+
+    Raises:
+        ValueError: If there are no files to copy in source_remote_url
+        RuntimeError: If a copy fails, is aborted by the storage service or the copies don't finish in time
+    """
+    source_container_client, source_prefix = get_azure_container_client_and_prefix(
+        source_remote_url, source_credential
+    )
+    blobs = list_azure_blobs(
+        source_container_client, source_prefix, bool(skip_metadata_dir)
+    )
+    if len(blobs) == 0:
+        raise ValueError(f"URI {source_remote_url} is invalid or no files available")
+
+    sas_token = _get_read_sas_token(source_container_client, source_credential)
+    (
+        destination_container_client,
+        destination_prefix,
+    ) = get_azure_container_client_and_prefix(
+        destination_remote_url, destination_credential
+    )
+
+    # Copies not finished yet, keyed by the destination blob name
+    pending: Dict[str, Tuple[Any, str]] = {}
+
+    def check_copy_status(blob_client: Any, copy_id: str, copy_status: str) -> None:
+        if copy_status == "pending":
+            pending[blob_client.blob_name] = (blob_client, copy_id)
+            return
+        pending.pop(blob_client.blob_name, None)
+        if copy_status != "success":
+            raise RuntimeError(
+                f"Copying {blob_client.blob_name} failed with status {copy_status}"
+            )
+
+    def start_copy(name: str, relative_name: str) -> None:
+        destination_name = (
+            f"{destination_prefix}/{relative_name}"
+            if destination_prefix
+            else relative_name
+        )
+        destination_blob_client = destination_container_client.get_blob_client(
+            destination_name
+        )
+        source_url = f"{source_container_client.get_blob_client(name).url}?{sas_token}"
+        copy = destination_blob_client.start_copy_from_url(source_url)
+        check_copy_status(destination_blob_client, copy["copy_id"], copy["copy_status"])
+
+    def poll_copy(blob_client: Any, copy_id: str) -> None:
+        copy = blob_client.get_blob_properties().copy
+        check_copy_status(blob_client, copy.id, copy.status)
+
+    def abort_copy(blob_client: Any, copy_id: str) -> None:
+        try:
+            blob_client.abort_copy(copy_id)
+        except AzureError as e:
+            # The copy may have finished in the meantime
+            logger.warning(
+                f"copy_azure_blobs(): aborting the copy to {blob_client.blob_name} failed: {e}"
+            )
+
+    deadline = time.monotonic() + timeout
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            list(executor.map(lambda blob: start_copy(blob[0], blob[1]), blobs))
+            while len(pending) > 0:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(
+                        f"{len(pending)}/{len(blobs)} copies didn't finish in {timeout} seconds"
+                    )
+                logger.info(
+                    f"copy_azure_blobs(): {len(blobs) - len(pending)}/{len(blobs)} copied"
+                )
+                time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+                list(executor.map(lambda x: poll_copy(*x), list(pending.values())))
+        except BaseException:
+            if len(pending) > 0:
+                logger.warning(
+                    f"copy_azure_blobs(): aborting {len(pending)} pending copies"
+                )
+                list(executor.map(lambda x: abort_copy(*x), list(pending.values())))
+            raise
+    logger.info(f"copy_azure_blobs(): {len(blobs)}/{len(blobs)} copied")
+
+    return sum(
+        size
+        for _, relative_name, size in blobs
+        if METADATA_FOLDER_PATH not in relative_name
+    )
+
+# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 10
 def copy_between_azure_blob_storage(
     source_remote_url: str,
     destination_remote_url: str,
@@ -45,6 +224,10 @@ def copy_between_azure_blob_storage(
     the **skip_metadata_dir** flag is set to **True**, then the **.metadata_by_airt**
     folder will not be copied to the destination_remote_url.
 
+    The files are copied server side using `copy_azure_blobs`. If the storage service
+    can't copy them within AZURE_COPY_TIMEOUT_SECONDS, the pending copies are aborted and
+    the files are downloaded to the local disk and uploaded again.
+
     Args:
         source_remote_url: S3 uri where files to copy are located
         destination_remote_url: S3 uri to copy files
@@ -55,12 +238,43 @@ def copy_between_azure_blob_storage(
             will not be copied to the destination_remote_url.
     """
     source_credential = (
-        source_credential if source_credential else DefaultAzureCredential()
+        source_credential if source_credential else get_azure_credential()
     )
     destination_credential = (
-        destination_credential if destination_credential else DefaultAzureCredential()
+        destination_credential if destination_credential else get_azure_credential()
     )
 
+    if datablob is not None:
+        calculate_data_object_pulled_on(datablob)
+
+    try:
+        copy_azure_blobs(
+            source_remote_url=source_remote_url,
+            destination_remote_url=destination_remote_url,
+            source_credential=source_credential,
+            destination_credential=destination_credential,
+            skip_metadata_dir=skip_metadata_dir,
+        )
+    except (AzureError, RuntimeError) as e:
+        logger.warning(
+            f"copy_between_azure_blob_storage(): server side copy failed, copying through the local disk instead: {e}"
+        )
+        _copy_between_azure_blob_storage_through_local_disk(
+            source_remote_url=source_remote_url,
+            destination_remote_url=destination_remote_url,
+            source_credential=source_credential,
+            destination_credential=destination_credential,
+            skip_metadata_dir=skip_metadata_dir,
+        )
+
+
+def _copy_between_azure_blob_storage_through_local_disk(
+    source_remote_url: str,
+    destination_remote_url: str,
+    source_credential: Union[str, DefaultAzureCredential],
+    destination_credential: Union[str, DefaultAzureCredential],
+    skip_metadata_dir: Optional[bool] = False,
+) -> None:
     with RemotePath.from_url(
         remote_url=destination_remote_url,
         pull_on_enter=False,
@@ -78,9 +292,6 @@ def copy_between_azure_blob_storage(
             parents=False,
             credential=source_credential,
         ) as source_azure_blob_storage_path:
-            if datablob is not None:
-                calculate_data_object_pulled_on(datablob)
-
             source_files = source_azure_blob_storage_path.as_path().iterdir()
 
             if skip_metadata_dir:
@@ -96,7 +307,7 @@ def copy_between_azure_blob_storage(
                 f"URI {source_remote_url} is invalid or no files available"
             )
 
-# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 10
+# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 15
 @call_parse  # type: ignore
 def azure_blob_storage_pull(datablob_id: int) -> None:
     """Pull the data from azure blob storage and updates progress in db
@@ -143,32 +354,20 @@ def azure_blob_storage_pull(datablob_id: int) -> None:
                 )
                 destination_remote_url = f"{destination_container_client.url}/{destination_azure_blob_storage_path}"
 
-            with RemotePath.from_url(
-                remote_url=destination_remote_url,
-                pull_on_enter=False,
-                push_on_exit=True,
-                exist_ok=True,
-                parents=True,
-            ) as destination_remote_path:
-                sync_path = destination_remote_path.as_path()
-                with RemotePath.from_url(
-                    remote_url=source_remote_url,
-                    pull_on_enter=True,
-                    push_on_exit=False,
-                    exist_ok=True,
-                    parents=False,
-                    credential=source_credential,
-                ) as source_azure_blob_storage_path:
-                    calculate_data_object_pulled_on(datablob)
-
-                    source_files = source_azure_blob_storage_path.as_path().iterdir()
-                    for f in source_files:
-                        shutil.move(str(f), sync_path)
-
-                if len(list(sync_path.glob("*"))) == 0:
-                    raise ValueError(
-                        f"URI {source_remote_url} is invalid or no files available"
-                    )
+            if datablob.cloud_provider == "azure":
+                copy_between_azure_blob_storage(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    source_credential=source_credential,
+                    datablob=datablob,
+                )
+            else:
+                transfer_between_s3_and_azure_blob_storage(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    azure_credential=source_credential,
+                )
+                calculate_data_object_pulled_on(datablob)
 
             # Calculate folder size in S3/Azure blob storage
             calculate_data_object_folder_size_and_path(datablob)
@@ -178,7 +377,7 @@ def azure_blob_storage_pull(datablob_id: int) -> None:
         session.add(datablob)
         session.commit()
 
-# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 14
+# %% ../../notebooks/DataBlob_Azure_Blob_Storage.ipynb 19
 @call_parse  # type: ignore
 def azure_blob_storage_push(prediction_push_id: int) -> None:
     """Push the data to azure blob storage and update its progress in db
@@ -207,25 +406,18 @@ def azure_blob_storage_push(prediction_push_id: int) -> None:
         )
 
         try:
-            with RemotePath.from_url(
-                remote_url=destination_uri,
-                pull_on_enter=False,
-                push_on_exit=True,
-                exist_ok=True,
-                parents=True,
-                credential=destination_credential,
-            ) as destination_azure_blob_storage_path:
-                sync_path = destination_azure_blob_storage_path.as_path()
-                with RemotePath.from_url(
-                    remote_url=prediction_push.prediction.path,
-                    pull_on_enter=True,
-                    push_on_exit=False,
-                    exist_ok=True,
-                    parents=False,
-                ) as source_remote_path:
-                    source_files = source_remote_path.as_path().iterdir()
-                    for f in source_files:
-                        shutil.move(str(f), sync_path)
+            if prediction_push.prediction.path.startswith("https://"):
+                copy_between_azure_blob_storage(
+                    source_remote_url=prediction_push.prediction.path,
+                    destination_remote_url=destination_uri,
+                    destination_credential=destination_credential,
+                )
+            else:
+                transfer_between_s3_and_azure_blob_storage(
+                    source_remote_url=prediction_push.prediction.path,
+                    destination_remote_url=destination_uri,
+                    azure_credential=destination_credential,
+                )
             prediction_push.completed_steps = 1
         except Exception as e:
             prediction_push.error = truncate(str(e))
@@ -1,33 +1,42 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/DataBlob_Clickhouse.ipynb.
 
 # %% auto 0
-__all__ = ['create_db_uri_for_clickhouse_datablob', 'get_clickhouse_connection', 'get_max_timestamp',
-           'partition_index_value_counts_into_chunks', 'clickhouse_pull', 'clickhouse_push', 'get_count', 'fillna',
-           'get_count_for_account_id', 'get_all_person_ids_for_account_id', 'download_account_id_rows_as_parquet']
+__all__ = ['CLICKHOUSE_DOWNLOAD_MAX_WORKERS', 'CLICKHOUSE_HTTP_SECURE', 'CLICKHOUSE_HTTP_PORT', 'CLICKHOUSE_HTTP_TIMEOUT',
+           'CLICKHOUSE_PUSH_MAX_WORKERS', 'CLICKHOUSE_PUSH_BATCH_SIZE', 'create_db_uri_for_clickhouse_datablob',
+           'get_clickhouse_pool_params_from_env_vars', 'get_pooled_clickhouse_engine', 'get_clickhouse_connection',
+           'get_max_timestamp', 'partition_index_value_counts_into_chunks', 'ClickHousePartitionPlanning',
+           'ClickHouseFetchMode', 'clickhouse_pull', 'clickhouse_push', 'get_count', 'fillna',
+           'get_count_for_account_id', 'get_counts_for_account_ids', 'get_all_person_ids_for_account_id',
+           'iter_person_ids_for_account_id', 'download_account_id_rows_as_parquet']
 
 # %% ../../notebooks/DataBlob_Clickhouse.ipynb 3
 import json
+import math
 import re
 import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from os import environ
+from enum import Enum
+from os import environ, getpid, register_at_fork
 from pathlib import Path
 from typing import *
 from urllib.parse import quote_plus as urlquote
 from urllib.parse import unquote_plus as urlunquote
 
+import numpy as np
 import pandas as pd
 from airt.engine.engine import get_default_engine, using_cluster
 from airt.helpers import ensure
 from airt.logger import get_logger, supress_timestamps
 from airt.remote_path import RemotePath
-from fastcore.script import Param, call_parse
+from fastcore.script import Param, call_parse, store_true
 from pandas.api.types import is_datetime64_any_dtype
 from sqlalchemy import MetaData, Table, and_, column, create_engine, select
 
 # from sqlmodel import create_engine, select, column, Table, MetaData, and_
-from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.engine.cursor import CursorResult
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql.expression import func
@@ -38,10 +47,21 @@ from ..azure.utils import create_azure_blob_storage_datablob_path
 from airt_service.data.utils import (
     calculate_data_object_folder_size_and_path,
     calculate_data_object_pulled_on,
+    download_data_object_file,
+    get_parquet_dataset_divisions,
+    iter_parquet_record_batches,
+    write_parquet_dataset,
+    write_parquet_dataset_metadata,
 )
 from ..db.models import DataBlob, PredictionPush, get_session_with_context
 from ..helpers import truncate, validate_user_inputs
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import requests
+    from clickhouse_driver import Client
+
 # %% ../../notebooks/DataBlob_Clickhouse.ipynb 6
 supress_timestamps(False)
 logger = get_logger(__name__)
@@ -134,6 +154,88 @@ def get_clickhouse_params_from_env_vars() -> Dict[str, Union[str, int]]:
     )
 
 # %% ../../notebooks/DataBlob_Clickhouse.ipynb 15
+_clickhouse_engines: Dict[str, Engine] = {}
+_clickhouse_engines_pid: Optional[int] = None
+_clickhouse_engines_lock = threading.Lock()
+
+
+def _reset_clickhouse_engines_after_fork() -> None:
+    global _clickhouse_engines, _clickhouse_engines_pid, _clickhouse_engines_lock
+    for engine in _clickhouse_engines.values():
+        engine.dispose(close=False)
+    _clickhouse_engines = {}
+    _clickhouse_engines_pid = None
+    _clickhouse_engines_lock = threading.Lock()
+
+
+register_at_fork(after_in_child=_reset_clickhouse_engines_after_fork)
+
+
+def get_clickhouse_pool_params_from_env_vars() -> Dict[str, Union[int, bool]]:
+    """Get clickhouse connection pool params from environment variables
+
+    Returns:
+        The dictionary of clickhouse connection pool params
+    """
+    return dict(
+        pool_size=int(environ.get("CLICKHOUSE_POOL_SIZE", 5)),
+        max_overflow=int(environ.get("CLICKHOUSE_MAX_OVERFLOW", 10)),
+        pool_pre_ping=environ.get("CLICKHOUSE_POOL_PRE_PING", "true").lower()
+        in ["true", "1", "yes"],
+        pool_recycle=int(environ.get("CLICKHOUSE_POOL_RECYCLE", 3600)),
+    )
+
+
+def get_pooled_clickhouse_engine(
+    *,
+    username: str,
+    password: str,
+    host: str,
+    port: int,
+    database: str,
+    protocol: str,
+) -> Engine:
+    """Get the process wide pooled engine for the given clickhouse connection params
+
+    The engines are created lazily and cached by their connection string, so later calls
+    with the same params reuse the already opened connections. The connection pool is
+    configured using the CLICKHOUSE_POOL_SIZE, CLICKHOUSE_MAX_OVERFLOW,
+    CLICKHOUSE_POOL_PRE_PING and CLICKHOUSE_POOL_RECYCLE environment variables. New
+    engines are created in the child process after a fork.
+
+    Args:
+        username: Username of clickhouse database
+        password: Password of clickhouse database
+        host: Host of clickhouse database
+        port: Port of clickhouse database
+        database: Database to use
+        protocol: Protocol to connect to clickhouse (native/http)
+
+    Returns:
+        The pooled sqlalchemy engine
+    """
+    global _clickhouse_engines, _clickhouse_engines_pid
+    conn_str = _create_clickhouse_connection_string(
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+        protocol=protocol,
+    )
+    with _clickhouse_engines_lock:
+        if _clickhouse_engines_pid != getpid():
+            for engine in _clickhouse_engines.values():
+                engine.dispose(close=False)
+            _clickhouse_engines = {}
+            _clickhouse_engines_pid = getpid()
+        if conn_str not in _clickhouse_engines:
+            _clickhouse_engines[conn_str] = create_engine(
+                conn_str, **get_clickhouse_pool_params_from_env_vars()
+            )
+        return _clickhouse_engines[conn_str]
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 16
 @contextmanager  # type: ignore
 def get_clickhouse_connection(  # type: ignore
     *,
@@ -144,6 +246,7 @@ def get_clickhouse_connection(  # type: ignore
     database: str,
     table: str,
     protocol: str,
+    pooled: bool = False,
     #     verbose: bool = False,
 ) -> Connection:
     if protocol != "native":
@@ -157,13 +260,24 @@ def get_clickhouse_connection(  # type: ignore
         protocol=protocol,
     )
 
-    db_engine = create_engine(conn_str)
+    db_engine = (
+        get_pooled_clickhouse_engine(
+            username=username,
+            password=password,
+            host=host,
+            port=port,
+            database=database,
+            protocol=protocol,
+        )
+        if pooled
+        else create_engine(conn_str)
+    )
     # args, kwargs = db_engine.dialect.create_connect_args(db_engine.url)
     with db_engine.connect() as connection:
         logger.info(f"Connected to database using {db_engine}")
         yield connection
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 17
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 19
 def get_max_timestamp(
     timestamp_column: str,
     connection: Connection,
@@ -185,7 +299,7 @@ def get_max_timestamp(
     result: int = session.query(query).scalar()
     return result
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 19
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 21
 def _construct_filter_query(filters: Optional[Dict[str, str]] = None) -> str:
     filter_query = ""
     if filters:
@@ -193,7 +307,15 @@ def _construct_filter_query(filters: Optional[Dict[str, str]] = None) -> str:
             filter_query = filter_query + f" AND {column}={value}"
     return filter_query
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 21
+
+def _construct_timestamp_filter_query(
+    timestamp_column: str, min_timestamp: Optional[int] = None
+) -> str:
+    if min_timestamp is None:
+        return ""
+    return f" AND {timestamp_column}>{int(min_timestamp)}"
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 24
 def _get_value_counts_for_index_column(
     index_column: str,
     timestamp_column: str,
@@ -202,9 +324,14 @@ def _get_value_counts_for_index_column(
     connection: Connection,
     table: str,
     max_timestamp: int,
+    min_timestamp: Optional[int] = None,
 ) -> pd.DataFrame:
-    """Queries the database and returns a number of events for each person_id"""
+    """Queries the database and returns a number of events for each person_id
+
+    If min_timestamp is set, only the events newer than it are counted.
+    """
     query = f"SELECT {index_column}, COUNT(*) AS `count` FROM {table} where {timestamp_column}<={max_timestamp}"
+    query = query + _construct_timestamp_filter_query(timestamp_column, min_timestamp)
     query = query + _construct_filter_query(filters)
     query = query + f" GROUP BY {index_column} ORDER BY {index_column}"
 
@@ -214,7 +341,7 @@ def _get_value_counts_for_index_column(
     df = pd.read_sql(sql=query, con=connection)
     return df
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 23
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 26
 def partition_index_value_counts_into_chunks(
     index_column: str,
     index_value_counts: pd.DataFrame,
@@ -222,30 +349,349 @@ def partition_index_value_counts_into_chunks(
 ) -> pd.DataFrame:
     """Partition index value counts into chunks with size less than db_download_size, unless a single index has more than db_download_size events"""
     logger.info("Partitioning index ids into chunks...")
-    partitions: Dict[str, List[int]] = {
-        "index_id_start": [],
-        "index_id_end": [],
-        "count": [],
-    }
-
-    for index, row in index_value_counts.iterrows():
-        index_id = row[index_column]
-        count = row["count"]
-        if not partitions["count"]:
-            partitions["index_id_start"].append(index_id)
-            partitions["count"].append(0)
-
-        if (partitions["count"][-1] + count) <= db_download_size:
-            partitions["count"][-1] = partitions["count"][-1] + count
-        else:
-            partitions["index_id_end"].append(index_id)
-            partitions["index_id_start"].append(index_id)
-            partitions["count"].append(count)
-    partitions["index_id_end"].append(index_id + 1)
+    index_ids = index_value_counts[index_column].to_numpy()
+    if len(index_ids) == 0:
+        return pd.DataFrame({"index_id_start": [], "index_id_end": [], "count": []})
+
+    # cumulative_counts[i] is the number of events of the first i index ids
+    cumulative_counts = np.concatenate(
+        ([0], np.cumsum(index_value_counts["count"].to_numpy()))
+    )
+
+    # Each chunk takes as many index ids as fit in db_download_size, found by a binary search in
+    # cumulative_counts. Every chunk except the first one takes at least one index id.
+    starts, ends = [], []
+    start, min_end = 0, 0
+    while True:
+        end = (
+            np.searchsorted(
+                cumulative_counts,
+                cumulative_counts[start] + db_download_size,
+                side="right",
+            )
+            - 1
+        )
+        end = max(end, min_end)
+        starts.append(start)
+        ends.append(end)
+        if end >= len(index_ids):
+            break
+        start, min_end = end, end + 1
+
+    starts_array, ends_array = np.array(starts), np.array(ends)
+    partitions = pd.DataFrame(
+        {
+            "index_id_start": index_ids[starts_array],
+            "index_id_end": np.append(index_ids[ends_array[:-1]], index_ids[-1] + 1),
+            "count": cumulative_counts[ends_array] - cumulative_counts[starts_array],
+        }
+    )
     logger.info("Partitioning finished")
-    return pd.DataFrame(partitions)
+    return partitions
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 31
+class ClickHousePartitionPlanning(str, Enum):
+    """Ways to split the rows of a clickhouse table into partitions of about db_download_size rows
+
+    - exact: the number of rows of every index value is loaded and split with `partition_index_value_counts_into_chunks`
+    - approximate: the partition boundaries are approximate quantiles of the index column computed by clickhouse
+    """
+
+    exact = "exact"
+    approximate = "approximate"
+
+
+def _partition_index_quantiles_into_chunks(
+    *,
+    index_min: int,
+    index_max: int,
+    quantiles: Sequence[float],
+    row_count: int,
+) -> pd.DataFrame:
+    """Turn the quantiles of an integer index column at levels 1/n, 2/n, ..., (n-1)/n into n partitions
+
+    Partitions left empty by equal quantiles are dropped and the count of each partition is its estimated number of rows.
+    """
+    levels = np.linspace(0, 1, len(quantiles) + 2)
+    boundaries = (
+        [int(index_min)] + [math.ceil(q) for q in quantiles] + [int(index_max) + 1]
+    )
+
+    keep = [0]
+    for i in range(1, len(boundaries)):
+        if boundaries[i] > boundaries[keep[-1]]:
+            keep.append(i)
+
+    return pd.DataFrame(
+        {
+            "index_id_start": [boundaries[i] for i in keep[:-1]],
+            "index_id_end": [boundaries[i] for i in keep[1:]],
+            "count": np.diff(np.round(levels[keep] * row_count)).astype(int),
+        }
+    )
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 33
+def _get_index_quantile_partitions(
+    index_column: str,
+    timestamp_column: str,
+    filters: Optional[Dict[str, str]] = None,
+    *,
+    connection: Connection,
+    table: str,
+    max_timestamp: int,
+    min_timestamp: Optional[int] = None,
+    db_download_size: int,
+) -> pd.DataFrame:
+    """Queries the database for approximate quantiles of the index column and returns partitions of about db_download_size rows
+
+    The quantiles are computed by clickhouse with a t-digest over the rows, so only one row per partition is
+    loaded no matter how many distinct index values there are. The index column must be an integer column.
+    """
+    condition = f"{timestamp_column}<={max_timestamp}"
+    condition = condition + _construct_timestamp_filter_query(
+        timestamp_column, min_timestamp
+    )
+    condition = condition + _construct_filter_query(filters)
+
+    query = f"SELECT COUNT(*) AS `count`, min({index_column}) AS index_min, max({index_column}) AS index_max FROM {table} where {condition}"
+    logger.info(f"Querying database to get the number of rows - {query=}")
+    stats = pd.read_sql(sql=query, con=connection).iloc[0]
+    row_count = int(stats["count"])
+    if row_count == 0:
+        return pd.DataFrame({"index_id_start": [], "index_id_end": [], "count": []})
+
+    n_partitions = math.ceil(row_count / db_download_size)
+    quantiles: List[float] = []
+    if n_partitions > 1:
+        levels = ", ".join(str(i / n_partitions) for i in range(1, n_partitions))
+        query = f"SELECT quantilesTDigest({levels})({index_column}) AS quantiles FROM {table} where {condition}"
+        logger.info(
+            f"Querying database to get {n_partitions - 1} quantile(s) of {index_column}"
+        )
+        quantiles = list(pd.read_sql(sql=query, con=connection).iloc[0]["quantiles"])
+
+    return _partition_index_quantiles_into_chunks(
+        index_min=stats["index_min"],
+        index_max=stats["index_max"],
+        quantiles=quantiles,
+        row_count=row_count,
+    )
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 36
+CLICKHOUSE_DOWNLOAD_MAX_WORKERS = int(environ.get("CLICKHOUSE_DOWNLOAD_MAX_WORKERS", 4))
+CLICKHOUSE_HTTP_SECURE = environ.get("CLICKHOUSE_HTTP_SECURE", "false").lower() in [
+    "true",
+    "1",
+    "yes",
+]
+CLICKHOUSE_HTTP_PORT = int(
+    environ.get("CLICKHOUSE_HTTP_PORT", 8443 if CLICKHOUSE_HTTP_SECURE else 8123)
+)
+CLICKHOUSE_HTTP_TIMEOUT = float(environ.get("CLICKHOUSE_HTTP_TIMEOUT", 60))
+
+
+class ClickHouseFetchMode(str, Enum):
+    """Ways to fetch rows from clickhouse
+
+    - sql: rows are fetched with SQLAlchemy and pd.read_sql over the native protocol
+    - arrow: rows are streamed as Arrow record batches over the HTTP interface and written to parquet directly
+    """
+
+    sql = "sql"
+    arrow = "arrow"
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 37
+def _get_clickhouse_http_url(host: str, port: int, protocol: str) -> str:
+    """Get the URL of the HTTP interface of clickhouse for the datablob connection params
+
+    The datablob port is used for http and https datablobs. For native datablobs, the HTTP interface
+    is on CLICKHOUSE_HTTP_PORT and it uses TLS if CLICKHOUSE_HTTP_SECURE is set.
+    """
+    if protocol in ["http", "https"]:
+        return f"{protocol}://{host}:{port}/"
+    scheme = "https" if CLICKHOUSE_HTTP_SECURE else "http"
+    return f"{scheme}://{host}:{CLICKHOUSE_HTTP_PORT}/"
+
+
+def _post_clickhouse_http_query(
+    query: str,
+    *,
+    url: str,
+    username: str,
+    password: str,
+    database: str,
+    data: Optional[bytes] = None,
+    session: Optional["requests.Session"] = None,
+    timeout: float = CLICKHOUSE_HTTP_TIMEOUT,
+) -> None:
+    """Run a query without a result over the HTTP interface of clickhouse
+
+    Without data, the query is sent as the body of the request. With data, e.g. for an INSERT with a FORMAT
+    clause, the query is sent as a URL parameter and the data as the body.
+    """
+    import requests
+
+    params = {"database": database}
+    if data is None:
+        data = query.encode()
+    else:
+        params["query"] = query
+    post = session.post if session is not None else requests.post
+    response = post(
+        url, params=params, data=data, auth=(username, password), timeout=timeout
+    )
+    response.raise_for_status()
+
+
+def _stream_clickhouse_query_as_arrow(
+    query: str,
+    *,
+    url: str,
+    username: str,
+    password: str,
+    database: str,
+    timeout: float = CLICKHOUSE_HTTP_TIMEOUT,
+) -> Iterator["pa.RecordBatch"]:
+    """Run a query over the HTTP interface of clickhouse and yield the result as Arrow record batches
+
+    The timeout is applied to connecting and to every read of the stream, not to the whole query.
+    """
+    import pyarrow as pa
+    import requests
+
+    with requests.post(
+        url,
+        params={
+            "database": database,
+            "output_format_arrow_string_as_string": 1,
+        },
+        data=f"{query} FORMAT ArrowStream".encode(),
+        auth=(username, password),
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with pa.ipc.open_stream(response.raw) as reader:
+            yield from reader
+
+
+def _group_arrow_batches(
+    batches: Iterable["pa.RecordBatch"], chunksize: Optional[int]
+) -> Iterator["pa.Table"]:
+    """Group Arrow record batches into tables of at least chunksize rows, except for the last one"""
+    import pyarrow as pa
+
+    group: List["pa.RecordBatch"] = []
+    rows = 0
+    for batch in batches:
+        group.append(batch)
+        rows = rows + batch.num_rows
+        if chunksize is not None and rows >= chunksize:
+            yield pa.Table.from_batches(group)
+            group, rows = [], 0
+    if group:
+        yield pa.Table.from_batches(group)
+
+
+def _fetch_clickhouse_query_as_tables(
+    query: str,
+    *,
+    chunksize: Optional[int],
+    fetch_mode: str = ClickHouseFetchMode.sql,
+    **kwargs: Any,
+) -> Iterator["pa.Table"]:
+    """Run a query and yield the result as Arrow tables of about chunksize rows each
+
+    Args:
+        query: Query to run
+        chunksize: Number of rows in each table
+        fetch_mode: Way to fetch the rows, see `ClickHouseFetchMode`
+        kwargs: Connection params passed to get_clickhouse_connection
+    """
+    import pyarrow as pa
+
+    if fetch_mode == ClickHouseFetchMode.arrow:
+        batches = _stream_clickhouse_query_as_arrow(
+            query,
+            url=_get_clickhouse_http_url(
+                kwargs["host"], kwargs["port"], kwargs["protocol"]
+            ),
+            username=kwargs["username"],
+            password=kwargs["password"],
+            database=kwargs["database"],
+        )
+        yield from _group_arrow_batches(batches, chunksize)
+        return
+
+    with get_clickhouse_connection(**kwargs) as connection:  # type: ignore
+        for df in pd.read_sql(sql=query, con=connection, chunksize=chunksize):
+            yield pa.Table.from_pandas(df, preserve_index=False)
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 38
+def _download_partition_from_clickhouse(
+    *,
+    partition: int,
+    query: str,
+    chunksize: Optional[int],
+    output_path: Path,
+    fetch_mode: str = ClickHouseFetchMode.sql,
+    **kwargs: Any,
+) -> int:
+    """Downloads a single partition using its own connection and stores it as parquet files in output path
+
+    The files are named after the partition and the chunk, so sorting them by name preserves the order of the rows.
+
+    Args:
+        partition: Index of the partition
+        query: Query selecting the rows of the partition
+        chunksize: Chunksize to download as
+        output_path: Path to store parquet files
+        fetch_mode: Way to fetch the rows, see `ClickHouseFetchMode`
+        kwargs: Connection params passed to get_clickhouse_connection
+
+    Returns:
+        The number of parquet files written
+    """
+    import pyarrow.parquet as pq
+
+    logger.info(f"{query=}")
+    tables = _fetch_clickhouse_query_as_tables(
+        query, chunksize=chunksize, fetch_mode=fetch_mode, **kwargs
+    )
+    i = 0
+    for table in tables:
+        fname = output_path / f"clickhouse_data_{partition:06d}_{i:06d}.parquet"
+        logger.info(f"Writing data retrieved from the database to {fname}")
+        pq.write_table(table, fname)
+        i = i + 1
+    return i
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 39
+def _partitions_follow_dataset(
+    partitions: pd.DataFrame,
+    previous_metadata: "pq.FileMetaData",
+    index_column: str,
+) -> bool:
+    """Check if the rows of the partitions can be appended to a dataset without breaking its sort by the index
+
+    Args:
+        partitions: Partitions of the rows to append, with index_id_start being the smallest index in each one
+        previous_metadata: Content of the **_metadata** file of the dataset
+        index_column: Column the dataset is sorted by
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 25
+    Returns:
+        **True** if the rows to append have an index greater than the index of every row in the dataset
+    """
+    if partitions.shape[0] == 0:
+        return True
+    try:
+        divisions = get_parquet_dataset_divisions(previous_metadata, index_column)
+    except ValueError:
+        return False
+    return len(divisions) == 0 or partitions["index_id_start"].min() > divisions[-1]
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 41
 def _download_from_clickhouse(
     *,
     host: str,
@@ -261,9 +707,22 @@ def _download_from_clickhouse(
     filters: Optional[Dict[str, str]] = None,
     output_path: Path,
     db_download_size: int = 50_000_000,
-) -> None:
+    max_workers: int = CLICKHOUSE_DOWNLOAD_MAX_WORKERS,
+    fetch_mode: str = ClickHouseFetchMode.sql,
+    min_timestamp: Optional[int] = None,
+    previous_metadata: Optional["pq.FileMetaData"] = None,
+    partition_planning: str = ClickHousePartitionPlanning.exact,
+) -> int:
     """Downloads data from database and stores it as parquet files in output path
 
+    The partitions are downloaded concurrently by up to max_workers threads, each one using its own connection,
+    and written directly to output path as the parts of a parquet dataset.
+
+    For an incremental download, min_timestamp and previous_metadata are set to the max timestamp and the
+    **_metadata** file of the previous download: only the rows newer than min_timestamp are downloaded and
+    their parts are appended to the dataset. If some of the new rows have an index already in the dataset,
+    appending them would break the sort of the dataset by the index, so all the rows are downloaded instead.
+
     Args:
         host: Host of db
         port: Port of db
@@ -278,7 +737,25 @@ def _download_from_clickhouse(
         filters: Additional column filters
         output_path: Path to store parquet files
         db_download_size: Number of rows to include in single partition
+        max_workers: Number of partitions to download in parallel
+        fetch_mode: Way to fetch the rows, see `ClickHouseFetchMode`
+        min_timestamp: Download only the rows with a timestamp greater than this one
+        previous_metadata: Content of the **_metadata** file of the dataset to append the parts to
+        partition_planning: Way to split the rows into partitions, see `ClickHousePartitionPlanning`
+
+    Returns:
+        The max timestamp of the table at the time of the download, to be used as min_timestamp of the next incremental download
+
+    Raises:
+        ValueError: If the parts written are not sorted by the index column
     """
+    import pyarrow.parquet as pq
+
+    fetch_mode = ClickHouseFetchMode(fetch_mode)
+    partition_planning = ClickHousePartitionPlanning(partition_planning)
+
+    # User input is validated for SQL code injection
+    validate_user_inputs([table, timestamp_column, index_column])
 
     with get_clickhouse_connection(  # type: ignore
         username=username,
@@ -294,57 +771,168 @@ def _download_from_clickhouse(
             connection=connection,
             table=table,
         )
-        index_value_counts = _get_value_counts_for_index_column(
-            index_column=index_column,
-            timestamp_column=timestamp_column,
-            filters=filters,
-            connection=connection,
-            table=table,
-            max_timestamp=max_timestamp,
-        )
-        partitions = partition_index_value_counts_into_chunks(
-            index_column=index_column,
-            index_value_counts=index_value_counts,
-            db_download_size=db_download_size,
-        )
+
+        def plan_partitions(min_timestamp: Optional[int]) -> pd.DataFrame:
+            if partition_planning == ClickHousePartitionPlanning.approximate:
+                return _get_index_quantile_partitions(
+                    index_column=index_column,
+                    timestamp_column=timestamp_column,
+                    filters=filters,
+                    connection=connection,
+                    table=table,
+                    max_timestamp=max_timestamp,
+                    min_timestamp=min_timestamp,
+                    db_download_size=db_download_size,
+                )
+            index_value_counts = _get_value_counts_for_index_column(
+                index_column=index_column,
+                timestamp_column=timestamp_column,
+                filters=filters,
+                connection=connection,
+                table=table,
+                max_timestamp=max_timestamp,
+                min_timestamp=min_timestamp,
+            )
+            return partition_index_value_counts_into_chunks(
+                index_column=index_column,
+                index_value_counts=index_value_counts,
+                db_download_size=db_download_size,
+            )
+
+        partitions = plan_partitions(min_timestamp)
+        if previous_metadata is not None and not _partitions_follow_dataset(
+            partitions, previous_metadata, index_column
+        ):
+            logger.info(
+                f"Rows newer than {min_timestamp} have {index_column} values already pulled, pulling all the rows"
+            )
+            min_timestamp, previous_metadata = None, None
+            partitions = plan_partitions(min_timestamp)
         logger.info(
             f"{partitions.shape[0]} chunk(s) of ~{db_download_size} rows each found"
         )
 
-        with tempfile.TemporaryDirectory() as td:
-            d = Path(td)
-            i = 0
-            for index, chunk in partitions.iterrows():
-                index_id_start = chunk["index_id_start"]
-                index_id_end = chunk["index_id_end"]
-
-                # User input is validated for SQL code injection
-                validate_user_inputs([table, timestamp_column, index_column])
-
-                query = f"SELECT * FROM {table} FINAL WHERE {timestamp_column}<={max_timestamp} AND {index_column}>={index_id_start} AND {index_column}<{index_id_end}"  # nosec B608
-                query = query + _construct_filter_query(filters)
-                query = query + f" ORDER BY {index_column}, {timestamp_column}"
-                logger.info(f"{query=}")
-
-                for df in pd.read_sql(sql=query, con=connection, chunksize=chunksize):
-                    fname = d / f"clickhouse_data_{i:09d}.parquet"
-                    logger.info(
-                        f"Writing data retrieved from the database to temporary file {fname}"
-                    )
-                    df.to_parquet(fname, engine="pyarrow")  # type: ignore
-                    i = i + 1
+    queries = []
+    for index, chunk in partitions.iterrows():
+        index_id_start = chunk["index_id_start"]
+        index_id_end = chunk["index_id_end"]
 
-            engine = get_default_engine()
-            logger.info(
-                f"Rewriting temporary parquet files from {d / f'clickhouse_data_*.parquet'} to output directory {output_path}"
-            )
-            ddf = engine.dd.read_parquet(
-                d,
-                blocksize=None,
+        query = f"SELECT * FROM {table} FINAL WHERE {timestamp_column}<={max_timestamp} AND {index_column}>={index_id_start} AND {index_column}<{index_id_end}"  # nosec B608
+        query = query + _construct_timestamp_filter_query(
+            timestamp_column, min_timestamp
+        )
+        query = query + _construct_filter_query(filters)
+        query = query + f" ORDER BY {index_column}, {timestamp_column}"
+        queries.append(query)
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _download_partition_from_clickhouse,
+                partition=partition,
+                query=query,
+                chunksize=chunksize,
+                output_path=output_path,
+                fetch_mode=fetch_mode,
+                host=host,
+                port=port,
+                username=username,
+                password=password,
+                database=database,
+                protocol=protocol,
+                table=table,
             )
-            ddf.to_parquet(output_path, engine="pyarrow")
+            for partition, query in enumerate(queries)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            # Don't leave the files of a partial download behind in output path
+            for f in output_path.glob("clickhouse_data_*.parquet"):
+                f.unlink()
+            raise
+
+    # The files are already written in place, they only need to be renamed and summarised
+    n_parts = write_parquet_dataset_metadata(
+        output_path,
+        sorted(output_path.glob("clickhouse_data_*.parquet")),
+        previous_metadata=previous_metadata,
+    )
+    logger.info(f"{n_parts} parquet file(s) written to {output_path}")
+
+    if n_parts > 0:
+        # Recomputing the divisions checks that the parts are still sorted by the index
+        divisions = get_parquet_dataset_divisions(
+            pq.read_metadata(output_path / "_metadata"), index_column
+        )
+        logger.info(
+            f"Dataset sorted by {index_column} from {divisions[0]} to {divisions[-1]}"
+        )
+
+    return max_timestamp
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 48
+def _get_previous_clickhouse_pull_metadata(
+    datablob: DataBlob,
+) -> Optional["pq.FileMetaData"]:
+    """Get the content of the **_metadata** file written by the previous pull of the datablob
+
+    Returns:
+        The metadata or **None** if the previous pull did not complete or did not write the file
+    """
+    import pyarrow.parquet as pq
+
+    if (
+        datablob.pulled_max_timestamp is None
+        or datablob.error is not None
+        or datablob.completed_steps != datablob.total_steps
+    ):
+        return None
+
+    with tempfile.TemporaryDirectory() as d:
+        if not download_data_object_file(datablob, "_metadata", Path(d)):
+            return None
+        return pq.read_metadata(Path(d) / "_metadata")
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 49
+def _delete_stale_parquet_parts(datablob: DataBlob, parts: Set[str]) -> None:
+    """Delete the parquet parts of the datablob in the cloud which are not parts of its dataset
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 27
+    Every full pull numbers its parts from part.0.parquet on, so the extra parts of a previous pull with
+    more parts would otherwise be left next to the new ones.
+
+    Args:
+        datablob: Datablob to delete the parts of
+        parts: Names of the parts listed in the **_metadata** file of the datablob
+    """
+    if datablob.cloud_provider == "aws":
+        bucket, s3_path = create_s3_datablob_path(
+            user_id=datablob.user.id, datablob_id=datablob.id, region=datablob.region  # type: ignore
+        )
+        for obj in bucket.objects.filter(Prefix=f"{s3_path}/part."):
+            if obj.key[len(s3_path) + 1 :] not in parts:
+                logger.info(f"Deleting stale part {obj.key}")
+                obj.delete()
+    elif datablob.cloud_provider == "azure":
+        (
+            container_client,
+            azure_blob_storage_path,
+        ) = create_azure_blob_storage_datablob_path(
+            user_id=datablob.user.id, datablob_id=datablob.id, region=datablob.region  # type: ignore
+        )
+        for blob in container_client.list_blobs(
+            name_starts_with=f"{azure_blob_storage_path}/part."
+        ):
+            if blob.name[len(azure_blob_storage_path) + 1 :] not in parts:
+                logger.info(f"Deleting stale part {blob.name}")
+                container_client.delete_blob(blob)
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 51
 @call_parse  # type: ignore
 def clickhouse_pull(
     datablob_id: Param("id of datablob in db", int),  # type: ignore
@@ -353,29 +941,61 @@ def clickhouse_pull(
     filters_json: Param(  # type: ignore
         "additional column filters as json string key, value pairs", str
     ) = "{}",
+    fetch_mode: Param("way to fetch the rows, sql or arrow", str) = "sql",  # type: ignore
+    incremental: Param(  # type: ignore
+        "append only the rows newer than the previous pull", store_true
+    ) = False,
+    partition_planning: Param(  # type: ignore
+        "way to split the rows into partitions, exact or approximate", str
+    ) = "exact",
 ) -> None:
     """Pull datablob from a clickhouse database and update progress in the internal database
 
+    With incremental set, the rows newer than the max timestamp of the previous pull are appended to the
+    datablob as new parquet files. This assumes the table is append only, rows added later with an older
+    timestamp are not pulled. If the previous pull did not complete or some of the new rows have an index
+    already pulled, the whole table is pulled again. The parts of a previous pull which are not parts of the
+    datablob anymore are deleted.
+
     Args:
         datablob_id: Id of datablob in db
         index_column: Column to use to partition the rows and to use as the index
         timestamp_column: Timestamp column name
         filters_json: Additional column filters as json string
+        fetch_mode: Way to fetch the rows, see `ClickHouseFetchMode`
+        incremental: Append only the rows newer than the previous pull
+        partition_planning: Way to split the rows into partitions, see `ClickHousePartitionPlanning`
 
     Example:
         The following code executes a CLI command:
         ```clickhouse_pull 1 PersonId OccurredTimeTicks {"AccountId":312571}
         ```
     """
+    import pyarrow.parquet as pq
+
     with get_session_with_context() as session:
         datablob = session.exec(
             select(DataBlob).where(DataBlob.id == datablob_id)
         ).one()[0]
 
+        previous_metadata = (
+            _get_previous_clickhouse_pull_metadata(datablob) if incremental else None
+        )
+        min_timestamp = (
+            datablob.pulled_max_timestamp if previous_metadata is not None else None
+        )
+        if incremental:
+            logger.info(
+                f"Pulling the rows newer than {min_timestamp}"
+                if previous_metadata is not None
+                else "No previous pull to append to, pulling all the rows"
+            )
+
         datablob.error = None
         datablob.completed_steps = 0
         datablob.folder_size = None
         datablob.path = None
+        datablob.pulled_max_timestamp = None
 
         (
             username,
@@ -415,7 +1035,7 @@ def clickhouse_pull(
             ) as destionation_s3_path:
                 with using_cluster("cpu") as engine:
                     filters = json.loads(filters_json)
-                    _download_from_clickhouse(
+                    pulled_max_timestamp = _download_from_clickhouse(
                         host=host,
                         port=port,
                         username=username,
@@ -427,21 +1047,35 @@ def clickhouse_pull(
                         timestamp_column=timestamp_column,
                         filters=filters,
                         output_path=destionation_s3_path.as_path(),
+                        fetch_mode=fetch_mode,
+                        min_timestamp=min_timestamp,
+                        previous_metadata=previous_metadata,
+                        partition_planning=partition_planning,
                     )
                 calculate_data_object_pulled_on(datablob)
 
                 if len(list(destionation_s3_path.as_path().glob("*"))) == 0:
                     raise ValueError(f"no files to download, table is empty")
 
+                metadata = pq.read_metadata(
+                    destionation_s3_path.as_path() / "_metadata"
+                )
+                parts = {
+                    metadata.row_group(i).column(0).file_path
+                    for i in range(metadata.num_row_groups)
+                }
+            _delete_stale_parquet_parts(datablob, parts)
+
             # Calculate folder size in S3
             calculate_data_object_folder_size_and_path(datablob)
+            datablob.pulled_max_timestamp = pulled_max_timestamp
         except Exception as e:
             logger.error(f"Error while pulling from clickhouse - {str(e)}")
             datablob.error = truncate(str(e))
         session.add(datablob)
         session.commit()
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 30
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 55
 def _sql_type(xs: pd.Series) -> str:
     dtype = str(xs.dtype)
     if dtype.startswith("int"):
@@ -466,7 +1100,7 @@ def _sql_types(df: pd.DataFrame) -> str:
         + [f"{c} {_sql_type(df[c])}" for c in df]
     )
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 32
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 57
 def _insert_table_query(
     df: pd.DataFrame,
     table_name: str,
@@ -481,7 +1115,7 @@ def _insert_table_query(
 
     return f"CREATE TABLE {if_not_exists_str}{table_name} ({_sql_types(df)}) ENGINE = {engine} ORDER BY {df.index.name};"
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 34
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 59
 def _insert_table(
     df: pd.DataFrame,
     table_name: str,
@@ -495,7 +1129,22 @@ def _insert_table(
     database: str,
     table: str,
     protocol: str,
-) -> CursorResult:
+) -> Optional[CursorResult]:
+    query = _insert_table_query(
+        df, table_name, if_not_exists=if_not_exists, engine=engine
+    )
+    logger.info(f"Inserting table with query={query}")
+
+    if protocol in ["http", "https"]:
+        _post_clickhouse_http_query(
+            query,
+            url=_get_clickhouse_http_url(host, port, protocol),
+            username=username,
+            password=password,
+            database=database,
+        )
+        return None
+
     with get_clickhouse_connection(  # type: ignore
         username=username,
         password=password,
@@ -508,14 +1157,9 @@ def _insert_table(
         if not type(connection) == Connection:
             raise ValueError(f"{type(connection)=} != Connection")
 
-        query = _insert_table_query(
-            df, table_name, if_not_exists=if_not_exists, engine=engine
-        )
-        logger.info(f"Inserting table with query={query}")
-
         return connection.execute(query)
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 35
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 60
 def _drop_table(
     table_name: str,
     *,
@@ -554,7 +1198,157 @@ def _drop_table(
         # nosemgrep: python.lang.security.audit.formatted-sql-query.formatted-sql-query, python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query
         return connection.execute(query)
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 38
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 63
+CLICKHOUSE_PUSH_MAX_WORKERS = int(environ.get("CLICKHOUSE_PUSH_MAX_WORKERS", 4))
+CLICKHOUSE_PUSH_BATCH_SIZE = int(environ.get("CLICKHOUSE_PUSH_BATCH_SIZE", 100_000))
+
+
+def _insert_record_batch(
+    batch: "pa.RecordBatch", table_name: str, *, client: "Client"
+) -> int:
+    """Insert a record batch into a table with a single columnar insert over the native protocol
+
+    The columns are sent as numpy arrays, so the client must be created with the use_numpy setting.
+
+    Returns:
+        The number of rows inserted
+    """
+    columns = ", ".join(f"`{name}`" for name in batch.schema.names)
+    client.execute(
+        f"INSERT INTO {table_name} ({columns}) VALUES",
+        [column.to_numpy(zero_copy_only=False) for column in batch.columns],
+        columnar=True,
+    )
+    return batch.num_rows
+
+
+def _insert_record_batch_http(
+    batch: "pa.RecordBatch",
+    table_name: str,
+    *,
+    url: str,
+    username: str,
+    password: str,
+    database: str,
+    session: "requests.Session",
+) -> int:
+    """Insert a record batch into a table with a single insert of an Arrow stream over the HTTP interface
+
+    Returns:
+        The number of rows inserted
+    """
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+
+    columns = ", ".join(f"`{name}`" for name in batch.schema.names)
+    _post_clickhouse_http_query(
+        f"INSERT INTO {table_name} ({columns}) FORMAT ArrowStream",
+        url=url,
+        username=username,
+        password=password,
+        database=database,
+        data=sink.getvalue().to_pybytes(),
+        session=session,
+    )
+    return batch.num_rows
+
+
+def _insert_record_batches(
+    batches: Iterable["pa.RecordBatch"],
+    table_name: str,
+    *,
+    max_workers: int = CLICKHOUSE_PUSH_MAX_WORKERS,
+    username: str,
+    password: str,
+    host: str,
+    port: int,
+    database: str,
+    table: str,
+    protocol: str,
+) -> int:
+    """Insert record batches into a table, up to max_workers batches at a time
+
+    The batches are read from the iterable only when a worker is free, so at most max_workers + 1
+    batches are held in memory. The batches are inserted over the native protocol or, for http and https,
+    over the HTTP interface. Each worker creates a single client or HTTP session and reuses it for all
+    its batches.
+
+    Returns:
+        The number of rows inserted
+    """
+    import requests
+    from clickhouse_driver import Client
+
+    if protocol not in ["native", "http", "https"]:
+        raise ValueError(f"{protocol=} not in ['native', 'http', 'https']")
+
+    # User input is validated for SQL code injection
+    validate_user_inputs([table_name])
+
+    url = _get_clickhouse_http_url(host, port, protocol)
+    clients: List[Union[Client, requests.Session]] = []
+    clients_lock = threading.Lock()
+    worker = threading.local()
+
+    def insert(batch: "pa.RecordBatch") -> int:
+        client = getattr(worker, "client", None)
+        if client is None:
+            client = (
+                Client(
+                    host=host,
+                    port=port,
+                    user=username,
+                    password=password,
+                    database=database,
+                    settings={"use_numpy": True},
+                )
+                if protocol == "native"
+                else requests.Session()
+            )
+            worker.client = client
+            with clients_lock:
+                clients.append(client)
+        if protocol == "native":
+            return _insert_record_batch(batch, table_name, client=client)
+        return _insert_record_batch_http(
+            batch,
+            table_name,
+            url=url,
+            username=username,
+            password=password,
+            database=database,
+            session=client,
+        )
+
+    rows = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Set[Future] = set()
+        try:
+            for batch in batches:
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows = rows + sum(future.result() for future in done)
+                pending.add(executor.submit(insert, batch))
+            done, pending = wait(pending)
+            rows = rows + sum(future.result() for future in done)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            for client in clients:
+                if protocol == "native":
+                    client.disconnect()
+                else:
+                    client.close()
+    logger.info(f"Inserted {rows} rows to table '{table_name}'")
+    return rows
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 64
 def _insert_data(
     df: pd.DataFrame,
     table_name: str,
@@ -568,6 +1362,8 @@ def _insert_data(
     table: str,
     protocol: str,
 ) -> None:
+    import pyarrow as pa
+
     _insert_table(
         df,
         table_name,
@@ -579,7 +1375,13 @@ def _insert_data(
         table=table,
         protocol=protocol,
     )
-    with get_clickhouse_connection(  # type: ignore
+
+    logger.info(f"Inserting data to table '{table_name}'")
+    _insert_record_batches(
+        pa.Table.from_pandas(df, preserve_index=True).to_batches(
+            max_chunksize=CLICKHOUSE_PUSH_BATCH_SIZE
+        ),
+        table_name,
         username=username,
         password=password,
         host=host,
@@ -587,18 +1389,17 @@ def _insert_data(
         database=database,
         table=table,
         protocol=protocol,
-    ) as connection:
-        if not type(connection) == Connection:
-            raise ValueError(f"{type(connection)=} != Connection")
-
-        logger.info(f"Inserting data to table '{table_name}'")
-        df.to_sql(table_name, connection, if_exists="append")
+    )
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 40
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 67
 @call_parse  # type: ignore
 def clickhouse_push(prediction_push_id: int) -> None:
     """Push the data to a clickhouse database
 
+    The prediction is read one row group at a time and inserted in columnar batches by
+    CLICKHOUSE_PUSH_MAX_WORKERS threads. The number of rows pushed and the throughput are
+    stored in the prediction push.
+
     Args:
         prediction_push_id: Id of prediction_push
 
@@ -607,6 +1408,8 @@ def clickhouse_push(prediction_push_id: int) -> None:
         ```clickhouse_push 1
         ```
     """
+    import pyarrow.parquet as pq
+
     with get_session_with_context() as session:
         prediction_push = session.exec(
             select(PredictionPush).where(PredictionPush.id == prediction_push_id)
@@ -614,6 +1417,8 @@ def clickhouse_push(prediction_push_id: int) -> None:
 
         prediction_push.error = None
         prediction_push.completed_steps = 0
+        prediction_push.pushed_rows = None
+        prediction_push.rows_per_second = None
 
         (
             username,
@@ -634,9 +1439,23 @@ def clickhouse_push(prediction_push_id: int) -> None:
                 exist_ok=True,
                 parents=False,
             ) as s3_path:
-                df = pd.read_parquet(s3_path.as_path())
+                path = s3_path.as_path()
+                schema = pq.read_schema(next(path.glob("*.parquet")))
                 _insert_table(
-                    df,
+                    schema.empty_table().to_pandas(),
+                    table,
+                    username=username,
+                    password=password,
+                    host=host,
+                    port=port,
+                    database=database,
+                    table=table,
+                    protocol=protocol,
+                )
+
+                start = datetime.now()
+                pushed_rows = _insert_record_batches(
+                    iter_parquet_record_batches(path, CLICKHOUSE_PUSH_BATCH_SIZE),
                     table,
                     username=username,
                     password=password,
@@ -646,6 +1465,13 @@ def clickhouse_push(prediction_push_id: int) -> None:
                     table=table,
                     protocol=protocol,
                 )
+                duration = (datetime.now() - start).total_seconds()
+
+            prediction_push.pushed_rows = pushed_rows
+            prediction_push.rows_per_second = pushed_rows / max(duration, 1e-6)
+            logger.info(
+                f"Pushed {pushed_rows} rows in {duration:.1f} s ({prediction_push.rows_per_second:.0f} rows/s)"
+            )
             prediction_push.completed_steps = 1
         except Exception as e:
             prediction_push.error = truncate(str(e))
@@ -653,7 +1479,7 @@ def clickhouse_push(prediction_push_id: int) -> None:
         session.add(prediction_push)
         session.commit()
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 43
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 70
 def get_count(
     account_id: int,
     username: str,
@@ -700,7 +1526,7 @@ def get_count(
         count: int = result.fetchall()[0][0]
         return count
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 46
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 73
 def fillna(s: Optional[Any]) -> str:
     quote = "'"
     return f"{quote + '' + quote if (s is None) else quote + str(s) + quote}"
@@ -741,6 +1567,7 @@ def _get_count_for_account_id(
         database=database,
         table=table,
         protocol=protocol,
+        pooled=True,
     ) as connection:
         if not type(connection) == Connection:
             raise ValueError(f"{type(connection)=} != Connection")
@@ -768,7 +1595,7 @@ def _get_count_for_account_id(
                 f"More than one result returned from the database: {result}"
             )
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 48
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 75
 def get_count_for_account_id(
     account_id: Union[int, str],
 ) -> Tuple[Optional[int], Optional[datetime]]:
@@ -792,7 +1619,87 @@ def get_count_for_account_id(
         protocol=environ["KAFKA_CH_PROTOCOL"],
     )
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 52
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 78
+def _get_counts_for_account_ids(
+    account_ids: Sequence[Union[int, str]],
+    username: str,
+    password: str,
+    host: str,
+    port: int,
+    database: str,
+    table: str,
+    protocol: str,
+) -> Dict[int, Tuple[int, datetime]]:
+    """
+    Function to get counts for all the given account ids from given table with a single query
+
+    Args:
+        account_ids: account ids
+        username: Username of clickhouse database
+        password: Password of clickhouse database
+        host: Host of clickhouse database
+        port: Port of clickhouse database
+        table: Table of clickhouse database
+        database: Database to use
+        protocol: Protocol to connect to clickhouse (native/http)
+
+    Returns:
+        A dictionary mapping the account ids found in the db to pairs of count and timestamp
+    """
+    if len(account_ids) == 0:
+        return {}
+
+    with get_clickhouse_connection(  # type: ignore
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+        table=table,
+        protocol=protocol,
+        pooled=True,
+    ) as connection:
+        in_list = ", ".join(str(int(account_id)) for account_id in account_ids)
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query
+        query = (
+            f"SELECT AccountId, count() as count, now() as now FROM {database}.{table} "  # nosec B608
+            + f"WHERE AccountId IN ({in_list}) "
+            + "GROUP BY AccountId "
+        )
+
+        logger.info(f"Getting counts with query={query}")
+
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query
+        result = connection.execute(query).fetchall()
+
+    return {int(row[0]): (row[1], row[2]) for row in result}
+
+
+def get_counts_for_account_ids(
+    *,
+    account_ids: Sequence[Union[int, str]],
+) -> Dict[int, Tuple[int, datetime]]:
+    """
+    Get counts of all rows for the given account ids from clickhouse table with a single query
+
+    Args:
+        account_ids: List of account_ids to get counts
+
+    Returns:
+        A dictionary mapping the account ids found in the db to pairs of count and timestamp
+    """
+    return _get_counts_for_account_ids(
+        account_ids=account_ids,
+        username=environ["KAFKA_CH_USERNAME"],
+        password=environ["KAFKA_CH_PASSWORD"],
+        host=environ["KAFKA_CH_HOST"],
+        port=int(environ["KAFKA_CH_PORT"]),
+        database=environ["KAFKA_CH_DATABASE"],
+        table=environ["KAFKA_CH_TABLE"],
+        protocol=environ["KAFKA_CH_PROTOCOL"],
+    )
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 81
 def _get_all_person_ids_for_account_id(
     account_id: Union[int, str],
     username: str,
@@ -827,6 +1734,7 @@ def _get_all_person_ids_for_account_id(
         database=database,
         table=table,
         protocol=protocol,
+        pooled=True,
     ) as connection:
         if not type(connection) == Connection:
             raise ValueError(f"{type(connection)=} != Connection")
@@ -842,7 +1750,7 @@ def _get_all_person_ids_for_account_id(
         df = pd.read_sql(sql=query, con=connection)
     return df.iloc[:, 0]
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 54
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 83
 def get_all_person_ids_for_account_id(
     *,
     account_id: Union[int, str],
@@ -867,7 +1775,191 @@ def get_all_person_ids_for_account_id(
         protocol=environ["KAFKA_CH_PROTOCOL"],
     )
 
-# %% ../../notebooks/DataBlob_Clickhouse.ipynb 56
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 85
+def _get_person_ids_for_account_id_after(
+    *,
+    account_id: Union[int, str],
+    after: Optional[int] = None,
+    batch_size: int = 100_000,
+    username: str,
+    password: str,
+    host: str,
+    port: int,
+    database: str,
+    table: str,
+    protocol: str,
+) -> np.ndarray:
+    """
+    Internal function to get the next batch of person ids for the given account id from clickhouse table
+
+    Every batch is fetched with a short query, so the connection goes back to the pool as soon as it is read.
+
+    Args:
+        account_id: Account id
+        after: Only person ids greater than this one are returned, **None** for the first batch
+        batch_size: Maximal number of person ids in the batch
+        username: Username of clickhouse database
+        password: Password of clickhouse database
+        host: Host of clickhouse database
+        port: Port of clickhouse database
+        table: Table of clickhouse database
+        database: Database to use
+        protocol: Protocol to connect to clickhouse (native/http)
+
+    Returns:
+        A numpy array of person ids sorted in ascending order
+    """
+    with get_clickhouse_connection(  # type: ignore
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+        table=table,
+        protocol=protocol,
+        pooled=True,
+    ) as connection:
+        after_str = "" if after is None else f"AND PersonId>{int(after)} "
+        query = (
+            f"SELECT DISTINCT PersonId FROM {database}.{table} "  # nosec B608
+            + f"WHERE AccountId={account_id} "
+            + after_str
+            + f"ORDER BY PersonId LIMIT {int(batch_size)}"
+        )
+        logger.info(f"Getting person ids with query={query}")
+
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query
+        rows = connection.execute(query).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype="int64", count=len(rows))
+
+
+def _iter_person_ids_for_account_id(
+    *,
+    account_id: Union[int, str],
+    batch_size: int = 100_000,
+    username: str,
+    password: str,
+    host: str,
+    port: int,
+    database: str,
+    table: str,
+    protocol: str,
+) -> Iterator[np.ndarray]:
+    """
+    Internal function to get all person ids for the given account id from clickhouse table in batches
+
+    The batches are fetched one at a time with keyset pagination on PersonId, so only one batch is held
+    in memory and no connection is held between the batches.
+
+    Args:
+        account_id: Account id
+        batch_size: Maximal number of person ids in each batch
+        username: Username of clickhouse database
+        password: Password of clickhouse database
+        host: Host of clickhouse database
+        port: Port of clickhouse database
+        table: Table of clickhouse database
+        database: Database to use
+        protocol: Protocol to connect to clickhouse (native/http)
+
+    Returns:
+        An iterator of numpy arrays of person ids sorted in ascending order
+    """
+    after: Optional[int] = None
+    while True:
+        person_ids = _get_person_ids_for_account_id_after(
+            account_id=account_id,
+            after=after,
+            batch_size=batch_size,
+            username=username,
+            password=password,
+            host=host,
+            port=port,
+            database=database,
+            table=table,
+            protocol=protocol,
+        )
+        if len(person_ids) > 0:
+            yield person_ids
+        if len(person_ids) < batch_size:
+            return
+        after = int(person_ids[-1])
+
+
+def iter_person_ids_for_account_id(
+    *,
+    account_id: Union[int, str],
+    batch_size: int = 100_000,
+) -> Iterator[np.ndarray]:
+    """
+    Function to get all person ids for the given account id from clickhouse table in batches
+
+    Args:
+        account_id: Account id
+        batch_size: Maximal number of person ids in each batch
+
+    Returns:
+        An iterator of numpy arrays of person ids sorted in ascending order
+    """
+    return _iter_person_ids_for_account_id(
+        account_id=account_id,
+        batch_size=batch_size,
+        username=environ["KAFKA_CH_USERNAME"],
+        password=environ["KAFKA_CH_PASSWORD"],
+        host=environ["KAFKA_CH_HOST"],
+        port=int(environ["KAFKA_CH_PORT"]),
+        database=environ["KAFKA_CH_DATABASE"],
+        table=environ["KAFKA_CH_TABLE"],
+        protocol=environ["KAFKA_CH_PROTOCOL"],
+    )
+
+# %% ../../notebooks/DataBlob_Clickhouse.ipynb 87
+def _split_at_index_boundaries(
+    tables: Iterable["pa.Table"], column: str
+) -> Iterator["pa.Table"]:
+    """Move the rows with the last value of the column of each table sorted by it to the next table
+
+    This way no value of the column spans two tables, just like the index after DataFrame.set_index in dask.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    carry: Optional["pa.Table"] = None
+    for table in tables:
+        if carry is not None:
+            table = pa.concat_tables([carry, table])
+        if table.num_rows == 0:
+            continue
+        values = table.column(column)
+        n_last = pc.sum(pc.equal(values, values[-1])).as_py()
+        carry = table.slice(table.num_rows - n_last)
+        if n_last < table.num_rows:
+            yield table.slice(0, table.num_rows - n_last)
+    if carry is not None:
+        yield carry
+
+
+def _get_account_id_rows_schema(table: "pa.Table") -> "pa.Schema":
+    """Get the schema of the parts written for an account from the schema of the fetched rows
+
+    AccountId is an int64 and PersonId is stored last, with the pandas metadata of a dataframe
+    indexed by it, the same as if the rows were written with DataFrame.to_parquet. Only the first
+    row of the table is converted to pandas to create the metadata.
+    """
+    import pyarrow as pa
+
+    sample = table.slice(0, 1).to_pandas().astype({"AccountId": "int64"})
+    metadata = pa.Schema.from_pandas(
+        sample.set_index("PersonId"), preserve_index=True
+    ).metadata
+    fields = [
+        pa.field("AccountId", pa.int64()) if f.name == "AccountId" else f
+        for f in table.schema
+        if f.name != "PersonId"
+    ]
+    return pa.schema(fields + [table.schema.field("PersonId")], metadata=metadata)
+
+
 def _download_account_id_rows_as_parquet(
     *,
     account_id: Union[int, str],
@@ -881,8 +1973,19 @@ def _download_account_id_rows_as_parquet(
     chunksize: Optional[int] = 1_000_000,
     index_column: str = "PersonId",
     output_path: Path,
+    fetch_mode: str = ClickHouseFetchMode.sql,
 ) -> None:
-    with get_clickhouse_connection(  # type: ignore
+    import pyarrow.parquet as pq
+
+    fetch_mode = ClickHouseFetchMode(fetch_mode)
+
+    query = f"SELECT * FROM {table} WHERE AccountId={account_id} ORDER BY PersonId ASC"  # nosec B608
+    logger.info(f"_download_account_id_rows_as_parquet(): {query=}")
+
+    tables = _fetch_clickhouse_query_as_tables(
+        query,
+        chunksize=chunksize,
+        fetch_mode=fetch_mode,
         username=username,
         password=password,
         host=host,
@@ -890,37 +1993,36 @@ def _download_account_id_rows_as_parquet(
         database=database,
         table=table,
         protocol=protocol,
-    ) as connection:
-        with tempfile.TemporaryDirectory() as td:
-            d = Path(td)
-            i = 0
-
-            query = f"SELECT * FROM {table} WHERE AccountId={account_id} ORDER BY PersonId ASC"  # nosec B608
-            #             query = f"SELECT * FROM {table} WHERE AccountId={account_id} ORDER BY PersonId ASC"  # nosec B608
-            logger.info(f"_download_account_id_rows_as_parquet(): {query=}")
-
-            for df in pd.read_sql(sql=query, con=connection, chunksize=chunksize):
-                fname = d / f"clickhouse_data_{i:09d}.parquet"
-                logger.info(
-                    f"_download_account_id_rows_as_parquet() Writing data retrieved from the database to temporary file: {fname}"
-                )
-                df.to_parquet(fname, engine="pyarrow")  # type: ignore
-                i = i + 1
+        pooled=True,
+    )
+    schema: Optional["pa.Schema"] = None
 
-            engine = get_default_engine()
-            logger.info(
-                f"_download_account_id_rows_as_parquet() Rewriting temporary parquet files from {d / f'clickhouse_data_*.parquet'} to output directory {output_path}"
-            )
-            ddf = engine.dd.read_parquet(
-                d,
-                blocksize=None,
-            )
-            ddf["AccountId"] = ddf["AccountId"].astype("int64")
-            ddf = ddf.set_index("PersonId")
-            ddf.to_parquet(output_path, engine="pyarrow")
+    def to_part(table: "pa.Table") -> "pa.Table":
+        nonlocal schema
+        if schema is None:
+            schema = _get_account_id_rows_schema(table)
+        return table.select(schema.names).cast(schema)
+
+    # Rows are sorted by PersonId, so the chunks are written directly as the parts of the dataset
+    logger.info(
+        f"_download_account_id_rows_as_parquet() Writing data retrieved from the database to output directory {output_path}"
+    )
+    n_parts = write_parquet_dataset(
+        (
+            to_part(table)
+            for table in _split_at_index_boundaries(tables, column="PersonId")
+        ),
+        output_path,
+    )
 
-            # test if everything is ok
-            test_ddf = engine.dd.read_parquet(output_path).head()
+    # The statistics in _metadata give the divisions, so the dataset can be read with a known index without a shuffle
+    if n_parts > 0:
+        divisions = get_parquet_dataset_divisions(
+            pq.read_metadata(output_path / "_metadata"), "PersonId"
+        )
+        logger.info(
+            f"_download_account_id_rows_as_parquet() Written {n_parts} parts with PersonId from {divisions[0]} to {divisions[-1]}"
+        )
 
 
 def download_account_id_rows_as_parquet(
@@ -929,12 +2031,16 @@ def download_account_id_rows_as_parquet(
     chunksize: Optional[int] = 1_000_000,
     index_column: str = "PersonId",
     output_path: Path,
+    fetch_mode: Optional[str] = None,
 ) -> None:
     return _download_account_id_rows_as_parquet(
         account_id=account_id,
         chunksize=chunksize,
         index_column=index_column,
         output_path=output_path,
+        fetch_mode=fetch_mode
+        if fetch_mode is not None
+        else environ.get("KAFKA_CH_FETCH_MODE", ClickHouseFetchMode.sql),
         username=environ["KAFKA_CH_USERNAME"],
         password=environ["KAFKA_CH_PASSWORD"],
         host=environ["KAFKA_CH_HOST"],
@@ -5,7 +5,8 @@ __all__ = ['datablob_router', 'S3Request', 'CloudProvider', 'FromS3Request', 'fr
            'FromAzureBlobStorageRequest', 'from_azure_blob_storage_route', 'DBRequest', 'FromDBRequest',
            'from_mysql_route', 'ClickHouseRequest', 'FromClickHouseRequest', 'from_clickhouse_route',
            'FromLocalRequest', 'FromLocalResponse', 'from_local_start_route', 'FileType', 'ToDataSourceRequest',
-           'to_datasource_route', 'get_details_of_datablob', 'delete_datablob', 'get_all_datablobs', 'tag_datablob']
+           'to_datasource_route', 'RefreshFromClickHouseRequest', 'refresh_from_clickhouse_route',
+           'get_details_of_datablob', 'delete_datablob', 'get_all_datablobs', 'tag_datablob']
 
 # %% ../../notebooks/DataBlob_Router.ipynb 3
 import json
@@ -25,8 +26,10 @@ from botocore.client import Config
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.exc import StaleDataError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 import airt_service
 import airt_service.sanitizer
@@ -35,11 +38,16 @@ from ..auth import get_current_active_user
 from airt_service.aws.utils import (
     create_s3_datablob_path,
     get_s3_bucket_and_path_from_uri,
+    get_s3_client,
     verify_aws_region,
 )
 from ..azure.utils import verify_azure_region
 from ..batch_job import create_batch_job
-from .clickhouse import create_db_uri_for_clickhouse_datablob
+from airt_service.data.clickhouse import (
+    ClickHouseFetchMode,
+    ClickHousePartitionPlanning,
+    create_db_uri_for_clickhouse_datablob,
+)
 from .datasource import DataSource
 from airt_service.data.utils import (
     create_db_uri_for_azure_blob_storage_datablob,
@@ -55,6 +63,7 @@ from airt_service.db.models import (
     Tag,
     TagCreate,
     User,
+    get_async_session,
     get_session,
 )
 from ..errors import ERRORS, HTTPError
@@ -588,6 +597,8 @@ class FromClickHouseRequest(ClickHouseRequest):
         index_column: Column to use to partition rows and to use as index
         timestamp_column: Timestamp column
         filters: Additional column filters as a dictionary
+        fetch_mode: Way to fetch the rows, sql (default) or arrow
+        partition_planning: Way to split the rows into partitions, exact (default) or approximate
         cloud_provider: Cloud provider to save files
         region: Region of the cloud provider
         tag: Tag to add to the datablob
@@ -596,6 +607,8 @@ class FromClickHouseRequest(ClickHouseRequest):
     index_column: str
     timestamp_column: str
     filters: Optional[Dict[str, Any]] = None
+    fetch_mode: ClickHouseFetchMode = ClickHouseFetchMode.sql
+    partition_planning: ClickHousePartitionPlanning = ClickHousePartitionPlanning.exact
     cloud_provider: CloudProvider = "azure"  # type: ignore
     region: str = "westeurope"
     tag: Optional[str] = None
@@ -604,6 +617,33 @@ class FromClickHouseRequest(ClickHouseRequest):
         use_enum_values = True
 
 # %% ../../notebooks/DataBlob_Router.ipynb 34
+def _get_clickhouse_pull_command(
+    *,
+    datablob_id: int,
+    clickhouse_pull_request: Union[
+        "FromClickHouseRequest", "RefreshFromClickHouseRequest"
+    ],
+    incremental: bool = False,
+) -> str:
+    """Create the clickhouse_pull command for a from_clickhouse or a refresh_from_clickhouse request"""
+    command = f"clickhouse_pull {datablob_id} {clickhouse_pull_request.index_column} {clickhouse_pull_request.timestamp_column}"
+    if clickhouse_pull_request.filters:
+        command = (
+            command
+            + f" --filters_json {shlex.quote(json.dumps(clickhouse_pull_request.filters))}"
+        )
+    if clickhouse_pull_request.fetch_mode != ClickHouseFetchMode.sql:
+        command = command + f" --fetch_mode {clickhouse_pull_request.fetch_mode}"
+    if clickhouse_pull_request.partition_planning != ClickHousePartitionPlanning.exact:
+        command = (
+            command
+            + f" --partition_planning {clickhouse_pull_request.partition_planning}"
+        )
+    if incremental:
+        command = command + " --incremental"
+    return command
+
+# %% ../../notebooks/DataBlob_Router.ipynb 35
 @patch(cls_method=True)  # type: ignore
 def from_clickhouse(
     cls: DataBlob,
@@ -661,12 +701,10 @@ def from_clickhouse(
             session=session,
         )
 
-    command = f"clickhouse_pull {datablob.id} {from_clickhouse_request.index_column} {from_clickhouse_request.timestamp_column}"
-    if from_clickhouse_request.filters:
-        command = (
-            command
-            + f" --filters_json {shlex.quote(json.dumps(from_clickhouse_request.filters))}"
-        )
+    command = _get_clickhouse_pull_command(
+        datablob_id=datablob.id,  # type: ignore
+        clickhouse_pull_request=from_clickhouse_request,
+    )
 
     create_batch_job(
         command=command,
@@ -677,7 +715,7 @@ def from_clickhouse(
     )
     return datablob
 
-# %% ../../notebooks/DataBlob_Router.ipynb 35
+# %% ../../notebooks/DataBlob_Router.ipynb 36
 @datablob_router.post(
     "/from_clickhouse", response_model=DataBlobRead, responses=create_datablob_responses  # type: ignore
 )
@@ -697,7 +735,7 @@ def from_clickhouse_route(
         background_tasks=background_tasks,
     )
 
-# %% ../../notebooks/DataBlob_Router.ipynb 37
+# %% ../../notebooks/DataBlob_Router.ipynb 38
 class FromLocalRequest(BaseModel):
     """Request object for from_local route
 
@@ -730,7 +768,7 @@ class FromLocalResponse(BaseModel):
     type: str
     presigned: Dict[str, Any]
 
-# %% ../../notebooks/DataBlob_Router.ipynb 38
+# %% ../../notebooks/DataBlob_Router.ipynb 39
 @patch(cls_method=True)  # type: ignore
 def from_local(
     cls: DataBlob,
@@ -781,9 +819,7 @@ def from_local(
         datablob.uri = uri
         session.add(datablob)
 
-    presigned = boto3.client(
-        "s3", region_name=region, config=Config(signature_version="s3v4")
-    ).generate_presigned_post(
+    presigned = get_s3_client(region).generate_presigned_post(
         Bucket=destination_bucket.name,
         Key=s3_path + "/" + "${filename}",
         Fields=None,
@@ -796,7 +832,7 @@ def from_local(
     logger.info(f"DataBlob.from_local(): {from_local_response.__repr__()}")
     return from_local_response
 
-# %% ../../notebooks/DataBlob_Router.ipynb 39
+# %% ../../notebooks/DataBlob_Router.ipynb 40
 @datablob_router.post(
     "/from_local/start",
     response_model=FromLocalResponse,
@@ -818,7 +854,7 @@ def from_local_start_route(
         session=session,
     )
 
-# %% ../../notebooks/DataBlob_Router.ipynb 41
+# %% ../../notebooks/DataBlob_Router.ipynb 42
 get_datablob_responses = {
     400: {"model": HTTPError, "description": ERRORS["INCORRECT_DATABLOB_ID"]},
     422: {"model": HTTPError, "description": "DataBlob error"},
@@ -863,7 +899,60 @@ def get(cls: DataBlob, uuid: str, user: User, session: Session) -> DataBlob:
 
     return datablob
 
-# %% ../../notebooks/DataBlob_Router.ipynb 44
+# %% ../../notebooks/DataBlob_Router.ipynb 45
+# relationships used by DataBlobRead, they can't be lazy loaded with an async session
+_datablob_read_options = [
+    selectinload(DataBlob.user),  # type: ignore
+    selectinload(DataBlob.datasources),  # type: ignore
+    selectinload(DataBlob.tags),  # type: ignore
+]
+
+
+@patch(cls_method=True)  # type: ignore
+async def get_async(
+    cls: DataBlob, uuid: str, user: User, session: AsyncSession
+) -> DataBlob:
+    """Get datablob based on uuid using an async session
+
+    Args:
+        uuid: Datablob uuid
+        user: User object
+        session: Sqlmodel async session
+
+    Returns:
+        The datablob object for given datablob uuid
+
+    Raises:
+        HTTPException: if datablob id is incorrect or if datablob is deleted
+    """
+    try:
+        datablob = (
+            await session.exec(
+                select(DataBlob)
+                .where(DataBlob.uuid == uuid, DataBlob.user_id == user.id)
+                .options(*_datablob_read_options)
+            )
+        ).one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["INCORRECT_DATABLOB_ID"],
+        )
+
+    if datablob.disabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["DATABLOB_IS_DELETED"],
+        )
+
+    if datablob.error is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=datablob.error
+        )
+
+    return datablob
+
+# %% ../../notebooks/DataBlob_Router.ipynb 47
 @patch  # type: ignore
 def is_ready(self: DataBlob) -> None:
     """Check if the datablob's completed steps equal to total steps, else raise HTTPException"""
@@ -879,7 +968,7 @@ def is_ready(self: DataBlob) -> None:
                 detail=ERRORS["DATABLOB_CSV_FILES_NOT_AVAILABLE"],
             )
 
-# %% ../../notebooks/DataBlob_Router.ipynb 45
+# %% ../../notebooks/DataBlob_Router.ipynb 48
 class FileType(str, Enum):
     csv = "csv"
     parquet = "parquet"
@@ -909,7 +998,7 @@ class ToDataSourceRequest(BaseModel):
     class Config:
         use_enum_values = True
 
-# %% ../../notebooks/DataBlob_Router.ipynb 46
+# %% ../../notebooks/DataBlob_Router.ipynb 49
 @patch  # type: ignore
 def to_datasource(
     self: DataBlob,
@@ -960,7 +1049,7 @@ def to_datasource(
 
     return datasource
 
-# %% ../../notebooks/DataBlob_Router.ipynb 47
+# %% ../../notebooks/DataBlob_Router.ipynb 50
 @datablob_router.post(
     "/{datablob_uuid}/to_datasource",
     status_code=status.HTTP_202_ACCEPTED,
@@ -984,21 +1073,106 @@ def to_datasource_route(
     )
     return datasource
 
-# %% ../../notebooks/DataBlob_Router.ipynb 50
+# %% ../../notebooks/DataBlob_Router.ipynb 53
+class RefreshFromClickHouseRequest(BaseModel):
+    """Request object for the /datablob/{datablob_uuid}/refresh_from_clickhouse route
+
+    Args:
+        index_column: Column to use to partition rows and to use as index
+        timestamp_column: Timestamp column, only the rows newer than the last pull are downloaded
+        filters: Additional column filters as a dictionary
+        fetch_mode: Way to fetch the rows, sql (default) or arrow
+        partition_planning: Way to split the rows into partitions, exact (default) or approximate
+    """
+
+    index_column: str
+    timestamp_column: str
+    filters: Optional[Dict[str, Any]] = None
+    fetch_mode: ClickHouseFetchMode = ClickHouseFetchMode.sql
+    partition_planning: ClickHousePartitionPlanning = ClickHousePartitionPlanning.exact
+
+    class Config:
+        use_enum_values = True
+
+# %% ../../notebooks/DataBlob_Router.ipynb 54
+@patch  # type: ignore
+def refresh_from_clickhouse(
+    self: DataBlob,
+    refresh_from_clickhouse_request: RefreshFromClickHouseRequest,
+    background_tasks: BackgroundTasks,
+) -> DataBlob:
+    """Append the rows added to the clickhouse table since the last pull to the datablob
+
+    The rows newer than the max timestamp of the last pull are downloaded and stored as new parquet
+    files next to the existing ones. If the datablob has no record of the last pull, it is pulled again
+    in full.
+
+    Args:
+        refresh_from_clickhouse_request: The refresh_from_clickhouse request
+        background_tasks: BackgroundTasks object
+
+    Returns:
+        The datablob being refreshed
+    """
+    if self.source is None or not self.source.startswith("clickhouse"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{ERRORS['PULL_NOT_AVAILABLE']} for datablob source {self.source}",
+        )
+    self.is_ready()  # type: ignore
+
+    command = _get_clickhouse_pull_command(
+        datablob_id=self.id,  # type: ignore
+        clickhouse_pull_request=refresh_from_clickhouse_request,
+        incremental=True,
+    )
+
+    create_batch_job(
+        command=command,
+        task="csv_processing",
+        cloud_provider=self.cloud_provider,
+        region=self.region,
+        background_tasks=background_tasks,
+    )
+    return self
+
+# %% ../../notebooks/DataBlob_Router.ipynb 55
+@datablob_router.post(
+    "/{datablob_uuid}/refresh_from_clickhouse",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=DataBlobRead,
+    responses=get_datablob_responses,  # type: ignore
+)
+def refresh_from_clickhouse_route(
+    *,
+    datablob_uuid: str,
+    refresh_from_clickhouse_request: RefreshFromClickHouseRequest,
+    user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+    background_tasks: BackgroundTasks,
+) -> DataBlob:
+    """Append the rows added to the clickhouse table since the last pull to the datablob"""
+    user = session.merge(user)
+    datablob = DataBlob.get(uuid=datablob_uuid, user=user, session=session)  # type: ignore
+
+    return datablob.refresh_from_clickhouse(
+        refresh_from_clickhouse_request, background_tasks
+    )
+
+# %% ../../notebooks/DataBlob_Router.ipynb 57
 @datablob_router.get(
     "/{datablob_uuid}", response_model=DataBlobRead, responses=get_datablob_responses  # type: ignore
 )
-def get_details_of_datablob(
+async def get_details_of_datablob(
     datablob_uuid: str,
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> DataBlob:
     """Get details of the datablob"""
-    user = session.merge(user)
-    datablob: DataBlob = DataBlob.get(uuid=datablob_uuid, user=user, session=session)  # type: ignore
+    datablob: DataBlob = await DataBlob.get_async(uuid=datablob_uuid, user=user, session=session)  # type: ignore
     return datablob
 
-# %% ../../notebooks/DataBlob_Router.ipynb 53
+# %% ../../notebooks/DataBlob_Router.ipynb 60
 @patch  # type: ignore
 def delete(self: DataBlob, user: User, session: Session) -> DataBlob:
     """Delete a datablob
@@ -1016,7 +1190,7 @@ def delete(self: DataBlob, user: User, session: Session) -> DataBlob:
 
     return self
 
-# %% ../../notebooks/DataBlob_Router.ipynb 54
+# %% ../../notebooks/DataBlob_Router.ipynb 61
 @datablob_router.delete(
     "/{datablob_uuid}",
     response_model=DataBlobRead,
@@ -1033,7 +1207,7 @@ def delete_datablob(
 
     return datablob.delete(user, session)  # type: ignore
 
-# %% ../../notebooks/DataBlob_Router.ipynb 56
+# %% ../../notebooks/DataBlob_Router.ipynb 63
 @patch(cls_method=True)  # type: ignore
 def get_all(
     cls: DataBlob,
@@ -1064,21 +1238,52 @@ def get_all(
     # get all data sources from db
     return session.exec(statement.offset(offset).limit(limit)).all()
 
-# %% ../../notebooks/DataBlob_Router.ipynb 57
+# %% ../../notebooks/DataBlob_Router.ipynb 64
+@patch(cls_method=True)  # type: ignore
+async def get_all_async(
+    cls: DataBlob,
+    disabled: bool,
+    completed: bool,
+    offset: int,
+    limit: int,
+    user: User,
+    session: AsyncSession,
+) -> List[DataBlob]:
+    """Get all datablobs created by the user using an async session
+
+    Args:
+        disabled: Whether to get disabled datablobs
+        completed: Whether to include only datablobs which are successfully pulled from its source
+        offset: Offset results by given integer
+        limit: Limit results by given integer
+        user: User object
+        session: Sqlmodel async session
+
+    Returns:
+        A list of datablob objects
+    """
+    statement = select(DataBlob).where(DataBlob.user_id == user.id)
+    statement = statement.where(DataBlob.disabled == disabled)
+    if completed:
+        statement = statement.where(DataBlob.completed_steps == DataBlob.total_steps)
+    statement = statement.options(*_datablob_read_options)
+    # get all data sources from db
+    return (await session.exec(statement.offset(offset).limit(limit))).all()
+
+# %% ../../notebooks/DataBlob_Router.ipynb 65
 @datablob_router.get("/", response_model=List[DataBlobRead])
-def get_all_datablobs(
+async def get_all_datablobs(
     disabled: bool = False,
     completed: bool = False,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> List[DataBlob]:
     """
     Get all datablobs created by user
     """
-    user = session.merge(user)
-    return DataBlob.get_all(
+    return await DataBlob.get_all_async(  # type: ignore
         disabled=disabled,
         completed=completed,
         offset=offset,
@@ -1087,7 +1292,7 @@ def get_all_datablobs(
         session=session,
     )
 
-# %% ../../notebooks/DataBlob_Router.ipynb 60
+# %% ../../notebooks/DataBlob_Router.ipynb 68
 @patch  # type: ignore
 def tag(self: DataBlob, tag_name: str, session: Session) -> DataBlob:
     """Tag an existing datablob
@@ -1106,7 +1311,7 @@ def tag(self: DataBlob, tag_name: str, session: Session) -> DataBlob:
 
     return self
 
-# %% ../../notebooks/DataBlob_Router.ipynb 61
+# %% ../../notebooks/DataBlob_Router.ipynb 69
 @datablob_router.post("/{datablob_uuid}/tag", response_model=DataBlobRead)
 def tag_datablob(
     datablob_uuid: str,
@@ -16,7 +16,9 @@ from airt.remote_path import RemotePath
 from checksumdir import dirhash
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 import airt_service.sanitizer
 
@@ -31,6 +33,7 @@ from airt_service.db.models import (
     Tag,
     TagCreate,
     User,
+    get_async_session,
     get_session,
 )
 from ..errors import ERRORS, HTTPError
@@ -147,23 +150,75 @@ def get(cls: DataSource, uuid: str, user: User, session: Session) -> DataSource:
     return datasource
 
 # %% ../../notebooks/DataSource_Router.ipynb 16
+# relationships used by DataSourceRead, they can't be lazy loaded with an async session
+_datasource_read_options = [
+    selectinload(DataSource.user),  # type: ignore
+    selectinload(DataSource.datablob),  # type: ignore
+    selectinload(DataSource.tags),  # type: ignore
+]
+
+
+@patch(cls_method=True)  # type: ignore
+async def get_async(
+    cls: DataSource, uuid: str, user: User, session: AsyncSession
+) -> DataSource:
+    """Get datasource based on uuid using an async session
+
+    Args:
+        uuid: Datasource uuid
+        user: User object
+        session: Sqlmodel async session
+
+    Returns:
+        Datasource object for given datasource uuid
+
+    Raises:
+        HTTPException: if datasource id is incorrect or if datasource is deleted
+    """
+    try:
+        datasource = (
+            await session.exec(
+                select(DataSource)
+                .where(DataSource.uuid == uuid, DataSource.user_id == user.id)
+                .options(*_datasource_read_options)
+            )
+        ).one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["INCORRECT_DATASOURCE_ID"],
+        )
+
+    if datasource.disabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["DATASOURCE_IS_DELETED"],
+        )
+
+    if datasource.error is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=datasource.error
+        )
+
+    return datasource
+
+# %% ../../notebooks/DataSource_Router.ipynb 18
 @datasource_router.get(
     "/{datasource_uuid}",
     response_model=DataSourceRead,
     responses=get_datasource_responses,  # type: ignore
 )
-def get_details_of_datasource(
+async def get_details_of_datasource(
     datasource_uuid: str,
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> DataSource:
     """Get details of the datasource"""
-    user = session.merge(user)
-    datasource: DataSource = DataSource.get(uuid=datasource_uuid, user=user, session=session)  # type: ignore
+    datasource: DataSource = await DataSource.get_async(uuid=datasource_uuid, user=user, session=session)  # type: ignore
 
     return datasource
 
-# %% ../../notebooks/DataSource_Router.ipynb 19
+# %% ../../notebooks/DataSource_Router.ipynb 21
 @patch  # type: ignore
 def delete(self: DataSource, user: User, session: Session) -> DataSource:
     """Delete a datasource
@@ -180,7 +235,7 @@ def delete(self: DataSource, user: User, session: Session) -> DataSource:
 
     return self
 
-# %% ../../notebooks/DataSource_Router.ipynb 20
+# %% ../../notebooks/DataSource_Router.ipynb 22
 @datasource_router.delete(
     "/{datasource_uuid}",
     response_model=DataSourceRead,
@@ -197,7 +252,7 @@ def delete_datasource(
 
     return datasource.delete(user, session)  # type: ignore
 
-# %% ../../notebooks/DataSource_Router.ipynb 23
+# %% ../../notebooks/DataSource_Router.ipynb 25
 def _get_ds_head_and_dtypes(datasource_s3_path: str) -> Dict[str, Any]:
     """Read the head metadata file and return its contents as a dict
 
@@ -220,7 +275,7 @@ def _get_ds_head_and_dtypes(datasource_s3_path: str) -> Dict[str, Any]:
         df = pd.read_parquet(processed_local_metadata_path / DS_HEAD_FILE_NAME)
         return df_to_dict(df)
 
-# %% ../../notebooks/DataSource_Router.ipynb 25
+# %% ../../notebooks/DataSource_Router.ipynb 27
 @patch  # type: ignore
 def is_ready(self: DataSource) -> None:
     """Check if the datasource's completed steps equal to total steps, else raise HTTPException"""
@@ -230,7 +285,7 @@ def is_ready(self: DataSource) -> None:
             detail=ERRORS["DATASOURCE_IS_NOT_PULLED"],
         )
 
-# %% ../../notebooks/DataSource_Router.ipynb 26
+# %% ../../notebooks/DataSource_Router.ipynb 28
 @datasource_router.get(
     "/{datasource_uuid}/head",
     responses={
@@ -251,7 +306,7 @@ def datasource_head_route(
     df_dict = _get_ds_head_and_dtypes(datasource_s3_path=datasource.path)
     return df_dict
 
-# %% ../../notebooks/DataSource_Router.ipynb 29
+# %% ../../notebooks/DataSource_Router.ipynb 31
 @datasource_router.get(
     "/{datasource_uuid}/dtypes",
     responses={
@@ -273,7 +328,7 @@ def datasource_dtypes_route(
     df_dict = _get_ds_head_and_dtypes(datasource_s3_path=datasource.path)
     return df_dict["dtypes"]  # type: ignore
 
-# %% ../../notebooks/DataSource_Router.ipynb 32
+# %% ../../notebooks/DataSource_Router.ipynb 34
 @patch(cls_method=True)  # type: ignore
 def get_all(
     cls: DataSource,
@@ -306,19 +361,52 @@ def get_all(
     # get all data sources from db
     return session.exec(statement.offset(offset).limit(limit)).all()
 
-# %% ../../notebooks/DataSource_Router.ipynb 33
+# %% ../../notebooks/DataSource_Router.ipynb 35
+@patch(cls_method=True)  # type: ignore
+async def get_all_async(
+    cls: DataSource,
+    disabled: bool,
+    completed: bool,
+    offset: int,
+    limit: int,
+    user: User,
+    session: AsyncSession,
+) -> List[DataSource]:
+    """Get all datasources created by the user using an async session
+
+    Args:
+        disabled: Whether to get disabled datasources
+        completed: Whether to include only datasources which are pulled from its source
+        offset: Offset results by given integer
+        limit: Limit results by given integer
+        user: User object
+        session: Sqlmodel async session
+
+    Returns:
+        A list of datasource objects
+    """
+    statement = select(DataSource).where(DataSource.user_id == user.id)
+    statement = statement.where(DataSource.disabled == disabled)
+    if completed:
+        statement = statement.where(
+            DataSource.completed_steps == DataSource.total_steps
+        )
+    statement = statement.options(*_datasource_read_options)
+    # get all data sources from db
+    return (await session.exec(statement.offset(offset).limit(limit))).all()
+
+# %% ../../notebooks/DataSource_Router.ipynb 36
 @datasource_router.get("/", response_model=List[DataSourceRead])
-def get_all_datasources(
+async def get_all_datasources(
     disabled: bool = False,
     completed: bool = False,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> List[DataSource]:
     """Get all datasources created by user"""
-    user = session.merge(user)
-    return DataSource.get_all(
+    return await DataSource.get_all_async(  # type: ignore
         disabled=disabled,
         completed=completed,
         offset=offset,
@@ -327,7 +415,7 @@ def get_all_datasources(
         session=session,
     )
 
-# %% ../../notebooks/DataSource_Router.ipynb 36
+# %% ../../notebooks/DataSource_Router.ipynb 39
 @patch  # type: ignore
 def tag(self: DataSource, tag_name: str, session: Session) -> DataSource:
     """Tag an existing datasource
@@ -347,7 +435,7 @@ def tag(self: DataSource, tag_name: str, session: Session) -> DataSource:
 
     return self
 
-# %% ../../notebooks/DataSource_Router.ipynb 37
+# %% ../../notebooks/DataSource_Router.ipynb 40
 @datasource_router.post("/{datasource_uuid}/tag", response_model=DataSourceRead)
 def tag_datasource(
     datasource_uuid: str,
@@ -361,7 +449,7 @@ def tag_datasource(
 
     return datasource.tag(tag_name=tag_to_create.name, session=session)  # type: ignore
 
-# %% ../../notebooks/DataSource_Router.ipynb 39
+# %% ../../notebooks/DataSource_Router.ipynb 42
 @patch(cls_method=True)  # type: ignore
 def _create(
     cls: DataSource,
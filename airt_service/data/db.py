@@ -1,20 +1,35 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/DataBlob_DB.ipynb.
 
 # %% auto 0
-__all__ = ['download_from_db', 'db_pull', 'db_push']
+__all__ = ['DB_DOWNLOAD_MAX_WORKERS', 'DB_DOWNLOAD_FETCH_SIZE', 'DB_DOWNLOAD_MAX_CHUNK_BYTES', 'DB_PUSH_MAX_WORKERS',
+           'DB_PUSH_BATCH_SIZE', 'download_from_db', 'db_pull', 'db_push']
 
 # %% ../../notebooks/DataBlob_DB.ipynb 3
+import io
+import sys
 import tempfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import datetime
+from os import environ
 from pathlib import Path
 from typing import *
 
-import dask.dataframe as dd
 import pandas as pd
-from airt.engine.engine import using_cluster
 from airt.logger import get_logger
 from airt.remote_path import RemotePath
 from fastcore.script import Param, call_parse
 from fastcore.utils import *
+from pandas.api.types import is_datetime64_any_dtype
+from sqlalchemy import Integer, MetaData, Table, create_engine, func
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.expression import Select
 from sqlmodel import select
 
 import airt_service.sanitizer
@@ -24,6 +39,9 @@ from airt_service.data.utils import (
     calculate_data_object_folder_size_and_path,
     calculate_data_object_pulled_on,
     get_db_connection_params_from_db_uri,
+    iter_parquet_record_batches,
+    write_parquet_dataset,
+    write_parquet_dataset_metadata,
 )
 from airt_service.db.models import (
     DataBlob,
@@ -33,10 +51,154 @@ from airt_service.db.models import (
 )
 from ..helpers import truncate
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 # %% ../../notebooks/DataBlob_DB.ipynb 6
 logger = get_logger(__name__)
 
 # %% ../../notebooks/DataBlob_DB.ipynb 9
+DB_DOWNLOAD_MAX_WORKERS = int(environ.get("DB_DOWNLOAD_MAX_WORKERS", 4))
+DB_DOWNLOAD_FETCH_SIZE = int(environ.get("DB_DOWNLOAD_FETCH_SIZE", 10_000))
+DB_DOWNLOAD_MAX_CHUNK_BYTES = int(
+    environ.get("DB_DOWNLOAD_MAX_CHUNK_BYTES", 256 * 1024 * 1024)
+)
+DB_PUSH_MAX_WORKERS = int(environ.get("DB_PUSH_MAX_WORKERS", 4))
+DB_PUSH_BATCH_SIZE = int(environ.get("DB_PUSH_BATCH_SIZE", 100_000))
+
+# %% ../../notebooks/DataBlob_DB.ipynb 10
+def _split_into_ranges(
+    min_value: int, max_value: int, n_ranges: int
+) -> List[Tuple[int, int]]:
+    """Split the values from min_value to max_value into at most n_ranges half open ranges of about the same width"""
+    end = max_value + 1
+    n_ranges = max(1, min(n_ranges, end - min_value))
+    boundaries = [
+        min_value + (end - min_value) * i // n_ranges for i in range(n_ranges + 1)
+    ]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _read_sql_chunks(
+    connection: Connection,
+    query: Select,
+    *,
+    chunksize: Optional[int],
+    max_chunk_bytes: int = DB_DOWNLOAD_MAX_CHUNK_BYTES,
+    fetch_size: int = DB_DOWNLOAD_FETCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """Run the query with a server side cursor and yield the rows as dataframes of at most chunksize rows
+
+    Unlike pd.read_sql, which with the MySQL drivers buffers the whole result on the client, the rows are
+    streamed from the database fetch_size rows at a time. The size of the rows in the first fetch, both as
+    Python objects and in a dataframe, is used to lower the number of rows in a chunk, so that a chunk
+    takes about max_chunk_bytes of memory at most.
+
+    Args:
+        connection: Connection to db
+        query: Query to run
+        chunksize: Maximal number of rows in a chunk, **None** for no limit besides max_chunk_bytes
+        max_chunk_bytes: Maximal memory used by a chunk
+        fetch_size: Number of rows fetched from the database at a time
+
+    Returns:
+        An iterator of dataframes
+    """
+    result = connection.execution_options(
+        stream_results=True, max_row_buffer=fetch_size
+    ).execute(query)
+    columns = list(result.keys())
+
+    def to_frame(rows: List[Any]) -> pd.DataFrame:
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    max_rows: Optional[int] = None
+    rows: List[Any] = []
+    for batch in result.partitions(fetch_size):
+        if max_rows is None:
+            bytes_per_row = (
+                sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in batch)
+                + to_frame(batch).memory_usage(deep=True).sum()
+            ) / len(batch)
+            max_rows = max(1, int(max_chunk_bytes / bytes_per_row))
+            if chunksize is not None:
+                max_rows = min(max_rows, chunksize)
+            logger.info(f"Reading chunks of {max_rows:,d} rows")
+        rows.extend(batch)
+        offset = 0
+        while len(rows) - offset >= max_rows:
+            yield to_frame(rows[offset : offset + max_rows])
+            offset += max_rows
+        del rows[:offset]
+    if len(rows) > 0:
+        yield to_frame(rows)
+
+
+def _get_partition_column(db_table: Table) -> Optional[str]:
+    """Get the name of the integer primary key of the table or **None** if it doesn't have one"""
+    columns = list(db_table.primary_key.columns)
+    if len(columns) == 1 and isinstance(columns[0].type, Integer):
+        return columns[0].name  # type: ignore
+    return None
+
+
+def _download_partition_from_db(
+    *,
+    conn_str: str,
+    table: str,
+    partition_column: str,
+    start: int,
+    end: int,
+    partition: int,
+    chunksize: Optional[int],
+    max_chunk_bytes: int,
+    output_path: Path,
+) -> int:
+    """Downloads the rows with the partition column in [start, end) and stores them as parquet files in output path
+
+    It runs in a worker process with its own connection. The files are named after the partition and the chunk,
+    so sorting them by name preserves the order of the rows.
+
+    Args:
+        conn_str: Connection string of db
+        table: Table to use in db
+        partition_column: Integer column to partition the rows by
+        start: First value of the partition column in the partition
+        end: Value of the partition column following the partition
+        partition: Index of the partition
+        chunksize: Chunksize to download as
+        max_chunk_bytes: Maximal memory used by a chunk
+        output_path: Path to store parquet files
+
+    Returns:
+        The number of parquet files written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    engine = create_engine(conn_str)
+    try:
+        db_table = Table(table, MetaData(), autoload_with=engine)
+        column = db_table.c[partition_column]
+        query = db_table.select().where(column >= start, column < end).order_by(column)
+        i = 0
+        with engine.connect() as connection:
+            dfs = _read_sql_chunks(
+                connection,
+                query,
+                chunksize=chunksize,
+                max_chunk_bytes=max_chunk_bytes,
+            )
+            for df in dfs:
+                fname = output_path / f"db_data_{partition:06d}_{i:06d}.parquet"
+                logger.info(f"Writing data retrieved from the database to {fname}")
+                pq.write_table(pa.Table.from_pandas(df, preserve_index=False), fname)
+                i = i + 1
+        return i
+    finally:
+        engine.dispose()
+
+# %% ../../notebooks/DataBlob_DB.ipynb 13
 def download_from_db(
     *,
     host: str,
@@ -48,9 +210,18 @@ def download_from_db(
     table: str,
     chunksize: Optional[int] = 1_000_000,
     output_path: Path,
+    partition_column: Optional[str] = None,
+    max_workers: int = DB_DOWNLOAD_MAX_WORKERS,
+    max_chunk_bytes: int = DB_DOWNLOAD_MAX_CHUNK_BYTES,
 ) -> None:
     """Download data from database and stores it as parquet files in output path
 
+    If the table has an integer primary key or partition_column is passed, the values of the column are
+    split into ranges of about the same width, which are downloaded in parallel by max_workers processes.
+    Otherwise, or if max_workers is 1, the table is read over a single connection. In both cases the rows
+    are streamed with a server side cursor in chunks of at most chunksize rows and max_chunk_bytes of
+    memory, and each chunk is written directly as a part of the parquet dataset.
+
     Args:
         host: Host of db
         port: Port of db
@@ -61,7 +232,12 @@ def download_from_db(
         table: Table to use in db
         chunksize: Chunksize to download as
         output_path: Path to store parquet files
+        partition_column: Integer column to partition the rows by, defaults to the primary key of the table
+        max_workers: Number of processes downloading the partitions
+        max_chunk_bytes: Maximal memory used by a chunk
     """
+    import pyarrow as pa
+
     conn_str = create_connection_string(
         username=username,
         password=password,
@@ -71,26 +247,83 @@ def download_from_db(
         database_server=database_server,
     )
 
-    with tempfile.TemporaryDirectory() as td:
-        d = Path(td)
-        for i, df in enumerate(
-            pd.read_sql_table(table_name=table, con=conn_str, chunksize=chunksize)
-        ):
-            fname = d / f"{database_server}_{database}_{table}_data_{i:09d}.parquet"
-            logger.info(
-                f"Writing data retrieved from the database to temporary file {fname}"
+    engine = create_engine(conn_str)
+    try:
+        db_table = Table(table, MetaData(), autoload_with=engine)
+        if partition_column is None and max_workers > 1:
+            partition_column = _get_partition_column(db_table)
+
+        if partition_column is None or max_workers <= 1:
+            with engine.connect() as connection:
+                dfs = _read_sql_chunks(
+                    connection,
+                    db_table.select(),
+                    chunksize=chunksize,
+                    max_chunk_bytes=max_chunk_bytes,
+                )
+                logger.info(
+                    f"Writing data retrieved from the database to output directory {output_path}"
+                )
+                write_parquet_dataset(
+                    (pa.Table.from_pandas(df, preserve_index=False) for df in dfs),
+                    output_path,
+                )
+            return
+
+        column = db_table.c[partition_column]
+        if not isinstance(column.type, Integer):
+            raise ValueError(f"{partition_column=} is not an integer column")
+        with engine.connect() as connection:
+            min_value, max_value = connection.execute(
+                select(func.min(column), func.max(column))
+            ).one()
+    finally:
+        engine.dispose()
+
+    # More ranges than workers, so that the workers finishing sparse ranges pick up the rest
+    ranges = (
+        _split_into_ranges(int(min_value), int(max_value), max_workers * 4)
+        if min_value is not None
+        else []
+    )
+
+    logger.info(f"Downloading {len(ranges)} ranges of {partition_column=}")
+    output_path.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _download_partition_from_db,
+                conn_str=conn_str,
+                table=table,
+                partition_column=partition_column,
+                start=start,
+                end=end,
+                partition=partition,
+                chunksize=chunksize,
+                max_chunk_bytes=max_chunk_bytes,
+                output_path=output_path,
             )
-            df.to_parquet(fname)  # type: ignore
-        logger.info(
-            f"Rewriting temporary parquet files from {d} to output directory {output_path}"
-        )
-        ddf = dd.read_parquet(
-            d,
-            blocksize=None,
-        )
-        ddf.to_parquet(output_path)
+            for partition, (start, end) in enumerate(ranges)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            # Don't leave the files of a partial download behind in output path
+            for f in output_path.glob("db_data_*.parquet"):
+                f.unlink()
+            raise
 
-# %% ../../notebooks/DataBlob_DB.ipynb 11
+    # The files are already written in place, they only need to be renamed and summarised
+    n_parts = write_parquet_dataset_metadata(
+        output_path, sorted(output_path.glob("db_data_*.parquet"))
+    )
+    logger.info(f"{n_parts} parquet file(s) written to {output_path}")
+
+# %% ../../notebooks/DataBlob_DB.ipynb 16
 @call_parse  # type: ignore
 def db_pull(datablob_id: Param("id of datablob in db", int)) -> None:  # type: ignore
     """Pull the datablob and update its progress in internal db
@@ -172,11 +405,153 @@ def db_pull(datablob_id: Param("id of datablob in db", int)) -> None:  # type: i
         session.add(datablob)
         session.commit()
 
-# %% ../../notebooks/DataBlob_DB.ipynb 13
+# %% ../../notebooks/DataBlob_DB.ipynb 18
+def _write_csv(batch: "pa.RecordBatch", f: TextIO, *, na_rep: str) -> None:
+    """Write the record batch to f as CSV without a header, with booleans written as 1 and 0
+
+    Every value is enclosed in quotes and only the nulls are written as the unquoted na_rep, so that a
+    string equal to na_rep is loaded as a string and not as a null.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = [
+        pc.cast(column, pa.int8()) if pa.types.is_boolean(column.type) else column
+        for column in batch.columns
+    ]
+    df = pa.RecordBatch.from_arrays(columns, names=batch.schema.names).to_pandas(
+        ignore_metadata=True, integer_object_nulls=True
+    )
+    if df.shape[0] == 0:
+        return
+
+    lines: Optional[pd.Series] = None
+    for name in df.columns:
+        values = (
+            df[name].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+            if is_datetime64_any_dtype(df[name])
+            else df[name].astype(str)
+        )
+        values = ('"' + values.str.replace('"', '""', regex=False) + '"').where(
+            df[name].notna(), na_rep
+        )
+        lines = values if lines is None else lines + "," + values
+    f.write("\n".join(lines) + "\n")  # type: ignore
+
+
+def _load_record_batch_mysql(
+    connection: Connection, batch: "pa.RecordBatch", db_table: Table
+) -> None:
+    """Load the record batch with LOAD DATA LOCAL INFILE from a temporary CSV file"""
+    preparer = connection.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(name) for name in batch.schema.names)
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", encoding="utf-8") as f:
+        # Unquoted NULL is read as NULL when the fields are enclosed by quotes
+        _write_csv(batch, f, na_rep="NULL")
+        f.flush()
+        connection.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{f.name}' INTO TABLE {preparer.format_table(db_table)} "
+            + "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            + f"LINES TERMINATED BY '\\n' ({columns})"
+        )
+
+
+def _load_record_batch_postgresql(
+    connection: Connection, batch: "pa.RecordBatch", db_table: Table
+) -> None:
+    """Load the record batch with COPY FROM STDIN from an in memory CSV stream"""
+    preparer = connection.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(name) for name in batch.schema.names)
+    buffer = io.StringIO()
+    _write_csv(batch, buffer, na_rep="\\N")
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {preparer.format_table(db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+
+def _insert_record_batch_executemany(
+    connection: Connection, batch: "pa.RecordBatch", db_table: Table
+) -> None:
+    """Insert the record batch with a single executemany of a parameterized INSERT"""
+    df = batch.to_pandas(ignore_metadata=True)
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    connection.execute(db_table.insert(), records)
+
+
+_BULK_LOADERS: Dict[str, Callable[[Connection, "pa.RecordBatch", Table], None]] = {
+    "mysql": _load_record_batch_mysql,
+    "postgresql": _load_record_batch_postgresql,
+}
+
+
+def _push_record_batches(
+    batches: Iterable["pa.RecordBatch"],
+    engine: Engine,
+    db_table: Table,
+    *,
+    max_workers: int = DB_PUSH_MAX_WORKERS,
+) -> int:
+    """Load record batches into a table, up to max_workers batches at a time
+
+    The bulk loader of the dialect is used if there is one, otherwise the batches are inserted with
+    executemany. If the first batch can't be bulk loaded, e.g. because LOAD DATA LOCAL INFILE is
+    disabled on the server, it and the rest of the batches are inserted with executemany instead.
+    The batches are read from the iterable only when a worker is free, so at most max_workers + 1
+    batches are held in memory.
+
+    Returns:
+        The number of rows pushed
+    """
+    load = _BULK_LOADERS.get(engine.dialect.name, _insert_record_batch_executemany)
+
+    def push(batch: "pa.RecordBatch") -> int:
+        with engine.begin() as connection:
+            load(connection, batch, db_table)
+        return batch.num_rows  # type: ignore
+
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    try:
+        rows = push(first)
+    except DBAPIError as e:
+        if load == _insert_record_batch_executemany:
+            raise
+        logger.warning(f"Bulk loading failed, falling back to executemany: {e}")
+        load = _insert_record_batch_executemany
+        rows = push(first)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Set[Future] = set()
+        try:
+            for batch in batches:
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows = rows + sum(future.result() for future in done)
+                pending.add(executor.submit(push, batch))
+            done, pending = wait(pending)
+            rows = rows + sum(future.result() for future in done)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    logger.info(f"Pushed {rows} rows to table '{db_table.name}'")
+    return rows
+
+# %% ../../notebooks/DataBlob_DB.ipynb 21
 @call_parse  # type: ignore
 def db_push(prediction_push_id: int) -> None:
     """Push prediction data to a rdbms
 
+    The prediction is read one row group at a time and loaded in batches of DB_PUSH_BATCH_SIZE rows
+    by DB_PUSH_MAX_WORKERS threads, with LOAD DATA LOCAL INFILE for MySQL, COPY for PostgreSQL and
+    executemany for the other databases. The number of rows pushed and the throughput are stored in
+    the prediction push.
+
     Params:
         prediction_push_id: Id of prediction_push
 
@@ -185,6 +560,8 @@ def db_push(prediction_push_id: int) -> None:
         ```db_push 1
         ```
     """
+    import pyarrow.parquet as pq
+
     with get_session_with_context() as session:
         prediction_push = session.exec(
             select(PredictionPush).where(PredictionPush.id == prediction_push_id)
@@ -192,6 +569,8 @@ def db_push(prediction_push_id: int) -> None:
 
         prediction_push.error = None
         prediction_push.completed_steps = 0
+        prediction_push.pushed_rows = None
+        prediction_push.rows_per_second = None
 
         (
             username,
@@ -211,23 +590,48 @@ def db_push(prediction_push_id: int) -> None:
                 exist_ok=True,
                 parents=False,
             ) as s3_path:
-                with using_cluster("cpu") as engine:
-                    ddf = engine.dd.read_parquet(s3_path.as_path())
-                    conn_str = create_connection_string(
-                        username=username,
-                        password=password,
-                        host=host,
-                        port=port,
-                        database=database,
-                        database_server=database_server,
+                path = s3_path.as_path()
+                conn_str = create_connection_string(
+                    username=username,
+                    password=password,
+                    host=host,
+                    port=port,
+                    database=database,
+                    database_server=database_server,
+                )
+                engine = create_engine(
+                    conn_str,
+                    pool_size=DB_PUSH_MAX_WORKERS,
+                    connect_args={"local_infile": 1}
+                    if database_server.startswith("mysql")
+                    else {},
+                )
+                try:
+                    # Create the table from the schema of the prediction if it doesn't exist yet
+                    first_file = next(path.glob("*.parquet"), None)
+                    if first_file is None:
+                        raise ValueError(f"No parquet files to push in {path}")
+                    schema = pq.read_schema(first_file)
+                    schema.empty_table().to_pandas(ignore_metadata=True).to_sql(
+                        name=table, con=engine, if_exists="append", index=False
                     )
-                    ddf.to_sql(
-                        name=table,
-                        uri=conn_str,
-                        if_exists="append",
-                        index=True,
-                        method="multi",
+                    db_table = Table(table, MetaData(), autoload_with=engine)
+
+                    start = datetime.now()
+                    pushed_rows = _push_record_batches(
+                        iter_parquet_record_batches(path, DB_PUSH_BATCH_SIZE),
+                        engine,
+                        db_table,
                     )
+                    duration = (datetime.now() - start).total_seconds()
+                finally:
+                    engine.dispose()
+
+            prediction_push.pushed_rows = pushed_rows
+            prediction_push.rows_per_second = pushed_rows / max(duration, 1e-6)
+            logger.info(
+                f"Pushed {pushed_rows} rows in {duration:.1f} s ({prediction_push.rows_per_second:.0f} rows/s)"
+            )
             prediction_push.completed_steps = 1
         except Exception as e:
             prediction_push.error = truncate(str(e))
@@ -1,16 +1,16 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/DataBlob_S3.ipynb.
 
 # %% auto 0
-__all__ = ['copy_between_s3', 's3_pull', 's3_push']
+__all__ = ['S3_COPY_MAX_WORKERS', 'copy_s3_objects', 'copy_between_s3', 's3_pull', 's3_push']
 
 # %% ../../notebooks/DataBlob_S3.ipynb 3
-import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from os import environ
 from typing import *
 
 from airt.helpers import get_s3_bucket_name_and_folder_from_uri
 from airt.logger import get_logger
-from airt.remote_path import RemotePath
 from fastcore.script import call_parse
 from fastcore.utils import *
 from sqlmodel import select
@@ -20,9 +20,11 @@ from ..aws.utils import create_s3_datablob_path
 from ..azure.utils import create_azure_blob_storage_datablob_path
 from ..constants import METADATA_FOLDER_PATH
 from airt_service.data.utils import (
-    calculate_data_object_folder_size_and_path,
     calculate_data_object_pulled_on,
+    get_s3_client_for_credentials,
     get_s3_connection_params_from_db_uri,
+    list_s3_objects,
+    transfer_between_s3_and_azure_blob_storage,
 )
 from ..db.models import DataBlob, PredictionPush, get_session_with_context
 from ..helpers import truncate
@@ -31,6 +33,115 @@ from ..helpers import truncate
 logger = get_logger(__name__)
 
 # %% ../../notebooks/DataBlob_S3.ipynb 7
+S3_COPY_MAX_WORKERS = int(environ.get("S3_COPY_MAX_WORKERS", 10))
+
+# %% ../../notebooks/DataBlob_S3.ipynb 8
+def _get_s3_access_key(access_key: Optional[str]) -> Optional[str]:
+    if access_key is not None:
+        return access_key
+
+    import boto3
+
+    credentials = boto3.session.Session().get_credentials()
+    return None if credentials is None else credentials.access_key
+
+# %% ../../notebooks/DataBlob_S3.ipynb 9
+def copy_s3_objects(
+    source_remote_url: str,
+    destination_remote_url: str,
+    source_access_key: Optional[str] = None,
+    source_secret_key: Optional[str] = None,
+    destination_access_key: Optional[str] = None,
+    destination_secret_key: Optional[str] = None,
+    skip_metadata_dir: Optional[bool] = False,
+    max_workers: int = S3_COPY_MAX_WORKERS,
+) -> int:
+    """Copy all files from source S3 path to destination S3 path without downloading them to the local disk
+
+    If the source and the destination are accessed with the same credentials, the files are copied server side
+    using CopyObject (UploadPartCopy for large files). Otherwise, the files are streamed from the source to the
+    destination. The files are copied in parallel by a pool of **max_workers** threads.
+
+    Args:
+        source_remote_url: S3 uri where files to copy are located
+        destination_remote_url: S3 uri to copy files
+        source_access_key: Source s3 bucket access key
+        source_secret_key: Source s3 bucket secret key
+        destination_access_key: Destination s3 bucket access key
+        destination_secret_key: Destination s3 bucket secret key
+        skip_metadata_dir: If set to **True** then the **.metadata_by_airt** folder
+            will not be copied to the destination_remote_url.
+        max_workers: Number of files to copy in parallel
+
+    Returns:
+        The total size in bytes of the copied files, excluding the files in the **.metadata_by_airt** folder
+
+    Raises:
+        ValueError: If there are no files to copy in source_remote_url
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    source_client = get_s3_client_for_credentials(source_access_key, source_secret_key)
+    objects = list_s3_objects(source_client, source_remote_url, bool(skip_metadata_dir))
+    if len(objects) == 0:
+        raise ValueError(f"URI {source_remote_url} is invalid or no files available")
+
+    server_side_copy = _get_s3_access_key(source_access_key) == _get_s3_access_key(
+        destination_access_key
+    )
+    destination_client = (
+        source_client
+        if server_side_copy
+        else get_s3_client_for_credentials(
+            destination_access_key, destination_secret_key
+        )
+    )
+
+    source_bucket, _ = get_s3_bucket_name_and_folder_from_uri(source_remote_url)
+    destination_bucket, destination_prefix = get_s3_bucket_name_and_folder_from_uri(
+        destination_remote_url
+    )
+    destination_prefix = destination_prefix.rstrip("/")
+    transfer_config = TransferConfig(max_concurrency=4)
+
+    def copy_object(key: str, relative_key: str) -> None:
+        destination_key = (
+            f"{destination_prefix}/{relative_key}"
+            if destination_prefix
+            else relative_key
+        )
+        if server_side_copy:
+            destination_client.copy(
+                {"Bucket": source_bucket, "Key": key},
+                destination_bucket,
+                destination_key,
+                Config=transfer_config,
+            )
+        else:
+            body = source_client.get_object(Bucket=source_bucket, Key=key)["Body"]
+            destination_client.upload_fileobj(
+                body, destination_bucket, destination_key, Config=transfer_config
+            )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(copy_object, key, relative_key): (relative_key, size)
+            for key, relative_key, size in objects
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            relative_key, size = futures[future]
+            logger.info(
+                f"copy_s3_objects(): {i}/{len(objects)} copied {relative_key} ({size} bytes)"
+            )
+
+    return sum(
+        size
+        for _, relative_key, size in objects
+        if METADATA_FOLDER_PATH not in relative_key
+    )
+
+# %% ../../notebooks/DataBlob_S3.ipynb 10
 def copy_between_s3(
     source_remote_url: str,
     destination_remote_url: str,
@@ -58,44 +169,20 @@ def copy_between_s3(
         skip_metadata_dir: If set to **True** then the **.metadata_by_airt** folder
             will not be copied to the destination_remote_url.
     """
-    with RemotePath.from_url(
-        remote_url=destination_remote_url,
-        pull_on_enter=False,
-        push_on_exit=True,
-        exist_ok=True,
-        parents=True,
-        access_key=destination_access_key,
-        secret_key=destination_secret_key,
-    ) as destionation_s3_path:
-        sync_path = destionation_s3_path.as_path()
-        with RemotePath.from_url(
-            remote_url=source_remote_url,
-            pull_on_enter=True,
-            push_on_exit=False,
-            exist_ok=True,
-            parents=False,
-            access_key=source_access_key,
-            secret_key=source_secret_key,
-        ) as source_s3_path:
-            if datablob is not None:
-                calculate_data_object_pulled_on(datablob)
-
-            source_files = source_s3_path.as_path().iterdir()
+    if datablob is not None:
+        calculate_data_object_pulled_on(datablob)
+
+    copy_s3_objects(
+        source_remote_url=source_remote_url,
+        destination_remote_url=destination_remote_url,
+        source_access_key=source_access_key,
+        source_secret_key=source_secret_key,
+        destination_access_key=destination_access_key,
+        destination_secret_key=destination_secret_key,
+        skip_metadata_dir=skip_metadata_dir,
+    )
 
-            if skip_metadata_dir:
-                source_files = [
-                    f for f in source_files if METADATA_FOLDER_PATH not in str(f)
-                ]
-
-            for f in source_files:
-                shutil.move(str(f), sync_path)
-
-        if len(list(sync_path.glob("*"))) == 0:
-            raise ValueError(
-                f"URI {source_remote_url} is invalid or no files available"
-            )
-
-# %% ../../notebooks/DataBlob_S3.ipynb 10
+# %% ../../notebooks/DataBlob_S3.ipynb 14
 @call_parse  # type: ignore
 def s3_pull(datablob_id: int) -> None:
     """Pull the data from s3 and updates progress in db
@@ -135,6 +222,14 @@ def s3_pull(datablob_id: int) -> None:
                     region=datablob.region,
                 )
                 destination_remote_url = f"s3://{destination_bucket.name}/{s3_path}"
+
+                folder_size = copy_s3_objects(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    source_access_key=source_access_key,
+                    source_secret_key=source_secret_key,
+                )
+                calculate_data_object_pulled_on(datablob)
             elif datablob.cloud_provider == "azure":
                 (
                     destination_container_client,
@@ -146,43 +241,25 @@ def s3_pull(datablob_id: int) -> None:
                 )
                 destination_remote_url = f"{destination_container_client.url}/{destination_azure_blob_storage_path}"
 
-            with RemotePath.from_url(
-                remote_url=destination_remote_url,
-                pull_on_enter=False,
-                push_on_exit=True,
-                exist_ok=True,
-                parents=True,
-            ) as destionation_remote_path:
-                sync_path = destionation_remote_path.as_path()
-                with RemotePath.from_url(
-                    remote_url=source_remote_url,
-                    pull_on_enter=True,
-                    push_on_exit=False,
-                    exist_ok=True,
-                    parents=False,
-                    access_key=source_access_key,
-                    secret_key=source_secret_key,
-                ) as source_s3_path:
-                    calculate_data_object_pulled_on(datablob)
-
-                    source_files = source_s3_path.as_path().iterdir()
-                    for f in source_files:
-                        shutil.move(str(f), sync_path)
-
-                if len(list(sync_path.glob("*"))) == 0:
-                    raise ValueError(
-                        f"URI {source_remote_url} is invalid or no files available"
-                    )
-
-            # Calculate folder size in S3/Azure blob storage
-            calculate_data_object_folder_size_and_path(datablob)
+                folder_size = transfer_between_s3_and_azure_blob_storage(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    s3_access_key=source_access_key,
+                    s3_secret_key=source_secret_key,
+                )
+                calculate_data_object_pulled_on(datablob)
+
+            # The folder size is known from the copied files, no need to list them again
+            datablob.completed_steps = 1
+            datablob.folder_size = folder_size
+            datablob.path = destination_remote_url
         except Exception as e:
             datablob.error = truncate(str(e))
 
         session.add(datablob)
         session.commit()
 
-# %% ../../notebooks/DataBlob_S3.ipynb 14
+# %% ../../notebooks/DataBlob_S3.ipynb 18
 @call_parse  # type: ignore
 def s3_push(prediction_push_id: int) -> None:
     """Push the data from s3 and update its progress in db
@@ -217,31 +294,20 @@ def s3_push(prediction_push_id: int) -> None:
             source_remote_url = prediction_push.prediction.path
             destination_remote_url = f"s3://{destination_bucket}/{destination_s3_path}"
 
-            with RemotePath.from_url(
-                remote_url=destination_remote_url,
-                pull_on_enter=False,
-                push_on_exit=True,
-                exist_ok=True,
-                parents=True,
-                access_key=destination_access_key,
-                secret_key=destination_secret_key,
-            ) as destionation_s3_path:
-                sync_path = destionation_s3_path.as_path()
-                with RemotePath.from_url(
-                    remote_url=source_remote_url,
-                    pull_on_enter=True,
-                    push_on_exit=False,
-                    exist_ok=True,
-                    parents=False,
-                ) as source_remote_path:
-                    source_files = source_remote_path.as_path().iterdir()
-                    for f in source_files:
-                        shutil.move(str(f), sync_path)
-
-                if len(list(sync_path.glob("*"))) == 0:
-                    raise ValueError(
-                        f"URI {source_remote_url} is invalid or no files available"
-                    )
+            if source_remote_url.startswith("s3://"):
+                copy_s3_objects(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    destination_access_key=destination_access_key,
+                    destination_secret_key=destination_secret_key,
+                )
+            else:
+                transfer_between_s3_and_azure_blob_storage(
+                    source_remote_url=source_remote_url,
+                    destination_remote_url=destination_remote_url,
+                    s3_access_key=destination_access_key,
+                    s3_secret_key=destination_secret_key,
+                )
 
             prediction_push.completed_steps = 1
         except Exception as e:
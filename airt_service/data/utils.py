@@ -1,22 +1,28 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/Data_Utils.ipynb.
 
 # %% auto 0
-__all__ = ['create_db_uri_for_s3_datablob', 'get_s3_connection_params_from_db_uri',
+__all__ = ['CROSS_CLOUD_TRANSFER_MAX_WORKERS', 'CROSS_CLOUD_TRANSFER_CHUNK_SIZE', 'CROSS_CLOUD_TRANSFER_MEMORY_LIMIT',
+           'create_db_uri_for_s3_datablob', 'get_s3_connection_params_from_db_uri',
            'create_db_uri_for_azure_blob_storage_datablob', 'get_azure_blob_storage_connection_params_from_db_uri',
            'create_db_uri_for_db_datablob', 'get_db_connection_params_from_db_uri', 'create_db_uri_for_local_datablob',
            'calculate_azure_data_object_folder_size_and_path', 'calculate_s3_data_object_folder_size_and_path',
            'calculate_data_object_folder_size_and_path', 'calculate_data_object_pulled_on',
-           'delete_data_object_files_in_cloud']
+           'delete_data_object_files_in_cloud', 'download_data_object_file', 'get_s3_client_for_credentials',
+           'list_s3_objects', 'get_azure_container_client_and_prefix', 'list_azure_blobs',
+           'transfer_between_s3_and_azure_blob_storage', 'write_parquet_dataset', 'write_parquet_dataset_metadata',
+           'get_parquet_dataset_divisions', 'iter_parquet_record_batches']
 
 # %% ../../notebooks/Data_Utils.ipynb 3
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from os import environ
+from pathlib import Path
 from typing import *
 from urllib.parse import unquote_plus as urlunquote
+from urllib.parse import urlparse
 
-import dask.dataframe as dd
 from airt.logger import get_logger
-from mypy_boto3_s3.service_resource import Bucket
 
 import airt_service.sanitizer
 from airt_service.aws.utils import (
@@ -24,11 +30,13 @@ from airt_service.aws.utils import (
     create_s3_datasource_path,
     get_s3_bucket_and_path_from_uri,
     get_s3_bucket_name_and_folder_from_uri,
+    get_s3_client,
 )
 from airt_service.azure.utils import (
     create_azure_blob_storage_datablob_path,
     create_azure_blob_storage_datasource_path,
     get_azure_blob_storage_container,
+    get_azure_credential,
 )
 from ..constants import METADATA_FOLDER_PATH
 from airt_service.db.models import (
@@ -39,6 +47,14 @@ from airt_service.db.models import (
     create_connection_string,
 )
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from azure.identity import DefaultAzureCredential
+    from azure.storage.blob import ContainerClient
+    from mypy_boto3_s3.client import S3Client
+    from mypy_boto3_s3.service_resource import Bucket
+
 # %% ../../notebooks/Data_Utils.ipynb 6
 logger = get_logger(__name__)
 
@@ -158,7 +174,7 @@ def get_db_connection_params_from_db_uri(
     return username, password, host, port, table, database, database_server
 
 # %% ../../notebooks/Data_Utils.ipynb 19
-def create_db_uri_for_local_datablob(bucket: Bucket, s3_path: str) -> str:
+def create_db_uri_for_local_datablob(bucket: "Bucket", s3_path: str) -> str:
     """Create db_uri for csv datablob
 
     Args:
@@ -284,3 +300,621 @@ def delete_data_object_files_in_cloud(
         )
         for blob in container_client.list_blobs(name_starts_with=blob_folder + "/"):
             container_client.delete_blob(blob)
+
+# %% ../../notebooks/Data_Utils.ipynb 30
+def download_data_object_file(
+    data_object: Union[DataBlob, DataSource, Model, Prediction],
+    name: str,
+    output_path: Path,
+) -> bool:
+    """
+    Download a single file of a data object stored in cloud - aws or azure
+
+    Args:
+        data_object: object of type DataBlob, DataSource, Model, Prediction
+        name: name of the file relative to the path of the data object
+        output_path: folder to download the file to
+
+    Returns:
+        **True** if the file was downloaded, **False** if the data object has no such file
+    """
+    if data_object.path is None:
+        return False
+
+    if data_object.cloud_provider == "aws":
+        from botocore.exceptions import ClientError
+
+        bucket, s3_path = get_s3_bucket_and_path_from_uri(data_object.path)  # type: ignore
+        try:
+            bucket.download_file(f"{s3_path}/{name}", str(output_path / name))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ["404", "NoSuchKey"]:
+                return False
+            raise
+    elif data_object.cloud_provider == "azure":
+        container_client, _ = get_azure_blob_storage_container(
+            region=data_object.region
+        )
+        blob_folder = "/".join(
+            get_s3_bucket_name_and_folder_from_uri(data_object.path)[1].split("/")[1:]
+        )
+        blob_client = container_client.get_blob_client(f"{blob_folder}/{name}")
+        if not blob_client.exists():
+            return False
+        with open(output_path / name, "wb") as f:
+            blob_client.download_blob().readinto(f)
+    return True
+
+# %% ../../notebooks/Data_Utils.ipynb 33
+def get_s3_client_for_credentials(
+    access_key: Optional[str] = None, secret_key: Optional[str] = None
+) -> "S3Client":
+    """Get an S3 client using the given credentials
+
+    Args:
+        access_key: S3 access key, if not set the shared client using the credentials of the service is returned
+        secret_key: S3 secret key
+
+    Returns:
+        The S3 client
+    """
+    if access_key is None:
+        return get_s3_client()
+
+    import boto3
+    from botocore.client import Config
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        config=Config(signature_version="s3v4"),
+    )
+
+
+def list_s3_objects(
+    client: "S3Client", remote_url: str, skip_metadata_dir: bool = False
+) -> List[Tuple[str, str, int]]:
+    """List the files stored under an S3 uri
+
+    Args:
+        client: S3 client used to list the files
+        remote_url: S3 uri of a file or a folder
+        skip_metadata_dir: If set to **True** then the files in the **.metadata_by_airt** folder are not listed
+
+    Returns:
+        A list of tuples with the key, the path relative to remote_url and the size in bytes of each file
+    """
+    bucket, prefix = get_s3_bucket_name_and_folder_from_uri(remote_url)
+    prefix = prefix.rstrip("/")
+
+    objects = []
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if key.endswith("/"):
+                continue
+            if key == prefix:
+                relative_key = Path(key).name
+            elif prefix == "" or key.startswith(prefix + "/"):
+                relative_key = key[len(prefix) :].lstrip("/")
+            else:
+                continue
+            if skip_metadata_dir and METADATA_FOLDER_PATH in relative_key:
+                continue
+            objects.append((key, relative_key, obj["Size"]))
+    return objects
+
+
+def get_azure_container_client_and_prefix(
+    remote_url: str, credential: Union[str, "DefaultAzureCredential"]
+) -> Tuple["ContainerClient", str]:
+    """Get the container client and the blob prefix of an azure blob storage uri
+
+    Args:
+        remote_url: Azure blob storage uri of a file or a folder
+        credential: Azure blob storage credential
+
+    Returns:
+        The container client and the blob prefix
+    """
+    from azure.storage.blob import ContainerClient
+
+    parsed_url = urlparse(remote_url)
+    container_name, _, prefix = parsed_url.path.lstrip("/").partition("/")
+    container_client = ContainerClient(
+        account_url=f"{parsed_url.scheme}://{parsed_url.netloc}",
+        container_name=container_name,
+        credential=credential,
+    )
+    return container_client, prefix.rstrip("/")
+
+
+def list_azure_blobs(
+    container_client: "ContainerClient", prefix: str, skip_metadata_dir: bool = False
+) -> List[Tuple[str, str, int]]:
+    """List the blobs stored under a prefix in an azure blob storage container
+
+    Args:
+        container_client: Container client used to list the blobs
+        prefix: Blob name of a file or a folder
+        skip_metadata_dir: If set to **True** then the blobs in the **.metadata_by_airt** folder are not listed
+
+    Returns:
+        A list of tuples with the blob name, the path relative to prefix and the size in bytes of each blob
+    """
+    blobs = []
+    for blob in container_client.list_blobs(name_starts_with=prefix):
+        name = blob.name
+        if name.endswith("/"):
+            continue
+        if name == prefix:
+            relative_name = name.split("/")[-1]
+        elif prefix == "" or name.startswith(prefix + "/"):
+            relative_name = name[len(prefix) :].lstrip("/")
+        else:
+            continue
+        if skip_metadata_dir and METADATA_FOLDER_PATH in relative_name:
+            continue
+        blobs.append((name, relative_name, blob.size))
+    return blobs
+
+# %% ../../notebooks/Data_Utils.ipynb 34
+CROSS_CLOUD_TRANSFER_MAX_WORKERS = int(
+    environ.get("CROSS_CLOUD_TRANSFER_MAX_WORKERS", 8)
+)
+CROSS_CLOUD_TRANSFER_CHUNK_SIZE = int(
+    environ.get("CROSS_CLOUD_TRANSFER_CHUNK_SIZE", 8 * 1024 * 1024)
+)
+CROSS_CLOUD_TRANSFER_MEMORY_LIMIT = int(
+    environ.get("CROSS_CLOUD_TRANSFER_MEMORY_LIMIT", 256 * 1024 * 1024)
+)
+
+# %% ../../notebooks/Data_Utils.ipynb 35
+# S3 multipart uploads need parts of at least 5 MiB (except the last one) and allow up to 10,000 parts
+_S3_MIN_PART_SIZE = 5 * 1024 * 1024
+_S3_MAX_PARTS = 10_000
+# Azure block blobs allow up to 50,000 blocks
+_AZURE_MAX_BLOCKS = 50_000
+
+# %% ../../notebooks/Data_Utils.ipynb 36
+def transfer_between_s3_and_azure_blob_storage(
+    source_remote_url: str,
+    destination_remote_url: str,
+    s3_access_key: Optional[str] = None,
+    s3_secret_key: Optional[str] = None,
+    azure_credential: Optional[Union[str, "DefaultAzureCredential"]] = None,
+    skip_metadata_dir: Optional[bool] = False,
+    max_workers: int = CROSS_CLOUD_TRANSFER_MAX_WORKERS,
+    chunk_size: int = CROSS_CLOUD_TRANSFER_CHUNK_SIZE,
+    memory_limit: int = CROSS_CLOUD_TRANSFER_MEMORY_LIMIT,
+) -> int:
+    """Stream files from S3 to azure blob storage or from azure blob storage to S3 without storing them on the local disk
+
+    The direction of the transfer is given by the scheme of source_remote_url. Every file is split in chunks of
+    **chunk_size** bytes, which are downloaded with ranged requests and uploaded as azure blocks or S3 multipart
+    upload parts by a pool of threads. Each thread holds at most one chunk, so the number of threads is lowered
+    if needed to keep the chunks in memory under **memory_limit** bytes.
+
+    Args:
+        source_remote_url: S3 or azure blob storage uri where files to transfer are located
+        destination_remote_url: Azure blob storage or S3 uri to transfer files
+        s3_access_key: S3 access key, if not set the credentials of the service are used
+        s3_secret_key: S3 secret key
+        azure_credential: Azure blob storage credential, if not set the credential of the service is used
+        skip_metadata_dir: If set to **True** then the **.metadata_by_airt** folder
+            will not be transferred to the destination_remote_url.
+        max_workers: Maximum number of chunks to transfer in parallel
+        chunk_size: Size in bytes of the chunks
+        memory_limit: Maximum number of bytes of chunks held in memory
+
+    Returns:
+        The total size in bytes of the transferred files, excluding the files in the **.metadata_by_airt** folder
+
+    Raises:
+        ValueError: If there are no files to transfer in source_remote_url or if the uris are not
+            an S3 and an azure blob storage uri
+    """
+    from azure.storage.blob import BlobBlock
+
+    if source_remote_url.startswith("s3://") == destination_remote_url.startswith(
+        "s3://"
+    ):
+        raise ValueError(
+            f"Can't transfer files from {source_remote_url} to {destination_remote_url}, one uri must be an S3 uri and the other an azure blob storage uri"
+        )
+
+    azure_credential = azure_credential if azure_credential else get_azure_credential()
+    s3_client = get_s3_client_for_credentials(s3_access_key, s3_secret_key)
+
+    if source_remote_url.startswith("s3://"):
+        source_bucket, _ = get_s3_bucket_name_and_folder_from_uri(source_remote_url)
+        objects = list_s3_objects(s3_client, source_remote_url, bool(skip_metadata_dir))
+
+        def read_chunk(key: str, start: int, end: int) -> bytes:
+            if start == end:
+                return b""
+            return s3_client.get_object(
+                Bucket=source_bucket, Key=key, Range=f"bytes={start}-{end - 1}"
+            )["Body"].read()
+
+        (
+            destination_container_client,
+            destination_prefix,
+        ) = get_azure_container_client_and_prefix(
+            destination_remote_url, azure_credential
+        )
+        min_chunk_size, max_chunks = 1, _AZURE_MAX_BLOCKS
+
+        def upload_file(name: str, data: bytes) -> None:
+            destination_container_client.upload_blob(name, data, overwrite=True)
+
+        def start_upload(name: str) -> str:
+            return ""
+
+        def upload_chunk(name: str, upload_id: str, index: int, data: bytes) -> str:
+            # All block ids of a blob must have the same length
+            block_id = f"{index:06d}"
+            destination_container_client.get_blob_client(name).stage_block(
+                block_id, data
+            )
+            return block_id
+
+        def finish_upload(name: str, upload_id: str, chunk_ids: List[str]) -> None:
+            destination_container_client.get_blob_client(name).commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in chunk_ids]
+            )
+
+        def abort_upload(name: str, upload_id: str) -> None:
+            # Uncommitted blocks are garbage collected by azure
+            pass
+
+    else:
+        source_container_client, source_prefix = get_azure_container_client_and_prefix(
+            source_remote_url, azure_credential
+        )
+        objects = list_azure_blobs(
+            source_container_client, source_prefix, bool(skip_metadata_dir)
+        )
+
+        def read_chunk(name: str, start: int, end: int) -> bytes:
+            if start == end:
+                return b""
+            return source_container_client.download_blob(
+                name, offset=start, length=end - start
+            ).readall()
+
+        destination_bucket, destination_prefix = get_s3_bucket_name_and_folder_from_uri(
+            destination_remote_url
+        )
+        destination_prefix = destination_prefix.rstrip("/")
+        min_chunk_size, max_chunks = _S3_MIN_PART_SIZE, _S3_MAX_PARTS
+
+        def upload_file(name: str, data: bytes) -> None:
+            s3_client.put_object(Bucket=destination_bucket, Key=name, Body=data)
+
+        def start_upload(name: str) -> str:
+            return s3_client.create_multipart_upload(
+                Bucket=destination_bucket, Key=name
+            )["UploadId"]
+
+        def upload_chunk(name: str, upload_id: str, index: int, data: bytes) -> str:
+            return s3_client.upload_part(
+                Bucket=destination_bucket,
+                Key=name,
+                UploadId=upload_id,
+                PartNumber=index + 1,
+                Body=data,
+            )["ETag"]
+
+        def finish_upload(name: str, upload_id: str, chunk_ids: List[str]) -> None:
+            s3_client.complete_multipart_upload(
+                Bucket=destination_bucket,
+                Key=name,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"ETag": etag, "PartNumber": i + 1}
+                        for i, etag in enumerate(chunk_ids)
+                    ]
+                },
+            )
+
+        def abort_upload(name: str, upload_id: str) -> None:
+            s3_client.abort_multipart_upload(
+                Bucket=destination_bucket, Key=name, UploadId=upload_id
+            )
+
+    if len(objects) == 0:
+        raise ValueError(f"URI {source_remote_url} is invalid or no files available")
+
+    def get_chunk_size(size: int) -> int:
+        return max(chunk_size, min_chunk_size, -(-size // max_chunks))
+
+    largest_chunk_size = max(get_chunk_size(size) for _, _, size in objects)
+    workers = max(1, min(max_workers, memory_limit // largest_chunk_size))
+
+    def transfer_file(key: str, name: str, size: int) -> None:
+        upload_file(name, read_chunk(key, 0, size))
+
+    def transfer_chunk(
+        key: str, name: str, upload_id: str, index: int, start: int, end: int
+    ) -> str:
+        return upload_chunk(name, upload_id, index, read_chunk(key, start, end))
+
+    pending_uploads: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        transfers: List[Tuple[str, str, int, List[Future]]] = []
+        try:
+            for key, relative_key, size in objects:
+                name = (
+                    f"{destination_prefix}/{relative_key}"
+                    if destination_prefix
+                    else relative_key
+                )
+                object_chunk_size = get_chunk_size(size)
+                if size <= object_chunk_size:
+                    futures = [executor.submit(transfer_file, key, name, size)]
+                else:
+                    upload_id = start_upload(name)
+                    pending_uploads[name] = upload_id
+                    futures = [
+                        executor.submit(
+                            transfer_chunk,
+                            key,
+                            name,
+                            upload_id,
+                            index,
+                            start,
+                            min(start + object_chunk_size, size),
+                        )
+                        for index, start in enumerate(range(0, size, object_chunk_size))
+                    ]
+                transfers.append((name, relative_key, size, futures))
+
+            for i, (name, relative_key, size, futures) in enumerate(transfers, start=1):
+                chunk_ids = [future.result() for future in futures]
+                if name in pending_uploads:
+                    finish_upload(name, pending_uploads.pop(name), chunk_ids)
+                logger.info(
+                    f"transfer_between_s3_and_azure_blob_storage(): {i}/{len(objects)} transferred {relative_key} ({size} bytes)"
+                )
+        except BaseException:
+            for _, _, _, futures in transfers:
+                for future in futures:
+                    future.cancel()
+            raise
+        finally:
+            for name, upload_id in pending_uploads.items():
+                abort_upload(name, upload_id)
+
+    return sum(
+        size
+        for _, relative_key, size in objects
+        if METADATA_FOLDER_PATH not in relative_key
+    )
+
+# %% ../../notebooks/Data_Utils.ipynb 38
+def _write_parquet_summary_files(
+    output_path: Path,
+    schema: Optional["pa.Schema"],
+    metadata_collector: List["pq.FileMetaData"],
+) -> None:
+    import pyarrow.parquet as pq
+
+    if schema is None:
+        return
+    pq.write_metadata(schema, output_path / "_common_metadata")
+    pq.write_metadata(
+        schema, output_path / "_metadata", metadata_collector=metadata_collector
+    )
+
+
+def _cast_parquet_parts_to_common_schema(
+    output_path: Path,
+    fnames: Sequence[str],
+    previous_schema: Optional["pa.Schema"] = None,
+) -> Tuple[Optional["pa.Schema"], List["pq.FileMetaData"]]:
+    """Cast the parquet files in output path to a schema all of them can be read with
+
+    The schemas of the files are unified, so that a column which is all null in some of the files gets
+    its type from the others. Only the files with a schema different from the unified one are rewritten.
+
+    Args:
+        output_path: Path where the parquet files are stored
+        fnames: Names of the parquet files in output path
+        previous_schema: Schema of the parts the files are appended to, those parts can't be cast
+
+    Returns:
+        The unified schema and the metadata of the files, with the file paths set to their names
+
+    Raises:
+        ValueError: If the previous parts would have to be cast to the unified schema
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    metadata_collector = [pq.read_metadata(output_path / fname) for fname in fnames]
+    schemas = [metadata.schema.to_arrow_schema() for metadata in metadata_collector]
+    if previous_schema is not None:
+        schemas.insert(0, previous_schema)
+    if len(schemas) == 0:
+        return None, metadata_collector
+
+    schema = pa.unify_schemas(schemas, promote_options="permissive")
+    if previous_schema is not None and not previous_schema.equals(schema):
+        raise ValueError(
+            f"The new parts can't be appended to the parts with {previous_schema=}, they need {schema=}"
+        )
+
+    for i, fname in enumerate(fnames):
+        if not metadata_collector[i].schema.to_arrow_schema().equals(schema):
+            logger.info(f"Casting {output_path / fname} to the unified schema")
+            table = pq.read_table(output_path / fname)
+            pq.write_table(table.select(schema.names).cast(schema), output_path / fname)
+            metadata_collector[i] = pq.read_metadata(output_path / fname)
+        metadata_collector[i].set_file_path(fname)
+
+    return schema, metadata_collector
+
+# %% ../../notebooks/Data_Utils.ipynb 39
+def write_parquet_dataset(tables: Iterable["pa.Table"], output_path: Path) -> int:
+    """Write tables directly as the parts of a parquet dataset in output path
+
+    The parts are named part.0.parquet, part.1.parquet, ... in the order of the tables. After the last
+    part, the parts with a schema different from the unified schema of all tables are cast to it and
+    the **_common_metadata** and **_metadata** summary files are written, so the dataset can be read
+    without opening every part.
+
+    Args:
+        tables: Arrow tables to write, one part is written for each table
+        output_path: Path to store parquet files
+
+    Returns:
+        The number of parts written
+    """
+    import pyarrow.parquet as pq
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    fnames = []
+    for i, table in enumerate(tables):
+        fname = f"part.{i}.parquet"
+        logger.info(f"Writing {table.num_rows} rows to {output_path / fname}")
+        pq.write_table(table, output_path / fname)
+        fnames.append(fname)
+
+    schema, metadata_collector = _cast_parquet_parts_to_common_schema(
+        output_path, fnames
+    )
+    _write_parquet_summary_files(output_path, schema, metadata_collector)
+    return len(fnames)
+
+
+def _get_next_part_number(metadata: "pq.FileMetaData") -> int:
+    """Get the number of the part following the last part described by the metadata of a dataset"""
+    file_paths = {
+        metadata.row_group(i).column(0).file_path
+        for i in range(metadata.num_row_groups)
+    }
+    return max((int(p.split(".")[1]) for p in file_paths), default=-1) + 1
+
+
+def write_parquet_dataset_metadata(
+    output_path: Path,
+    parts: Sequence[Path],
+    previous_metadata: Optional["pq.FileMetaData"] = None,
+) -> int:
+    """Turn parquet files already written in output path into the parts of a parquet dataset
+
+    The files are renamed to part.0.parquet, part.1.parquet, ... in the given order, files with a schema
+    different from the unified schema of all files are cast to it and the **_common_metadata** and
+    **_metadata** summary files are written. Only the footers of the files are read, unless they need to
+    be cast.
+
+    If previous_metadata is passed, the files are appended to the dataset it describes instead: they are
+    numbered after its last part, cast to its schema and the summary files describe the parts of both.
+
+    Args:
+        output_path: Path where the parquet files are stored
+        parts: Parquet files in output path, in the order of the rows
+        previous_metadata: Content of the **_metadata** file of the dataset to append the files to
+
+    Returns:
+        The number of parts written
+    """
+    previous_schema: Optional["pa.Schema"] = None
+    first_part = 0
+    if previous_metadata is not None:
+        previous_schema = previous_metadata.schema.to_arrow_schema()
+        first_part = _get_next_part_number(previous_metadata)
+
+    fnames = []
+    for i, part in enumerate(parts, start=first_part):
+        fname = f"part.{i}.parquet"
+        part.rename(output_path / fname)
+        fnames.append(fname)
+
+    schema, metadata_collector = _cast_parquet_parts_to_common_schema(
+        output_path, fnames, previous_schema
+    )
+    if previous_metadata is not None:
+        schema = previous_schema
+        metadata_collector.insert(0, previous_metadata)
+
+    _write_parquet_summary_files(output_path, schema, metadata_collector)
+    return len(parts)
+
+# %% ../../notebooks/Data_Utils.ipynb 41
+def get_parquet_dataset_divisions(
+    metadata: "pq.FileMetaData", column: str
+) -> Tuple[Any, ...]:
+    """Get the divisions of a parquet dataset sorted by the column from the statistics in its metadata
+
+    The divisions are the minimal values of the column in each part followed by the maximal value in
+    the last part, just like the divisions dask calculates when reading the dataset with the column as
+    the index. Only the metadata is used, so no part has to be read.
+
+    Args:
+        metadata: Content of the **_metadata** file of the dataset
+        column: Name of the column the dataset is sorted by
+
+    Returns:
+        The divisions of the dataset
+
+    Raises:
+        ValueError: If the statistics of the column are missing or the parts are not sorted by it
+    """
+    column_index = metadata.schema.names.index(column)
+    mins: Dict[str, Any] = {}
+    maxs: Dict[str, Any] = {}
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        if row_group.num_rows == 0:
+            continue
+        column_chunk = row_group.column(column_index)
+        statistics = column_chunk.statistics
+        if statistics is None or not statistics.has_min_max:
+            raise ValueError(
+                f"Statistics of {column=} missing in {column_chunk.file_path}"
+            )
+        file_path = column_chunk.file_path
+        mins[file_path] = min(mins.get(file_path, statistics.min), statistics.min)
+        maxs[file_path] = max(maxs.get(file_path, statistics.max), statistics.max)
+
+    file_paths = list(mins.keys())
+    for prev, curr in zip(file_paths, file_paths[1:]):
+        if maxs[prev] >= mins[curr]:
+            raise ValueError(f"{prev} and {curr} are not sorted by {column=}")
+    return tuple(mins[p] for p in file_paths) + tuple(maxs[p] for p in file_paths[-1:])
+
+# %% ../../notebooks/Data_Utils.ipynb 43
+def _parquet_file_sort_key(path: Path) -> Tuple[Union[str, int], ...]:
+    """Sort key ordering the numbers in file names numerically, so that part.10.parquet comes after part.2.parquet"""
+    return tuple(int(s) if s.isdigit() else s for s in re.split(r"(\d+)", path.name))
+
+
+def iter_parquet_record_batches(
+    path: Path, batch_size: int = 100_000
+) -> Iterator["pa.RecordBatch"]:
+    """Read the parquet files in path one row group at a time, in record batches of at most batch_size rows
+
+    The files in a directory are read in the order of the numbers in their names, like the parts of a
+    dataset written by dask or write_parquet_dataset.
+
+    Args:
+        path: Parquet file or directory with parquet files
+        batch_size: Maximal number of rows in a record batch
+
+    Returns:
+        An iterator of record batches
+    """
+    import pyarrow.parquet as pq
+
+    files = (
+        sorted(path.glob("*.parquet"), key=_parquet_file_sort_key)
+        if path.is_dir()
+        else [path]
+    )
+    for fname in files:
+        yield from pq.ParquetFile(fname).iter_batches(batch_size=batch_size)
@@ -1,24 +1,26 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/DB_Models.ipynb.
 
 # %% auto 0
-__all__ = ['SubscriptionType', 'UserBase', 'User', 'UserCreate', 'UserRead', 'APIKeyBase', 'APIKey', 'APIKeyCreate', 'APIKeyRead',
-           'DataBlobTagLink', 'DataSourceTagLink', 'TagBase', 'Tag', 'TagCreate', 'TagRead', 'CloudProvider',
-           'DataBlobBase', 'DataBlob', 'DataBlobRead', 'DataBlobSelect', 'DataSourceBase', 'DataSource',
-           'DataSourceRead', 'DataSourceSelect', 'ModelBase', 'Model', 'ModelRead', 'PredictionBase', 'Prediction',
-           'PredictionRead', 'PredictionPushBase', 'PredictionPush', 'PredictionPushRead', 'SSOProvider', 'SSOBase',
-           'SSO', 'SSORead', 'SSOProtocol', 'SMS', 'SMSProtocol', 'get_db_params_from_env_vars',
-           'create_connection_string', 'get_engine', 'check_db_is_up', 'get_session', 'get_session_with_context',
-           'create_user_for_testing', 'create_initial_users']
+__all__ = ['async_database_servers', 'SubscriptionType', 'UserBase', 'User', 'UserCreate', 'UserRead', 'APIKeyBase', 'APIKey',
+           'APIKeyCreate', 'APIKeyRead', 'DataBlobTagLink', 'DataSourceTagLink', 'TagBase', 'Tag', 'TagCreate',
+           'TagRead', 'CloudProvider', 'DataBlobBase', 'DataBlob', 'DataBlobRead', 'DataBlobSelect', 'DataSourceBase',
+           'DataSource', 'DataSourceRead', 'DataSourceSelect', 'ModelBase', 'Model', 'ModelRead', 'PredictionBase',
+           'Prediction', 'PredictionRead', 'PredictionPushBase', 'PredictionPush', 'PredictionPushRead', 'SSOProvider',
+           'SSOBase', 'SSO', 'SSORead', 'SSOProtocol', 'SMS', 'SMSProtocol', 'get_db_params_from_env_vars',
+           'get_db_pool_params_from_env_vars', 'create_connection_string', 'get_engine', 'get_pooled_engine',
+           'check_db_is_up', 'get_session', 'get_session_with_context', 'get_async_engine', 'get_async_session',
+           'get_async_session_with_context', 'create_user_for_testing', 'create_initial_users']
 
 # %% ../../notebooks/DB_Models.ipynb 3
 import enum
 import random
 import string
+import threading
 import time
 import uuid as uuid_pkg
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta
-from os import environ
+from os import environ, getpid, register_at_fork
 from pathlib import Path
 from typing import *
 from urllib.parse import quote_plus as urlquote
@@ -30,6 +32,7 @@ from fastapi import BackgroundTasks
 from pydantic import EmailStr, validator
 from sqlalchemy.engine.interfaces import Dialect
 from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.future.engine import Engine
 from sqlmodel import (
     TEXT,
@@ -43,6 +46,7 @@ from sqlmodel import (
     create_engine,
     select,
 )
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.sqltypes import GUID
 
 from ..helpers import get_password_hash
@@ -395,6 +399,9 @@ class DataBlob(DataBlobBase, table=True):
     )
     uri: Optional[str]
     path: Optional[Path] = None
+    pulled_max_timestamp: Optional[int] = Field(
+        default=None, sa_column=Column(sqlalchemy.BigInteger)
+    )
     user_id: int = Field(default=None, foreign_key="user.id")
     user: User = Relationship(back_populates="datablobs")
     datasources: List["DataSource"] = Relationship(back_populates="datablob")
@@ -866,6 +873,10 @@ class PredictionPushBase(SQLModel):
     completed_steps: int = 0
     error: Optional[str] = None
     created: datetime = Field(sa_column_kwargs={"default": datetime.utcnow})
+    pushed_rows: Optional[int] = Field(
+        default=None, sa_column=Column(sqlalchemy.BigInteger)
+    )
+    rows_per_second: Optional[float] = None
 
 
 class PredictionPush(PredictionPushBase, table=True):
@@ -888,6 +899,7 @@ class PredictionPush(PredictionPushBase, table=True):
             f"PredictionPush(id={repr(self.id)}, uuid={repr(self.uuid)}, uri={repr(self.uri)}, "
             f"total_steps={repr(self.total_steps)}, completed_steps={repr(self.completed_steps)}, "
             f"error={repr(self.error)}, created={repr(self.created)}, prediction_id={repr(self.prediction_id)}, "
+            f"pushed_rows={repr(self.pushed_rows)}, rows_per_second={repr(self.rows_per_second)}, "
             f")"
         )
 
@@ -1007,6 +1019,21 @@ def get_db_params_from_env_vars() -> Dict[str, Union[str, int]]:
     )
 
 # %% ../../notebooks/DB_Models.ipynb 22
+def get_db_pool_params_from_env_vars() -> Dict[str, Union[int, bool]]:
+    """Get db connection pool params from environment variables
+
+    Returns:
+        The dictionary of db connection pool params
+    """
+    return dict(
+        pool_size=int(environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(environ.get("DB_MAX_OVERFLOW", 10)),
+        pool_pre_ping=environ.get("DB_POOL_PRE_PING", "true").lower()
+        in ["true", "1", "yes"],
+        pool_recycle=int(environ.get("DB_POOL_RECYCLE", 3600)),
+    )
+
+# %% ../../notebooks/DB_Models.ipynb 24
 def create_connection_string(
     username: str,
     password: str,
@@ -1033,7 +1060,7 @@ def create_connection_string(
     )
     return conn_str
 
-# %% ../../notebooks/DB_Models.ipynb 24
+# %% ../../notebooks/DB_Models.ipynb 26
 def get_engine(
     username: str,
     password: str,
@@ -1042,6 +1069,7 @@ def get_engine(
     database: str,
     database_server: str,
     echo: bool = False,
+    **kwargs: Any,
 ) -> Engine:
     """Get sqlmodel engine for the given DB params
 
@@ -1053,6 +1081,7 @@ def get_engine(
         database: Database to use
         database_server: Server/Engine of database
         echo: Whether to print sqlmodel queries to db or not
+        kwargs: Additional keyword arguments to pass to create_engine, e.g. the connection pool params
 
     Returns:
         The sqlmodel engine created from db connection params
@@ -1065,10 +1094,62 @@ def get_engine(
         database=database,
         database_server=database_server,
     )
-    engine = create_engine(conn_str, echo=echo)
+    engine = create_engine(conn_str, echo=echo, **kwargs)
     return engine
 
-# %% ../../notebooks/DB_Models.ipynb 26
+# %% ../../notebooks/DB_Models.ipynb 28
+_engine: Optional[Engine] = None
+_engine_pid: Optional[int] = None
+_engine_lock = threading.Lock()
+
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_pid: Optional[int] = None
+
+
+def _reset_engine_after_fork() -> None:
+    """Forget the engines inherited from the parent process
+
+    The pooled connections are shared with the parent process, so they are
+    discarded without closing them.
+    """
+    global _engine, _engine_pid, _engine_lock, _async_engine, _async_engine_pid
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    _engine = None
+    _engine_pid = None
+    _async_engine = None
+    _async_engine_pid = None
+    _engine_lock = threading.Lock()
+
+
+register_at_fork(after_in_child=_reset_engine_after_fork)
+
+# %% ../../notebooks/DB_Models.ipynb 29
+def get_pooled_engine() -> Engine:
+    """Get the process wide pooled sqlmodel engine
+
+    The engine is created lazily on the first call and reused by all the later calls
+    from the same process. The connection pool is configured using the DB_POOL_SIZE,
+    DB_MAX_OVERFLOW, DB_POOL_PRE_PING and DB_POOL_RECYCLE environment variables. A new
+    engine is created in the child process after a fork (e.g. uvicorn workers).
+
+    Returns:
+        The pooled sqlmodel engine
+    """
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine is None or _engine_pid != getpid():
+            if _engine is not None:
+                _engine.dispose(close=False)
+            _engine = get_engine(
+                **get_db_params_from_env_vars(), **get_db_pool_params_from_env_vars()  # type: ignore
+            )
+            _engine_pid = getpid()
+        return _engine
+
+# %% ../../notebooks/DB_Models.ipynb 31
 def check_db_is_up() -> None:
     """Function to check whether DB is up and running or not"""
     # Based on - https://github.com/CTFd/CTFd/issues/725#issuecomment-814379242
@@ -1089,19 +1170,18 @@ def check_db_is_up() -> None:
             time.sleep(sleep_for)
     logger.info(f"DB is up and running")
 
-# %% ../../notebooks/DB_Models.ipynb 28
+# %% ../../notebooks/DB_Models.ipynb 33
 def get_session():  # type: ignore
     """Get DB session without context manager
 
     Yields:
         session: SQLmodel session
     """
-    engine = get_engine(**get_db_params_from_env_vars())  # type: ignore
+    engine = get_pooled_engine()
     with Session(engine) as session:
         yield session
-    engine.dispose()
 
-# %% ../../notebooks/DB_Models.ipynb 30
+# %% ../../notebooks/DB_Models.ipynb 35
 @contextmanager
 def get_session_with_context():  # type: ignore
     """Get DB session with context manager
@@ -1114,7 +1194,60 @@ def get_session_with_context():  # type: ignore
     yield session
     next(iter_session, "close session")
 
-# %% ../../notebooks/DB_Models.ipynb 32
+# %% ../../notebooks/DB_Models.ipynb 37
+async_database_servers = {"mysql": "mysql+aiomysql"}
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get the process wide pooled async sqlalchemy engine
+
+    Same as get_pooled_engine, but the connection string uses the asyncio driver
+    of the database server (e.g. aiomysql for mysql).
+
+    Returns:
+        The pooled async sqlalchemy engine
+    """
+    global _async_engine, _async_engine_pid
+    with _engine_lock:
+        if _async_engine is None or _async_engine_pid != getpid():
+            if _async_engine is not None:
+                _async_engine.sync_engine.dispose(close=False)
+            db_params = get_db_params_from_env_vars()
+            db_params["database_server"] = async_database_servers.get(
+                db_params["database_server"], db_params["database_server"]  # type: ignore
+            )
+            conn_str = create_connection_string(**db_params)  # type: ignore
+            _async_engine = create_async_engine(
+                conn_str, **get_db_pool_params_from_env_vars()
+            )
+            _async_engine_pid = getpid()
+        return _async_engine
+
+# %% ../../notebooks/DB_Models.ipynb 39
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get async DB session without context manager
+
+    Objects are not expired on commit so that they can be serialized by FastAPI
+    without triggering an implicit (and blocking) refresh.
+
+    Yields:
+        session: SQLmodel async session
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+@asynccontextmanager
+async def get_async_session_with_context() -> AsyncIterator[AsyncSession]:
+    """Get async DB session with context manager
+
+    Yields:
+        session: SQLmodel async session
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+# %% ../../notebooks/DB_Models.ipynb 41
 def create_user_for_testing(
     username: Optional[str] = None, subscription_type: str = "test"
 ) -> str:
@@ -1147,7 +1280,7 @@ def create_user_for_testing(
             pass
     return username
 
-# %% ../../notebooks/DB_Models.ipynb 34
+# %% ../../notebooks/DB_Models.ipynb 43
 @patch(cls_method=True)  # type: ignore
 def get_by_name(cls: Tag, name: str, session: Session) -> Tag:
     """Get tag object for given name
@@ -1173,7 +1306,7 @@ def get_by_name(cls: Tag, name: str, session: Session) -> Tag:
             tag = Tag.get_by_name(name=name, session=session)
     return tag
 
-# %% ../../notebooks/DB_Models.ipynb 36
+# %% ../../notebooks/DB_Models.ipynb 45
 users_to_create = [
     {
         "username": "johndoe",
@@ -1204,7 +1337,7 @@ users_to_create = [
     },
 ]
 
-# %% ../../notebooks/DB_Models.ipynb 37
+# %% ../../notebooks/DB_Models.ipynb 46
 def create_initial_users() -> None:
     """Create initial users"""
     check_db_is_up()
@@ -3,20 +3,20 @@
 # %% auto 0
 __all__ = ['pwd_context', 'get_password_hash', 'verify_password', 'get_storage_path', 'get_datasource_path', 'get_model_path',
            'get_prediction_path', 'generate_random_string', 'set_env_variable_context', 'commit_or_rollback',
-           'truncate', 'df_to_dict', 'dict_to_df', 'validate_user_inputs', 'get_attr_by_name']
+           'truncate', 'df_to_dict', 'dict_to_df', 'validate_user_inputs', 'get_attr_by_name', 'get_import_time']
 
 # %% ../notebooks/Helpers.ipynb 3
 import os
 import random
 import re
 import string
+import subprocess  # nosec B404
+import sys
 from contextlib import contextmanager
 from os import environ
 from pathlib import Path
 from typing import *
 
-import pandas as pd
-import requests
 from airt.logger import get_logger
 from fastcore.utils import *
 from passlib.context import CryptContext
@@ -24,6 +24,9 @@ from sqlmodel import Session
 
 import airt_service.sanitizer
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # %% ../notebooks/Helpers.ipynb 7
 logger = get_logger(__name__)
 
@@ -160,7 +163,7 @@ def truncate(s: str, length: int = 255) -> str:
     return s[:length]
 
 # %% ../notebooks/Helpers.ipynb 27
-def df_to_dict(df: pd.DataFrame) -> Dict[str, Any]:
+def df_to_dict(df: "pd.DataFrame") -> Dict[str, Any]:
     """Convert pandas dataframe to dict
 
     Args:
@@ -176,7 +179,7 @@ def df_to_dict(df: pd.DataFrame) -> Dict[str, Any]:
     return d
 
 
-def dict_to_df(d: Dict[str, Any]) -> pd.DataFrame:
+def dict_to_df(d: Dict[str, Any]) -> "pd.DataFrame":
     """Convert the dict into a pandas dataframe
 
     Args:
@@ -185,6 +188,8 @@ def dict_to_df(d: Dict[str, Any]) -> pd.DataFrame:
     Returns:
         The pandas dataframe constructed from the dict
     """
+    import pandas as pd
+
     data = d["data"]
     dtypes = d["dtypes"]
     df = pd.DataFrame.from_dict(data, orient="tight")
@@ -242,3 +247,31 @@ def get_attr_by_name(xs: Dict[str, Any], attr_name: str) -> Union[str, None]:
             (getattr(v, attr_name) for v in xs.values() if hasattr(v, attr_name)), None
         )
     return ret_val  # type: ignore
+
+# %% ../notebooks/Helpers.ipynb 36
+def get_import_time(module: str) -> Tuple[float, Dict[str, float]]:
+    """Measure the time needed to import a module in a fresh interpreter using `python -X importtime`
+
+    Args:
+        module: Name of the module to import
+
+    Returns:
+        The cumulative import time of the module in seconds and a dict with the cumulative
+        import time in seconds of every module imported along with it
+    """
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, imported_module = line[len("import time:") :].split("|")
+        import_times[imported_module.strip()] = int(cumulative) / 1_000_000
+
+    return import_times[module], import_times
@@ -2,7 +2,7 @@
 
 # %% auto 0
 __all__ = ['heading', 'json_datetime_sec_encoder', 'LogMessage', 'add_logging', 'TaskType', 'ModelTrainingRequest', 'EventData',
-           'RealtimeData', 'TrainingDataStatus', 'TrainingModelStart', 'get_key', 'Tracker',
+           'RealtimeData', 'TrainingDataStatus', 'TrainingModelStart', 'get_key', 'Tracker', 'CountPoller',
            'add_process_start_training_data', 'TrainingModelStatus', 'ModelMetrics', 'add_process_training_model_start',
            'Prediction', 'add_predictions', 'create_fastkafka_application']
 
@@ -31,8 +31,8 @@ from pydantic import (
 import airt_service
 from .confluent import aio_kafka_config
 from airt_service.data.clickhouse import (
-    get_all_person_ids_for_account_id,
-    get_count_for_account_id,
+    get_counts_for_account_ids,
+    iter_person_ids_for_account_id,
 )
 
 # %% ../notebooks/Kafka_Service.ipynb 3
@@ -304,6 +304,52 @@ class Tracker:
         )
 
 # %% ../notebooks/Kafka_Service.ipynb 34
+class CountPoller:
+    """Polls the counts of all the tracked account ids with a single query per interval
+
+    Each call to `get_count` waits for the next poll, which fetches the counts of all the
+    account ids requested in the meantime at once and resolves the waiting futures.
+    """
+
+    def __init__(self, *, sleep_interval: int):
+        self._sleep_interval = sleep_interval
+        self._waiting: Dict[int, List[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_count(
+        self, account_id: int
+    ) -> Tuple[Optional[int], Optional[datetime]]:
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(account_id, []).append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future  # type: ignore
+
+    async def _poll(self) -> None:
+        waiting, self._waiting = self._waiting, {}
+        futures = [future for xs in waiting.values() for future in xs]
+        try:
+            counts = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: get_counts_for_account_ids(account_ids=list(waiting.keys())),
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for account_id, xs in waiting.items():
+            for future in xs:
+                if not future.done():
+                    future.set_result(counts.get(account_id, (None, None)))
+
+    async def _run(self) -> None:
+        while self._waiting:
+            await self._poll()
+            await asyncio.sleep(self._sleep_interval)
+
+# %% ../notebooks/Kafka_Service.ipynb 36
 def add_process_start_training_data(
     app: FastKafka,
     *,
@@ -312,6 +358,9 @@ def add_process_start_training_data(
     abort_on_no_change_interval: int = 120,
     sleep_interval: int = 5,
 ) -> None:
+    # shared by all the handlers so the counts are fetched with one query per interval
+    poller = CountPoller(sleep_interval=sleep_interval)
+
     @app.produces(topic=f"{username}_training_data_status")  # type: ignore
     async def to_training_data_status(
         training_data_status: TrainingDataStatus,
@@ -347,9 +396,7 @@ def add_process_start_training_data(
         )
 
         while not tracker.finished():
-            curr_count, timestamp = get_count_for_account_id(
-                account_id=account_id,
-            )
+            curr_count, timestamp = await poller.get_count(account_id)
             if curr_count is not None:
                 if tracker.update(curr_count):
                     training_data_status = TrainingDataStatus(
@@ -362,8 +409,6 @@ def add_process_start_training_data(
                     f"on_start_training_data(): no data yet received in the database.",
                 )
 
-            await asyncio.sleep(sleep_interval)
-
         if tracker.aborted():
             await app.error(msg, f"on_start_training_data(): data retrieval aborted!")
         else:
@@ -375,7 +420,7 @@ def add_process_start_training_data(
 
             await app.info(msg, f"on_start_training_data(): finished")
 
-# %% ../notebooks/Kafka_Service.ipynb 36
+# %% ../notebooks/Kafka_Service.ipynb 38
 class TrainingModelStatus(BaseModel):
     AccountId: NonNegativeInt = Field(
         ..., example=202020, description="ID of an account"
@@ -407,7 +452,7 @@ class TrainingModelStatus(BaseModel):
         description="total number of steps for training the model",
     )
 
-# %% ../notebooks/Kafka_Service.ipynb 38
+# %% ../notebooks/Kafka_Service.ipynb 40
 class ModelMetrics(BaseModel):
     """The standard metrics for classification models.
 
@@ -456,7 +501,7 @@ class ModelMetrics(BaseModel):
             datetime: json_datetime_sec_encoder,
         }
 
-# %% ../notebooks/Kafka_Service.ipynb 40
+# %% ../notebooks/Kafka_Service.ipynb 42
 def add_process_training_model_start(
     app: FastKafka,
     *,
@@ -522,7 +567,7 @@ def add_process_training_model_start(
 
         await app.info(msg, f"on_training_model_start() finished")
 
-# %% ../notebooks/Kafka_Service.ipynb 42
+# %% ../notebooks/Kafka_Service.ipynb 44
 class Prediction(BaseModel):
     AccountId: NonNegativeInt = Field(
         ..., example=202020, description="ID of an account"
@@ -564,11 +609,12 @@ class Prediction(BaseModel):
             datetime: json_datetime_sec_encoder,
         }
 
-# %% ../notebooks/Kafka_Service.ipynb 44
+# %% ../notebooks/Kafka_Service.ipynb 46
 def add_predictions(
     app: FastKafka,
     *,
     username: str = "infobip",
+    person_ids_batch_size: int = 100_000,
 ) -> None:
     @app.produces(topic=f"{username}_prediction")  # type: ignore
     async def to_prediction(
@@ -588,31 +634,42 @@ def add_predictions(
         task_type = msg.task_type
         prediction_time = datetime.now()
 
-        person_ids = get_all_person_ids_for_account_id(account_id=AccountId)
-
         rng = np.random.default_rng(42)
 
-        await app.info(msg, f"Sending predictions for {len(person_ids):,d} PersonIds")
+        await app.info(msg, f"Sending predictions for PersonIds")
         t0 = datetime.now()
-        for PersonId in person_ids:
-            prediction = Prediction(
-                AccountId=AccountId,
-                ApplicationId=ApplicationId,
-                ModelId=ModelId,
-                task_type=task_type,
-                prediction_time=prediction_time,
-                PersonId=PersonId,
-                score=rng.uniform(),
+        no_of_person_ids = 0
+        # person ids are fetched in batches with short queries in the executor, so predictions are sent
+        # before all of them are fetched and neither the event loop nor a connection is blocked meanwhile
+        batches = iter_person_ids_for_account_id(
+            account_id=AccountId, batch_size=person_ids_batch_size
+        )
+        while True:
+            person_ids = await asyncio.get_running_loop().run_in_executor(
+                None, next, batches, None
             )
-            await to_prediction(prediction)
+            if person_ids is None:
+                break
+            for PersonId in person_ids:
+                prediction = Prediction(
+                    AccountId=AccountId,
+                    ApplicationId=ApplicationId,
+                    ModelId=ModelId,
+                    task_type=task_type,
+                    prediction_time=prediction_time,
+                    PersonId=PersonId,
+                    score=rng.uniform(),
+                )
+                await to_prediction(prediction)
+            no_of_person_ids += len(person_ids)
         await app.info(
             msg,
-            f"Sending predictions for {len(person_ids):,d} PersonIds finished in {datetime.now()-t0}.",
+            f"Sending predictions for {no_of_person_ids:,d} PersonIds finished in {datetime.now()-t0}.",
         )
 
         await app.info(msg, "on_model_metrics() finished")
 
-# %% ../notebooks/Kafka_Service.ipynb 46
+# %% ../notebooks/Kafka_Service.ipynb 48
 def _construct_kafka_brokers() -> Dict[str, Dict[str, Any]]:
     url = aio_kafka_config["bootstrap_servers"].split(":")[0]
     port = aio_kafka_config["bootstrap_servers"].split(":")[-1]
@@ -645,7 +702,7 @@ def _construct_kafka_brokers() -> Dict[str, Dict[str, Any]]:
 
     return kafka_brokers
 
-# %% ../notebooks/Kafka_Service.ipynb 48
+# %% ../notebooks/Kafka_Service.ipynb 50
 def create_fastkafka_application(
     start_process_for_username: Optional[str] = "infobip",
     *,
@@ -10,18 +10,18 @@ __all__ = ['model_prediction_router', 'get_details_of_prediction', 'delete_predi
 from pathlib import Path
 from typing import *
 
-import boto3
 import pandas as pd
 from airt.logger import get_logger
 from airt.patching import patch
-from botocore.client import Config
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 import airt_service.sanitizer
 from ..auth import get_current_active_user
-from ..aws.utils import get_s3_bucket_and_path_from_uri
+from ..aws.utils import get_s3_bucket_and_path_from_uri, get_s3_client
 from ..batch_job import create_batch_job
 from ..data.clickhouse import create_db_uri_for_clickhouse_datablob
 from airt_service.data.datablob import (
@@ -43,6 +43,7 @@ from airt_service.db.models import (
     PredictionPushRead,
     PredictionRead,
     User,
+    get_async_session,
     get_session,
 )
 from ..errors import ERRORS, HTTPError
@@ -104,6 +105,50 @@ def get(cls: Prediction, uuid: str, user: User, session: Session) -> Prediction:
     return prediction
 
 # %% ../../notebooks/Model_Prediction.ipynb 13
+# relationships used by PredictionRead, they can't be lazy loaded with an async session
+_prediction_read_options = [
+    selectinload(Prediction.datasource),  # type: ignore
+    selectinload(Prediction.model),  # type: ignore
+]
+
+
+@patch(cls_method=True)  # type: ignore
+async def get_async(
+    cls: Prediction, uuid: str, user: User, session: AsyncSession
+) -> Prediction:
+    """Get prediction object for given prediction uuid using an async session
+
+    Args:
+        uuid: UUID of prediction
+        user: User object
+        session: Sqlmodel async session
+    Returns:
+        The prediction object for given prediction uuid
+    """
+    try:
+        prediction = (
+            await session.exec(
+                select(Prediction)
+                .where(Prediction.uuid == uuid)
+                .join(Model)
+                .where(Model.user_id == user.id)
+                .options(*_prediction_read_options)
+            )
+        ).one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["INCORRECT_PREDICTION_ID"],
+        )
+
+    if prediction.disabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["PREDICTION_IS_DELETED"],
+        )
+    return prediction
+
+# %% ../../notebooks/Model_Prediction.ipynb 15
 @model_prediction_router.get(
     "/{prediction_uuid}",
     response_model=PredictionRead,
@@ -112,28 +157,23 @@ def get(cls: Prediction, uuid: str, user: User, session: Session) -> Prediction:
         422: {"model": HTTPError, "description": "Prediction error"},
     },
 )
-def get_details_of_prediction(
+async def get_details_of_prediction(
     prediction_uuid: str,
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Prediction:
     """Get details of the prediction"""
-    user = session.merge(user)
     # get details from the internal db for prediction_id
-    prediction = Prediction.get(uuid=prediction_uuid, user=user, session=session)  # type: ignore
+    prediction = await Prediction.get_async(uuid=prediction_uuid, user=user, session=session)  # type: ignore
 
     if prediction.error is not None:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=prediction.error
         )
 
-    session.add(prediction)
-    session.commit()
-    session.refresh(prediction)
-
     return prediction
 
-# %% ../../notebooks/Model_Prediction.ipynb 16
+# %% ../../notebooks/Model_Prediction.ipynb 18
 @model_prediction_router.delete(
     "/{prediction_uuid}",
     response_model=PredictionRead,
@@ -158,7 +198,7 @@ def delete_prediction(
 
     return prediction
 
-# %% ../../notebooks/Model_Prediction.ipynb 18
+# %% ../../notebooks/Model_Prediction.ipynb 20
 @model_prediction_router.get(
     "/{prediction_uuid}/pandas", responses=get_prediction_responses  # type: ignore
 )
@@ -202,7 +242,7 @@ def prediction_pandas(
     )
     return df.to_dict("list")  # type: ignore
 
-# %% ../../notebooks/Model_Prediction.ipynb 20
+# %% ../../notebooks/Model_Prediction.ipynb 22
 @patch  # type: ignore
 def to_local(
     self: Prediction,
@@ -218,11 +258,8 @@ def to_local(
     """
     bucket, s3_path = get_s3_bucket_and_path_from_uri(self.path)  # type: ignore
 
-    client = boto3.client(
-        "s3",
-        region_name=self.region,
-        config=Config(signature_version="s3v4"),
-        endpoint_url=f"https://s3.{self.region}.amazonaws.com",
+    client = get_s3_client(
+        self.region, endpoint_url=f"https://s3.{self.region}.amazonaws.com"
     )
 
     return {
@@ -238,7 +275,7 @@ def to_local(
         if Path(s3_file.key).name != str(self.id)
     }
 
-# %% ../../notebooks/Model_Prediction.ipynb 21
+# %% ../../notebooks/Model_Prediction.ipynb 23
 @model_prediction_router.get(
     "/{prediction_uuid}/to_local",
     responses=get_prediction_responses,  # type: ignore
@@ -255,7 +292,7 @@ def prediction_to_local_route(
 
     return prediction.to_local(session)
 
-# %% ../../notebooks/Model_Prediction.ipynb 23
+# %% ../../notebooks/Model_Prediction.ipynb 25
 @patch  # type: ignore
 def to_s3(
     self: Prediction,
@@ -308,7 +345,7 @@ def to_s3(
 
     return prediction_push
 
-# %% ../../notebooks/Model_Prediction.ipynb 24
+# %% ../../notebooks/Model_Prediction.ipynb 26
 @model_prediction_router.post(
     "/{prediction_uuid}/to_s3",
     response_model=PredictionPushRead,
@@ -328,7 +365,7 @@ def prediction_to_s3_route(
 
     return prediction.to_s3(s3_request, session, background_tasks)
 
-# %% ../../notebooks/Model_Prediction.ipynb 26
+# %% ../../notebooks/Model_Prediction.ipynb 28
 @patch  # type: ignore
 def to_azure_blob_storage(
     self: Prediction,
@@ -380,7 +417,7 @@ def to_azure_blob_storage(
 
     return prediction_push
 
-# %% ../../notebooks/Model_Prediction.ipynb 27
+# %% ../../notebooks/Model_Prediction.ipynb 29
 @model_prediction_router.post(
     "/{prediction_uuid}/to_azure_blob_storage",
     response_model=PredictionPushRead,
@@ -400,7 +437,7 @@ def prediction_to_azure_blob_storage_route(
 
     return prediction.to_azure_blob_storage(azure_blob_storage_request, session, background_tasks)  # type: ignore
 
-# %% ../../notebooks/Model_Prediction.ipynb 29
+# %% ../../notebooks/Model_Prediction.ipynb 31
 @patch  # type: ignore
 def to_rdbms(
     self: Prediction,
@@ -465,7 +502,7 @@ def to_rdbms(
 
     return prediction_push
 
-# %% ../../notebooks/Model_Prediction.ipynb 30
+# %% ../../notebooks/Model_Prediction.ipynb 32
 @model_prediction_router.post(
     "/{prediction_uuid}/to_mysql",
     response_model=PredictionPushRead,
@@ -490,7 +527,7 @@ def prediction_to_mysql_route(
         background_tasks=background_tasks,
     )
 
-# %% ../../notebooks/Model_Prediction.ipynb 32
+# %% ../../notebooks/Model_Prediction.ipynb 34
 @patch  # type: ignore
 def to_clickhouse(
     self: Prediction,
@@ -549,7 +586,7 @@ def to_clickhouse(
 
     return prediction_push
 
-# %% ../../notebooks/Model_Prediction.ipynb 33
+# %% ../../notebooks/Model_Prediction.ipynb 35
 @model_prediction_router.post(
     "/{prediction_uuid}/to_clickhouse",
     response_model=PredictionPushRead,
@@ -573,7 +610,7 @@ def prediction_to_clickhouse_route(
         background_tasks=background_tasks,
     )
 
-# %% ../../notebooks/Model_Prediction.ipynb 35
+# %% ../../notebooks/Model_Prediction.ipynb 37
 @model_prediction_router.get(
     "/push/{prediction_push_uuid}",
     response_model=PredictionPushRead,
@@ -619,26 +656,25 @@ def get_details_of_prediction_push(
 
     return prediction_push
 
-# %% ../../notebooks/Model_Prediction.ipynb 37
+# %% ../../notebooks/Model_Prediction.ipynb 39
 @model_prediction_router.get("/", response_model=List[PredictionRead])
-def get_all_prediction(
+async def get_all_prediction(
     disabled: bool = False,
     completed: bool = False,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> List[Prediction]:
     """Get all predictions created by user"""
-    user = session.merge(user)
     statement = select(Prediction)
     statement = statement.where(Prediction.disabled == disabled)
     if completed:
         statement = statement.where(
             Prediction.completed_steps == Prediction.total_steps
         )
+    statement = statement.join(Model).where(Model.user_id == user.id)
+    statement = statement.options(*_prediction_read_options)
     # get all predictions from db
-    predictions = session.exec(
-        statement.join(Model).where(Model.user == user).offset(offset).limit(limit)
-    ).all()
+    predictions = (await session.exec(statement.offset(offset).limit(limit))).all()
     return predictions
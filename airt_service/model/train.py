@@ -1,8 +1,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../../notebooks/Model_Train.ipynb.
 
 # %% auto 0
-__all__ = ['model_train_router', 'get_model_responses', 'TrainRequest', 'train_model', 'get_model', 'get_details_of_model',
-           'delete_model', 'evaluate_model', 'get_all_model', 'predict_model', 'predict']
+__all__ = ['model_train_router', 'get_model_responses', 'TrainRequest', 'train_model', 'get_model', 'get_model_async',
+           'get_details_of_model', 'delete_model', 'evaluate_model', 'get_all_model', 'predict_model', 'predict']
 
 # %% ../../notebooks/Model_Train.ipynb 3
 import shutil
@@ -16,7 +16,9 @@ from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, s
 from fastcore.script import Param, call_parse
 from pydantic import BaseModel
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 import airt_service.sanitizer
 from ..auth import get_current_active_user
@@ -33,6 +35,7 @@ from airt_service.db.models import (
     Prediction,
     PredictionRead,
     User,
+    get_async_session,
     get_session,
     get_session_with_context,
 )
@@ -154,6 +157,45 @@ def get_model(model_uuid: str, user: User, session: Session) -> Model:
     return model
 
 # %% ../../notebooks/Model_Train.ipynb 17
+# relationships used by ModelRead, they can't be lazy loaded with an async session
+_model_read_options = [
+    selectinload(Model.user),  # type: ignore
+    selectinload(Model.datasource),  # type: ignore
+]
+
+
+async def get_model_async(model_uuid: str, user: User, session: AsyncSession) -> Model:
+    """Get model object for the model_id using an async session
+
+    Args:
+        model_uuid: Model uuid
+        user: User object
+        session: Sqlmodel async session
+
+    Returns:
+        The model object for given model uuid
+    """
+    try:
+        model = (
+            await session.exec(
+                select(Model)
+                .where(Model.uuid == model_uuid, Model.user_id == user.id)
+                .options(*_model_read_options)
+            )
+        ).one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERRORS["INCORRECT_MODEL_ID"],
+        )
+
+    if model.disabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERRORS["MODEL_IS_DELETED"]
+        )
+    return model
+
+# %% ../../notebooks/Model_Train.ipynb 19
 @model_train_router.get(
     "/{model_uuid}",
     response_model=ModelRead,
@@ -162,15 +204,14 @@ def get_model(model_uuid: str, user: User, session: Session) -> Model:
         422: {"model": HTTPError, "description": "Model error"},
     },
 )
-def get_details_of_model(
+async def get_details_of_model(
     model_uuid: str,
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Model:
     """Get details of the model"""
-    user = session.merge(user)
     # get details from the internal db for model_id
-    model = get_model(model_uuid=model_uuid, user=user, session=session)
+    model = await get_model_async(model_uuid=model_uuid, user=user, session=session)
 
     if model.error is not None:
         raise HTTPException(
@@ -180,11 +221,10 @@ def get_details_of_model(
     # ToDo: Remove following temporary fix once actual train is implemented
     model.completed_steps = model.total_steps
     session.add(model)
-    session.commit()
-    session.refresh(model)
+    await session.commit()
     return model
 
-# %% ../../notebooks/Model_Train.ipynb 20
+# %% ../../notebooks/Model_Train.ipynb 22
 @model_train_router.delete(
     "/{model_uuid}", response_model=ModelRead, responses=get_model_responses  # type: ignore
 )
@@ -207,7 +247,7 @@ def delete_model(
     session.refresh(model)
     return model
 
-# %% ../../notebooks/Model_Train.ipynb 22
+# %% ../../notebooks/Model_Train.ipynb 24
 @model_train_router.get("/{model_uuid}/evaluate", responses=get_model_responses)  # type: ignore
 def evaluate_model(
     model_uuid: str,
@@ -220,27 +260,27 @@ def evaluate_model(
     model = get_model(model_uuid=model_uuid, user=user, session=session)
     return {"accuracy": 0.985, "recall": 0.962, "precision": 0.934}
 
-# %% ../../notebooks/Model_Train.ipynb 24
+# %% ../../notebooks/Model_Train.ipynb 26
 @model_train_router.get("/", response_model=List[ModelRead])
-def get_all_model(
+async def get_all_model(
     disabled: bool = False,
     completed: bool = False,
     offset: int = 0,
     limit: int = Query(default=100, lte=100),
     user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> List[Model]:
     """Get all models created by user"""
-    user = session.merge(user)
-    statement = select(Model).where(Model.user == user)
+    statement = select(Model).where(Model.user_id == user.id)
     statement = statement.where(Model.disabled == disabled)
     if completed:
         statement = statement.where(Model.completed_steps == Model.total_steps)
+    statement = statement.options(*_model_read_options)
     # get all models from db
-    models = session.exec(statement.offset(offset).limit(limit)).all()
+    models = (await session.exec(statement.offset(offset).limit(limit))).all()
     return models
 
-# %% ../../notebooks/Model_Train.ipynb 27
+# %% ../../notebooks/Model_Train.ipynb 29
 @model_train_router.post(
     "/{model_uuid}/predict",
     response_model=PredictionRead,
@@ -301,7 +341,7 @@ def predict_model(
 
     return prediction
 
-# %% ../../notebooks/Model_Train.ipynb 29
+# %% ../../notebooks/Model_Train.ipynb 31
 @call_parse  # type: ignore
 def predict(prediction_id: Param("id of prediction in db", int)):  # type: ignore
     """Copy datasource parquet to prediction path to create dummy prediction output
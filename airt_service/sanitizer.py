@@ -11,12 +11,11 @@ import sys
 from logging import Logger
 from typing import *
 
-import IPython
 from airt.logger import get_logger
 from airt.patching import patch
 
 # %% ../notebooks/Sanitize_Secrets.ipynb 9
-def sanitize_secrets(s: str) -> str:
+def _get_secret_patterns() -> List[Tuple[str, str]]:
     d = {
         "(A3T[A-Z0-9]|AKIA|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)\w+": "*" * 20,
         "AWS_ACCESS_KEY_ID':\s*'.*?'": "AWS_ACCESS_KEY_ID': " + f"'{'*' * 20}'",
@@ -51,49 +50,76 @@ def sanitize_secrets(s: str) -> str:
 
     d = {k.replace("'", "\\\\?'"): v for k, v in d.items()}
 
+    return list(d.items())
+
+# %% ../notebooks/Sanitize_Secrets.ipynb 10
+# Substrings one of which is part of every match of the secret patterns, in the same
+# case as the pattern variant that matches it
+_secret_markers: Tuple[str, ...] = (
+    *("A3T", "AKIA", "AGPA", "AIDA", "AROA", "AIPA", "ANPA", "ANVA", "ASIA"),
+    *("KEY", "AWSAccessKeyId", "AZURE_", "SECRET", "PASSWORD", "POLICY", "SIGNATURE"),
+    *("://", "value", "~"),
+)
+_secret_markers += tuple(marker.lower() for marker in _secret_markers)
+
+_secret_patterns = [
+    (re.compile(pattern), replacement)
+    for pattern, replacement in _get_secret_patterns()
+]
+_secret_patterns_re = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern, _ in _secret_patterns)
+)
+
+# %% ../notebooks/Sanitize_Secrets.ipynb 11
+def sanitize_secrets(s: str) -> str:
     if not isinstance(s, str):
         s = s.__repr__()
 
-    for pattern, replacement in d.items():
-        s = re.sub(pattern, replacement, s)
+    # Most log lines contain no secrets, skip them with a substring check and a single
+    # search over all the patterns before substituting them one after the other
+    if not any(marker in s for marker in _secret_markers):
+        return s
+    if _secret_patterns_re.search(s) is None:
+        return s
+
+    for pattern, replacement in _secret_patterns:
+        s = pattern.sub(replacement, s)
 
     return s
 
-# %% ../notebooks/Sanitize_Secrets.ipynb 17
+# %% ../notebooks/Sanitize_Secrets.ipynb 21
 old_log = Logger._log
 
-# %% ../notebooks/Sanitize_Secrets.ipynb 18
+# %% ../notebooks/Sanitize_Secrets.ipynb 22
 @patch  # type: ignore
 def _log(self: Logger, level: int, msg: str, *args: Any, **kwargs: Any) -> None:
     return old_log(self, level, sanitize_secrets(msg), *args, **kwargs)
 
-# %% ../notebooks/Sanitize_Secrets.ipynb 23
-old_publish_display_data = IPython.core.display_functions.publish_display_data
-
-# %% ../notebooks/Sanitize_Secrets.ipynb 24
-def new_publish_display_data(
-    data: Dict[str, Any],
-    metadata: Optional[Dict[str, Any]] = None,
-    source: IPython.core.display_functions._sentinel = IPython.core.display_functions._sentinel,  # type: ignore
-    *,
-    transient: Optional[Dict[str, Any]] = None,
-    **kwargs: Any,
-) -> None:
+# %% ../notebooks/Sanitize_Secrets.ipynb 27
+# IPython is patched only if it is already loaded, i.e. inside notebooks, so the CLIs
+# and the batch jobs do not pay for importing it
+old_publish_display_data: Optional[Callable[..., None]] = None
+if "IPython" in sys.modules:
+    import IPython.core.display_functions
+
+    old_publish_display_data = IPython.core.display_functions.publish_display_data
+
+# %% ../notebooks/Sanitize_Secrets.ipynb 28
+def new_publish_display_data(data: Dict[str, Any], *args: Any, **kwargs: Any) -> None:
     sanitized_data = {
         k: sanitize_secrets(v.__repr__() if not isinstance(v, str) else v)
         for k, v in data.items()
     }
-    return old_publish_display_data(  # type: ignore
-        sanitized_data, metadata=metadata, source=source, transient=transient, **kwargs
-    )
+    return old_publish_display_data(sanitized_data, *args, **kwargs)  # type: ignore
 
 
-IPython.core.display_functions.publish_display_data = new_publish_display_data
+if old_publish_display_data is not None:
+    IPython.core.display_functions.publish_display_data = new_publish_display_data
 
-# %% ../notebooks/Sanitize_Secrets.ipynb 27
+# %% ../notebooks/Sanitize_Secrets.ipynb 31
 old_print = builtins.print
 
-# %% ../notebooks/Sanitize_Secrets.ipynb 28
+# %% ../notebooks/Sanitize_Secrets.ipynb 32
 def sanitized_print(  # type: ignore
     *objects: Any, sep: str = " ", end: str = "\n", file=sys.stdout, flush: bool = False
 ) -> None:
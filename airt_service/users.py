@@ -26,7 +26,13 @@ from sqlmodel import Session, select
 
 import airt_service
 import airt_service.sanitizer
-from .auth import get_current_active_user, get_user, get_valid_user
+from airt_service.auth import (
+    get_current_active_user,
+    get_user,
+    get_valid_user,
+    invalidate_user_cache,
+    submit_password_task,
+)
 from .cleanup import cleanup_user
 from airt_service.db.models import (
     SMS,
@@ -428,7 +434,9 @@ def _create(cls: User, user_to_create: UserCreate, session: Session) -> User:
     Raises:
         HTTPException: if username or email already exists in database
     """
-    user_to_create.password = get_password_hash(user_to_create.password)
+    user_to_create.password = submit_password_task(
+        get_password_hash, user_to_create.password
+    ).result()
     new_user = User(**user_to_create.dict())
 
     try:
@@ -656,6 +664,7 @@ def disable(self: User, session: Session) -> User:
         for apikey in self.apikeys:
             apikey.disabled = True
             session.add(apikey)
+    invalidate_user_cache(user_id=self.id)
     return self
 
 # %% ../notebooks/Users.ipynb 61
@@ -1180,8 +1189,9 @@ def reset_password(
     user = session.merge(user)
 
     with commit_or_rollback(session):
-        user.password = get_password_hash(new_password)  # type: ignore
+        user.password = submit_password_task(get_password_hash, new_password).result()
         session.add(user)
+    invalidate_user_cache(user_id=user.id)  # type: ignore
 
     return PASSWORD_RESET_MSG
 
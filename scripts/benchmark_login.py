@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Measure the throughput of the /token route of a running webservice
+
+Examples:
+    # plain username and password
+    python3 scripts/benchmark_login.py --username $TEST_USERNAME --password $TEST_PASSWORD
+
+    # MFA user logging in with a TOTP (validated by validate_totp)
+    python3 scripts/benchmark_login.py --username ... --password ... --mfa-secret ...
+
+    # MFA user sending an SMS OTP (falls back to validate_otp)
+    python3 scripts/benchmark_login.py --username ... --password ... --otp 123456
+
+An SMS OTP can be used only once, so with --otp every request after the first one is
+rejected: that mode measures how fast logins with a wrong or reused OTP are rejected,
+not the throughput of successful logins.
+
+The server side rate limiter allows LOGIN_RATE_LIMIT_ATTEMPTS logins per username and
+window, so start the webservice with LOGIN_RATE_LIMIT_ATTEMPTS=0 to benchmark a single user.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median, quantiles
+from typing import *
+
+import requests
+
+
+def _get_password(args: argparse.Namespace) -> str:
+    if args.mfa_secret is not None:
+        import pyotp
+
+        user_otp = pyotp.TOTP(args.mfa_secret).now()
+    elif args.otp is not None:
+        user_otp = args.otp
+    else:
+        return args.password  # type: ignore
+    return json.dumps({"password": args.password, "user_otp": user_otp})
+
+
+def _login(args: argparse.Namespace) -> Tuple[int, float]:
+    start = time.perf_counter()
+    response = requests.post(
+        f"{args.server}/token",
+        data={"username": args.username, "password": _get_password(args)},
+        timeout=60,
+    )
+    return response.status_code, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", default=os.environ.get("WEBSITE"))
+    parser.add_argument("--username", default=os.environ.get("TEST_USERNAME"))
+    parser.add_argument("--password", default=os.environ.get("TEST_PASSWORD"))
+    mfa = parser.add_mutually_exclusive_group()
+    mfa.add_argument("--mfa-secret", help="MFA secret to generate TOTPs from")
+    mfa.add_argument(
+        "--otp",
+        help="SMS OTP to send along with the password, it is valid only once so this benchmarks the rejected logins",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if not (args.server and args.username and args.password):
+        parser.error("--server, --username and --password are required")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda _: _login(args), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status_code for status_code, _ in results)
+    latencies = sorted(latency for _, latency in results)
+    p95 = quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+
+    mode = (
+        "totp"
+        if args.mfa_secret
+        else "otp (rejection, the OTP is valid only once)"
+        if args.otp
+        else "password"
+    )
+    print(f"mode:        {mode}")
+    print(f"requests:    {args.requests} ({args.concurrency} concurrent)")
+    print(f"throughput:  {args.requests / elapsed:.1f} req/s")
+    print(f"latency p50: {median(latencies) * 1000:.1f} ms")
+    print(f"latency p95: {p95 * 1000:.1f} ms")
+    print(f"statuses:    {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
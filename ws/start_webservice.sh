@@ -18,6 +18,13 @@ check_db_is_up
 alembic upgrade head
 create_initial_users
 
+# Provisioning the azure storage is a deploy step: it runs only if requested and a failure
+# does not block the startup, the containers are also provisioned on their first use
+if test -n "$PROVISION_AZURE_STORAGE";
+then
+    provision_azure_storage || echo "provision_azure_storage failed, continuing the startup"
+fi
+
 make start_airflow
 
 if [[ -z "${NUM_WORKERS}" ]]; then